@@ -38,6 +38,13 @@ from .snapshots import (
     SnapshotManager,
     Snapshot,
     SnapshotResult,
+    SnapshotCancelled,
+    TransferCallback,
+    VerifyResult,
+    CleanupResult,
+    format_size,
+    read_bundle,
+    BUNDLE_SUFFIX,
     create_project_snapshot,
     list_project_snapshots,
     restore_project_snapshot,
@@ -52,6 +59,7 @@ from .deps import (
     compare_requirements,
     RequirementsComparison,
 )
+from .resolver import ModuleResolver
 
 # Virtual environment management
 from .venv import (
@@ -127,6 +135,13 @@ __all__ = [
     "SnapshotManager",
     "Snapshot",
     "SnapshotResult",
+    "SnapshotCancelled",
+    "TransferCallback",
+    "VerifyResult",
+    "CleanupResult",
+    "format_size",
+    "read_bundle",
+    "BUNDLE_SUFFIX",
     "create_project_snapshot",
     "list_project_snapshots",
     "restore_project_snapshot",
@@ -138,6 +153,7 @@ __all__ = [
     "generate_requirements",
     "compare_requirements",
     "RequirementsComparison",
+    "ModuleResolver",
     
     # Venv
     "EnvironmentWrangler",
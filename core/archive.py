@@ -0,0 +1,180 @@
+"""
+Compressed snapshot archives for TPC.
+
+An "archive" snapshot keeps its files in a single files.zip inside the
+snapshot folder instead of a full uncompressed copy. ZIP fits well:
+- Deflate compression, with already-compressed files (zips, wheels,
+  images, video) stored as-is so no time is wasted squeezing them
+- The central directory at the end of the file is an index, so a single
+  file can be previewed or restored without unpacking the rest
+- Anyone can open it by double-clicking, on any OS
+
+Exact timestamps and permissions live in the snapshot's _manifest.json -
+ZIP's own timestamps only have two-second resolution.
+"""
+
+import hashlib
+import os
+import stat
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from .objects import CHUNK_SIZE
+
+
+# Archive file inside an archive snapshot's folder
+ARCHIVE_FILE = "files.zip"
+
+# Formats that are already compressed - deflating them again costs time and saves nothing
+STORED_EXTENSIONS = {
+    ".zip", ".whl", ".egg", ".jar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".zst",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".heic",
+    ".mp3", ".m4a", ".aac", ".ogg", ".mp4", ".mov", ".m4v", ".avi", ".mkv",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods",
+}
+
+
+class SnapshotArchive:
+    """
+    Reads or writes one snapshot's files.zip.
+
+    Usage:
+        with SnapshotArchive(snapshot_path / ARCHIVE_FILE, "w") as archive:
+            digest = archive.add_file(Path("main.py"), "main.py")
+
+        with SnapshotArchive(snapshot_path / ARCHIVE_FILE) as archive:
+            data = archive.read("main.py")
+            archive.extract("main.py", Path("restored/main.py"))
+
+    Reads are safe from several threads at once; writes are not.
+    """
+
+    def __init__(self, path: Path, mode: str = "r"):
+        self.path = path
+        # strict_timestamps=False: files dated before 1980 are clamped, not rejected
+        self._zip = zipfile.ZipFile(path, mode, allowZip64=True, strict_timestamps=False)
+
+    def __enter__(self) -> "SnapshotArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def add_file(
+        self,
+        src: Path,
+        rel_path: str,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """
+        Compress a file into the archive and return its SHA-256 hex digest.
+
+        The file is read once, hashing and compressing as it streams.
+        """
+        info = zipfile.ZipInfo.from_file(src, arcname=rel_path, strict_timestamps=False)
+        with open(src, "rb") as fsrc:
+            return self._write(info, fsrc, progress)
+
+    def add_stream(
+        self,
+        fsrc: BinaryIO,
+        rel_path: str,
+        mtime_ns: int,
+        mode: int = 0o644,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """Compress data read from a stream into the archive and return its SHA-256 hex digest."""
+        # ZIP dates run from 1980 to 2107
+        date_time = time.localtime(mtime_ns // 1_000_000_000)[:6]
+        date_time = min(max(date_time, (1980, 1, 1, 0, 0, 0)), (2107, 12, 31, 23, 59, 58))
+
+        info = zipfile.ZipInfo(rel_path, date_time=date_time)
+        info.external_attr = (stat.S_IFREG | mode) << 16
+        return self._write(info, fsrc, progress)
+
+    def add_bytes(self, rel_path: str, data: bytes) -> None:
+        """Add a small file (e.g. an index) from memory, compressed."""
+        self._zip.writestr(rel_path, data, zipfile.ZIP_DEFLATED)
+
+    def _write(self, info: zipfile.ZipInfo, fsrc: BinaryIO, progress: Optional[Callable[[int], None]]) -> str:
+        if os.path.splitext(info.filename)[1].lower() in STORED_EXTENSIONS:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+
+        digest = hashlib.sha256()
+        with self._zip.open(info, "w") as fdest:
+            for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                digest.update(block)
+                fdest.write(block)
+                if progress:
+                    progress(len(block))
+
+        return digest.hexdigest()
+
+    def has(self, rel_path: str) -> bool:
+        """Check if a file is in the archive."""
+        try:
+            self._zip.getinfo(rel_path)
+            return True
+        except KeyError:
+            return False
+
+    def names(self) -> list[str]:
+        """Relative paths of every file in the archive."""
+        return [info.filename for info in self._zip.infolist() if not info.is_dir()]
+
+    def compressed_size(self) -> int:
+        """Size of the archive on disk."""
+        return self.path.stat().st_size
+
+    def open(self, rel_path: str) -> BinaryIO:
+        """
+        Open one file for reading, decompressing as it's read.
+
+        The stream stays usable after the archive is closed.
+        """
+        return self._zip.open(rel_path)
+
+    def read(self, rel_path: str) -> bytes:
+        """Read one file's contents."""
+        return self._zip.read(rel_path)
+
+    def extract(
+        self,
+        rel_path: str,
+        dest: Path,
+        mtime_ns: Optional[int] = None,
+        mode: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        Write one file out to a regular path.
+
+        Args:
+            rel_path: File inside the archive
+            dest: Destination file path (parents are created)
+            mtime_ns: Modification time to stamp on the file
+            mode: Permission bits to apply to the file
+            progress: Called with byte counts as data is written
+        """
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+
+        with self._zip.open(rel_path) as fsrc, open(dest, "wb") as fdest:
+            for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                fdest.write(block)
+                if progress:
+                    progress(len(block))
+
+        if mode is not None:
+            os.chmod(dest, mode)
+        if mtime_ns is not None:
+            os.utime(dest, ns=(mtime_ns, mtime_ns))
@@ -17,6 +17,7 @@ from typing import Optional, Callable
 from datetime import datetime
 
 from .venv import EnvironmentWrangler
+from .walker import tree_size
 
 
 def _subprocess_args() -> dict:
@@ -215,12 +216,12 @@ class BuildOrchestrator:
         if not self.wrangler.venv_exists(project_name):
             return False, "No environment exists. Set up the environment first."
         
-        pip_path = self.wrangler.get_pip_path(project_name)
+        python_path = self.wrangler.get_python_path(project_name)
         
-        # Check if PyInstaller is already installed
+        # Check if PyInstaller is already installed (venvs made by uv have no pip)
         try:
             result = subprocess.run(
-                [str(pip_path), "show", "pyinstaller"],
+                [str(python_path), "-m", "PyInstaller", "--version"],
                 capture_output=True,
                 text=True,
                 timeout=30,
@@ -230,19 +231,13 @@ class BuildOrchestrator:
             if result.returncode == 0:
                 return True, "PyInstaller is ready"
             
-            # Not installed, install it
-            result = subprocess.run(
-                [str(pip_path), "install", "pyinstaller"],
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout for install
-                **_subprocess_args()
-            )
+            # Not installed, install it (with the environment's backend)
+            result = self.wrangler.install_packages(project_name, ["pyinstaller"])
             
-            if result.returncode == 0:
+            if result.success:
                 return True, "PyInstaller installed successfully"
             else:
-                return False, f"Failed to install PyInstaller: {result.stderr}"
+                return False, f"Failed to install PyInstaller: {result.details}"
                 
         except subprocess.TimeoutExpired:
             return False, "Timed out installing PyInstaller"
@@ -566,13 +561,7 @@ class BuildOrchestrator:
     
     def _get_dir_size(self, path: Path) -> int:
         """Get total size of a directory."""
-        total = 0
-        try:
-            for item in path.rglob('*'):
-                if item.is_file():
-                    total += item.stat().st_size
-        except Exception:
-            pass
+        total, _ = tree_size(path)
         return total
     
     def format_size(self, size_bytes: int) -> str:
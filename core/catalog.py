@@ -0,0 +1,149 @@
+"""
+Snapshot catalog for TPC.
+
+Listing snapshots used to mean opening every snapshot's _snapshot.json.
+The catalog keeps the same metadata for all of them in one small,
+append-only JSON Lines file: .tpc/snapshots/_catalog.jsonl
+
+Each line is one record:
+    {"op": "add", "name": "2025-01-02_1430_Added-feature", "created": ..., ...}
+    {"op": "remove", "name": "2025-01-02_0900_Initial-version"}
+    {"op": "sync", "dir_mtime_ns": 1735828200000000000}
+
+Replaying the lines gives the current set of snapshots. A "sync" line
+records the snapshots folder's mtime at a moment the catalog was known
+to match it. If the folder has changed since (a snapshot synced in from
+another computer, a folder deleted by hand), the catalog is stale and
+the caller rebuilds it.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+# Catalog file inside .tpc/snapshots/ (names starting with "_" or "." are never snapshots)
+CATALOG_FILE = "_catalog.jsonl"
+
+
+class SnapshotCatalog:
+    """
+    Reads and appends to a project's snapshot catalog.
+
+    Usage:
+        catalog = SnapshotCatalog(project_path / ".tpc" / "snapshots")
+
+        records = catalog.load()  # {name: metadata}, or None if missing/stale
+        catalog.add(name, metadata)
+        catalog.remove(name)
+    """
+
+    def __init__(self, snapshots_dir: Path):
+        self.snapshots_dir = snapshots_dir
+        self.path = snapshots_dir / CATALOG_FILE
+        self._lock = threading.Lock()
+
+    def _snapshot_names(self) -> set[str]:
+        """Names of the snapshot folders actually on disk (one directory listing)."""
+        names = set()
+        with os.scandir(self.snapshots_dir) as it:
+            for entry in it:
+                if not entry.name.startswith(("_", ".")) and entry.is_dir():
+                    names.add(entry.name)
+        return names
+
+    def _read(self) -> Optional[tuple[dict[str, dict], Optional[int], int]]:
+        """Replay the catalog. Returns (records, last synced mtime, line count), or None if unreadable."""
+        records: dict[str, dict] = {}
+        synced_ns = None
+        lines = 0
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    op = record.pop("op")
+                    if op == "add":
+                        records[record["name"]] = record
+                    elif op == "remove":
+                        records.pop(record["name"], None)
+                    elif op == "sync":
+                        synced_ns = record["dir_mtime_ns"]
+                    lines += 1
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # Missing or damaged (e.g. half-written last line) - rebuild
+
+        return records, synced_ns, lines
+
+    def _append(self, *records: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def load(self) -> Optional[dict[str, dict]]:
+        """
+        Return {snapshot name: metadata} if the catalog matches the snapshots folder.
+
+        Returns None if the catalog is missing, damaged or stale.
+        """
+        with self._lock:
+            state = self._read()
+            if state is None:
+                return None
+            records, synced_ns, lines = state
+
+            try:
+                dir_mtime_ns = os.stat(self.snapshots_dir).st_mtime_ns
+                if synced_ns != dir_mtime_ns:
+                    # The folder changed since the last sync. Safety backups and
+                    # the catalog's own rewrites do that too, so compare names
+                    # before declaring it stale.
+                    if self._snapshot_names() != set(records):
+                        return None
+            except OSError:
+                return None
+
+            # Re-stamping and compacting only save work next time. On a
+            # read-only or locked folder the records are still good.
+            try:
+                if synced_ns != dir_mtime_ns:
+                    self._append({"op": "sync", "dir_mtime_ns": dir_mtime_ns})
+                    lines += 1
+                if lines > 2 * len(records) + 50:
+                    self._rewrite(records)
+            except OSError:
+                pass
+
+            return records
+
+    def _rewrite(self, records: dict[str, dict]) -> None:
+        """Replace the catalog with one "add" line per snapshot (lock must be held)."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for name, record in records.items():
+                f.write(json.dumps({"op": "add", **record, "name": name}) + "\n")
+        os.replace(tmp, self.path)
+
+        # Stamp after the rename - replacing the file changes the folder's mtime
+        self._append({"op": "sync", "dir_mtime_ns": os.stat(self.snapshots_dir).st_mtime_ns})
+
+    def rewrite(self, records: dict[str, dict]) -> None:
+        """Replace the whole catalog (after a rebuild)."""
+        with self._lock:
+            self._rewrite(records)
+
+    def add(self, name: str, metadata: dict) -> None:
+        """Record a new (or updated) snapshot."""
+        with self._lock:
+            self._append({"op": "add", **metadata, "name": name})
+        self.load()  # Re-stamp if the catalog now matches the folder
+
+    def remove(self, name: str) -> None:
+        """Record that a snapshot was deleted."""
+        with self._lock:
+            self._append({"op": "remove", "name": name})
+        self.load()
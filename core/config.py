@@ -41,6 +41,9 @@ class TPCConfig:
     # First run completed?
     setup_complete: bool = False
     
+    # How build environments are made: "auto" (uv if installed), "uv" or "pip"
+    env_backend: str = "auto"
+    
     # When config was last modified
     last_modified: str = field(default_factory=lambda: datetime.now().isoformat())
     
@@ -59,6 +62,7 @@ class TPCConfig:
                 "backup_reminder": self.backup_reminder,
                 "last_backup_reminder": self.last_backup_reminder,
                 "setup_complete": self.setup_complete,
+                "env_backend": self.env_backend,
                 "last_modified": self.last_modified,
             }
             
@@ -87,6 +91,7 @@ class TPCConfig:
                 backup_reminder=data.get("backup_reminder", "weekly"),
                 last_backup_reminder=data.get("last_backup_reminder"),
                 setup_complete=data.get("setup_complete", False),
+                env_backend=data.get("env_backend", "auto"),
                 last_modified=data.get("last_modified", datetime.now().isoformat())
             )
         except Exception as e:
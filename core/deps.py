@@ -9,14 +9,40 @@ before their project will run - without them having to think about it.
 """
 
 import ast
+import hashlib
+import multiprocessing
+import os
+import platform
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
 
+from .ignore import IgnoreMatcher
+from .import_cache import IMPORT_CACHE_FILE, ImportCache
+from .import_graph import ImportGraph, build_import_graph
+from .resolver import ModuleResolver
+from .walker import FileEntry, scan_tree
+
+
+# Folders that never contain the project's own source
+SKIP_DIR_PATTERNS = [
+    ".git/", ".tpc/", "__pycache__/", "venv/", ".venv/", "env/", ".env/",
+    "build/", "dist/", ".eggs/", "*.egg-info/", "node_modules/", "TPC Builds/",
+]
+
+
+# Files to parse before a process pool is worth its startup time
+PARALLEL_MIN_FILES = 200
+
+# Files per job sent to a pool worker
+PARSE_BATCH_SIZE = 32
 
 # Python standard library modules (3.10+)
-# This list covers the vast majority - we can expand as needed
+# Scans classify against ModuleResolver's list from the target interpreter;
+# this one is kept for code that imports it and as a readable reference
 STDLIB_MODULES = frozenset({
     # Built-in and core
     "abc", "aifc", "argparse", "array", "ast", "asynchat", "asyncio",
@@ -126,6 +152,7 @@ MACOS_FRAMEWORKS = frozenset({
 
 # Map import names to pip package names where they differ
 # This is critical for packages where "import X" requires "pip install Y"
+# (Installed packages are looked up in the venv first; see ModuleResolver)
 IMPORT_TO_PIP = {
     # Image/Graphics
     "PIL": "Pillow",
@@ -208,6 +235,252 @@ IMPORT_TO_PIP = {
 }
 
 
+# Names that mean "the platform we're running on" in an if-test
+PLATFORM_TESTS = {("sys", "platform"), ("os", "name"), ("platform", "system")}
+
+# Exceptions that catch a failed import
+IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+
+def _is_platform_test(test: ast.expr) -> bool:
+    """Whether an if-test looks at the platform (sys.platform, os.name, platform.system())."""
+    return any(
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and (node.value.id, node.attr) in PLATFORM_TESTS
+        for node in ast.walk(test)
+    )
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    """Whether an if-test is TYPE_CHECKING (or typing.TYPE_CHECKING)."""
+    if isinstance(test, ast.Name):
+        return test.id == "TYPE_CHECKING"
+    return isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+
+
+def _catches_import_error(handler: ast.ExceptHandler) -> bool:
+    """Whether an except clause would catch a failed import."""
+    if handler.type is None:
+        return True  # Bare except
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(
+        (isinstance(t, ast.Name) and t.id in IMPORT_ERRORS)
+        or (isinstance(t, ast.Attribute) and t.attr in IMPORT_ERRORS)
+        for t in types
+    )
+
+
+class _ImportCollector(ast.NodeVisitor):
+    """
+    Collects imports in source order, noting what guards each one.
+    
+    The guard is a dict with only the keys that apply:
+        optional     - inside try/except ImportError; the app copes without it
+        type_only    - inside "if TYPE_CHECKING:"; never imported at runtime
+        in_function  - inside a function; only imported when it's called
+        platform     - the platform test(s) it sits under, as source text
+                       ("sys.platform == 'win32'", "not os.name == 'nt'")
+    """
+    
+    def __init__(self):
+        self.imports = []
+        self.optional = 0
+        self.type_only = 0
+        self.functions = 0
+        self.platform_tests: list[ast.expr] = []
+    
+    def _guard(self) -> dict:
+        guard = {}
+        if self.optional:
+            guard["optional"] = True
+        if self.type_only:
+            guard["type_only"] = True
+        if self.functions:
+            guard["in_function"] = True
+        if self.platform_tests:
+            if len(self.platform_tests) == 1:
+                test = self.platform_tests[0]
+            else:
+                test = ast.BoolOp(op=ast.And(), values=list(self.platform_tests))
+            guard["platform"] = ast.unparse(test)
+        return guard
+    
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append([alias.name.split(".")[0], alias.name, node.lineno, False, [], self._guard()])
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        # Imported names may be submodules ("from app import utils")
+        names = [alias.name for alias in node.names]
+        
+        # node.level > 0 means relative import (from . or from .. etc)
+        if node.level > 0:
+            # Relative import - always local, module marked as "."
+            full = "." * node.level + (node.module or "")
+            self.imports.append([".", full, node.lineno, True, names, self._guard()])
+        elif node.module:
+            # Absolute import: from x.y import z
+            self.imports.append([node.module.split(".")[0], node.module, node.lineno, True, names, self._guard()])
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.functions += 1
+        self.generic_visit(node)
+        self.functions -= 1
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_Try(self, node: ast.Try) -> None:
+        # Only the try body is optional; the except branch is the fallback
+        catches = any(_catches_import_error(handler) for handler in node.handlers)
+        self.optional += catches
+        self._visit_all(node.body)
+        self.optional -= catches
+        self._visit_all(node.handlers)
+        self._visit_all(node.orelse)
+        self._visit_all(node.finalbody)
+    
+    visit_TryStar = visit_Try
+    
+    def visit_If(self, node: ast.If) -> None:
+        if _is_type_checking(node.test):
+            self.type_only += 1
+            self._visit_all(node.body)
+            self.type_only -= 1
+            self._visit_all(node.orelse)
+        elif _is_platform_test(node.test):
+            self.platform_tests.append(node.test)
+            self._visit_all(node.body)
+            self.platform_tests[-1] = ast.UnaryOp(op=ast.Not(), operand=node.test)
+            self._visit_all(node.orelse)
+            self.platform_tests.pop()
+        else:
+            self.generic_visit(node)
+    
+    def _visit_all(self, nodes: list[ast.AST]) -> None:
+        for node in nodes:
+            self.visit(node)
+
+
+def _extract_imports(data: bytes, filename: str) -> list[list]:
+    """
+    Find the imports in one file's contents.
+    
+    Returns [[module, full_import, line_number, is_from_import, names, guard], ...] -
+    plain lists, so they can be cached as JSON and sent between processes.
+    Raises SyntaxError if the file doesn't parse.
+    """
+    source = data.decode("utf-8", errors="replace")
+    tree = ast.parse(source, filename=filename)
+    
+    collector = _ImportCollector()
+    collector.visit(tree)
+    return collector.imports
+
+
+def _evaluate_platform_test(node: ast.expr):
+    """
+    Evaluate a platform test for this machine.
+    
+    Returns None for anything it doesn't understand (other variables,
+    version checks...), so the caller can treat the import as needed.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        values = [_evaluate_platform_test(elt) for elt in node.elts]
+        return None if None in values else tuple(values)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        if (node.value.id, node.attr) == ("sys", "platform"):
+            return sys.platform
+        if (node.value.id, node.attr) == ("os", "name"):
+            return os.name
+        return None
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        func = node.func
+        if isinstance(func.value, ast.Name) and (func.value.id, func.attr) == ("platform", "system"):
+            return platform.system()
+        target = _evaluate_platform_test(func.value)
+        args = [_evaluate_platform_test(arg) for arg in node.args]
+        if isinstance(target, str) and None not in args and func.attr in ("startswith", "endswith", "lower", "upper"):
+            return getattr(target, func.attr)(*args)
+        return None
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        value = _evaluate_platform_test(node.operand)
+        return None if value is None else not value
+    if isinstance(node, ast.BoolOp):
+        values = [_evaluate_platform_test(value) for value in node.values]
+        # Settled by any known value that decides it, unknown otherwise
+        decisive = isinstance(node.op, ast.Or)
+        if any(value is not None and bool(value) == decisive for value in values):
+            return decisive
+        return None if None in values else not decisive
+    if isinstance(node, ast.Compare):
+        left = _evaluate_platform_test(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate_platform_test(comparator)
+            if left is None or right is None:
+                return None
+            if isinstance(op, ast.Eq):
+                holds = left == right
+            elif isinstance(op, ast.NotEq):
+                holds = left != right
+            elif isinstance(op, (ast.In, ast.NotIn)) and isinstance(right, (str, tuple)):
+                holds = (left in right) == isinstance(op, ast.In)
+            else:
+                return None
+            if not holds:
+                return False
+            left = right
+        return True
+    return None
+
+
+def platform_matches(test: str) -> bool:
+    """
+    Whether a platform test from a scanned file holds on this machine.
+    
+    Anything it can't work out counts as a match - better to install a
+    package that isn't needed than to miss one that is.
+    """
+    try:
+        value = _evaluate_platform_test(ast.parse(test, mode="eval").body)
+    except SyntaxError:
+        return True
+    return True if value is None else bool(value)
+
+
+def _parse_file(path: str, known_hash: Optional[str]) -> tuple[Optional[str], Optional[list[list]], Optional[str]]:
+    """
+    Read and parse one file.
+    
+    Returns (content hash, imports, error). imports is None when the hash
+    equals known_hash - the content didn't change, so it wasn't parsed.
+    The hash is None if the file couldn't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return None, [], str(e)
+    
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_hash:
+        return digest, None, None
+    
+    try:
+        return digest, _extract_imports(data, path), None
+    except SyntaxError as e:
+        return digest, [], f"Syntax error: {e}"
+    except Exception as e:
+        return digest, [], str(e)
+
+
+def _parse_batch(batch: list[tuple[str, Optional[str]]]) -> list[tuple]:
+    """Run _parse_file over a batch of (path, known hash) - one pool job."""
+    return [_parse_file(path, known_hash) for path, known_hash in batch]
+
+
 @dataclass
 class ImportInfo:
     """Information about a single import."""
@@ -216,6 +489,20 @@ class ImportInfo:
     source_file: Path     # Which .py file this came from
     line_number: int      # Line number in source
     is_from_import: bool  # True for "from x import y", False for "import x"
+    names: list[str] = field(default_factory=list)  # "y" in "from x import y"
+    
+    # What guards the import (see _ImportCollector)
+    optional: bool = False               # Inside try/except ImportError
+    type_only: bool = False              # Inside "if TYPE_CHECKING:"
+    in_function: bool = False            # Only imported when a function runs
+    platform_test: Optional[str] = None  # e.g. "sys.platform == 'win32'"
+    
+    @property
+    def needed_here(self) -> bool:
+        """False if the import never runs on this machine (type-only, or for another platform)."""
+        if self.type_only:
+            return False
+        return self.platform_test is None or platform_matches(self.platform_test)
 
 
 @dataclass 
@@ -234,6 +521,24 @@ class ScanResult:
     # Local imports (relative imports or project modules)
     local: set[str] = field(default_factory=set)
     
+    # Pip names the target venv reports for installed third-party imports
+    pip_names: dict[str, str] = field(default_factory=dict)
+    
+    # Imports between project modules, from the main file (None without one)
+    graph: Optional[ImportGraph] = None
+    
+    # Third-party imports only in files the main file never reaches
+    unused_third_party: set[str] = field(default_factory=set)
+    
+    # Third-party imports that never run on this machine, with the reason
+    # (type checking only, another platform) - not installed or bundled
+    not_needed: dict[str, str] = field(default_factory=dict)
+    
+    # Third-party imports that are only ever optional (try/except ImportError)
+    # or lazy (inside functions) - still installed, but worth knowing
+    optional: set[str] = field(default_factory=set)
+    lazy: set[str] = field(default_factory=set)
+    
     # Files that couldn't be parsed (syntax errors, etc.)
     errors: dict[Path, str] = field(default_factory=dict)
     
@@ -251,10 +556,22 @@ class ScanResult:
         if self.third_party:
             lines.append(f"\n📦 Third-party packages ({len(self.third_party)}):")
             for pkg in sorted(self.third_party):
-                lines.append(f"   • {pkg}")
+                notes = [note for note, found in (("optional", self.optional), ("lazy", self.lazy)) if pkg in found]
+                lines.append(f"   • {pkg}" + (f" ({', '.join(notes)})" if notes else ""))
         else:
             lines.append("\n✓ No third-party dependencies detected")
         
+        if self.not_needed:
+            lines.append(f"\n⏭️  Not needed on this platform ({len(self.not_needed)}):")
+            for pkg, reason in sorted(self.not_needed.items()):
+                lines.append(f"   • {pkg} ({reason})")
+        
+        if self.unused_third_party:
+            lines.append(
+                f"\n💤 Not used by {self.graph.entry} ({len(self.unused_third_party)}): "
+                f"{', '.join(sorted(self.unused_third_party))}"
+            )
+        
         if self.stdlib:
             lines.append(f"\n📚 Standard library ({len(self.stdlib)}): {', '.join(sorted(self.stdlib))}")
         
@@ -267,12 +584,13 @@ class ScanResult:
         """
         Get the actual pip package names for third-party imports.
         
-        Applies IMPORT_TO_PIP mapping and deduplicates
+        Uses the distribution installed in the venv when the scan found one,
+        otherwise the IMPORT_TO_PIP mapping, and deduplicates
         (e.g., win32api + win32com + pywintypes all become just 'pywin32')
         """
         pip_packages = set()
         for imp in self.third_party:
-            pip_name = IMPORT_TO_PIP.get(imp, imp)
+            pip_name = self.pip_names.get(imp) or IMPORT_TO_PIP.get(imp, imp)
             pip_packages.add(pip_name)
         return pip_packages
 
@@ -285,66 +603,124 @@ class DependencyDetective:
         detective = DependencyDetective()
         result = detective.scan_project(Path("/path/to/project"))
         print(result.third_party)  # {'PyQt6', 'requests', ...}
+    
+    Pass a ModuleResolver for the project's venv to classify against the
+    Python that will run the build rather than the one running TPC.
     """
     
-    def __init__(self):
-        self.stdlib = STDLIB_MODULES
+    def __init__(self, resolver: Optional[ModuleResolver] = None):
+        self.resolver = resolver or ModuleResolver.current()
+        self.stdlib = self.resolver.stdlib
+        self.skip_matcher = IgnoreMatcher(SKIP_DIR_PATTERNS)
     
-    def scan_project(self, project_path: Path, main_file: Optional[str] = None) -> ScanResult:
+    def scan_project(
+        self,
+        project_path: Path,
+        main_file: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> ScanResult:
         """
         Scan a project directory for Python dependencies.
         
         Args:
             project_path: Root directory of the project
-            main_file: Optional main file name to prioritize
+            main_file: Optional main file, relative to project_path. When
+                given, only third-party packages imported by files it can
+                reach (through the project's own imports) are reported
+            use_cache: Reuse imports from .tpc/cache/imports.json for files
+                that haven't changed (TPC projects only)
             
         Returns:
             ScanResult with categorized imports
         """
         result = ScanResult()
         
-        # Find all Python files
-        py_files = list(project_path.rglob("*.py"))
-        
-        # Skip common non-project directories
-        skip_dirs = {".git", ".tpc", "__pycache__", "venv", ".venv",
-                     "env", ".env", "build", "dist", ".eggs", "*.egg-info"}
-        
-        py_files = [
-            f for f in py_files 
-            if not any(skip in f.parts for skip in skip_dirs)
+        # Find all Python files, without walking into venvs and other
+        # non-project directories at all
+        entries = [
+            entry for entry in scan_tree(project_path, self.skip_matcher)
+            if entry.rel_path.endswith(".py")
         ]
+        py_files = [entry.path for entry in entries]
         
         # Collect all local module names (so we can exclude them from third-party)
         local_modules = self._find_local_modules(project_path, py_files)
         
-        # Scan each file
-        for py_file in py_files:
-            try:
-                imports = self._scan_file(py_file)
-                result.scanned_files.append(py_file)
+        # Never create .tpc/ in a folder that isn't a TPC project
+        cache = None
+        if use_cache and (project_path / ".tpc").is_dir():
+            cache = ImportCache(project_path / ".tpc" / IMPORT_CACHE_FILE)
+        
+        # Files whose stat matches the cache aren't read; the rest are parsed
+        records: dict[str, dict] = {}
+        to_parse: list[FileEntry] = []
+        for entry in entries:
+            record = cache.get(entry) if cache is not None else None
+            if record is None:
+                to_parse.append(entry)
+            else:
+                records[entry.rel_path] = record
+        
+        parsed = self._parse_files([
+            (str(entry.path), cache.known_hash(entry) if cache is not None else None)
+            for entry in to_parse
+        ])
+        for entry, (digest, imports, error) in zip(to_parse, parsed):
+            if imports is None:
+                records[entry.rel_path] = cache.get_by_hash(entry, digest)
+            elif digest is not None and cache is not None:
+                records[entry.rel_path] = cache.put(entry, digest, imports, error)
+            else:
+                records[entry.rel_path] = {"imports": imports, "error": error}
+        
+        infos = {
+            entry.rel_path: self._to_import_infos(records[entry.rel_path]["imports"], entry.path)
+            for entry in entries
+            if not records[entry.rel_path]["error"]
+        }
+        
+        # Merge in path order, however the files were parsed
+        for entry in entries:
+            py_file = entry.path
+            record = records[entry.rel_path]
+            if record["error"]:
+                result.errors[py_file] = record["error"]
+                continue
+            
+            result.scanned_files.append(py_file)
+            
+            for imp in infos[entry.rel_path]:
+                # Add to the full imports dict
+                if imp.module not in result.imports:
+                    result.imports[imp.module] = []
+                result.imports[imp.module].append(imp)
                 
-                for imp in imports:
-                    # Add to the full imports dict
-                    if imp.module not in result.imports:
-                        result.imports[imp.module] = []
-                    result.imports[imp.module].append(imp)
-                    
-                    # Categorize
-                    if imp.module in self.stdlib:
-                        result.stdlib.add(imp.module)
-                    elif imp.module in MACOS_FRAMEWORKS:
-                        # Skip macOS frameworks - they come from pyobjc, not pip directly
-                        pass
-                    elif imp.module in local_modules or imp.full_import.startswith("."):
-                        result.local.add(imp.module)
-                    else:
-                        result.third_party.add(imp.module)
-                        
-            except SyntaxError as e:
-                result.errors[py_file] = f"Syntax error: {e}"
-            except Exception as e:
-                result.errors[py_file] = str(e)
+                self._categorize(result, imp, local_modules)
+        
+        if cache is not None:
+            cache.save()
+        
+        # Keep only what the main file can reach. Without a parseable main
+        # file there's no graph, and every file counts as before.
+        if main_file:
+            # Imports that never run here don't pull in project modules either
+            runtime_infos = {
+                rel_path: [imp for imp in file_infos if imp.needed_here]
+                for rel_path, file_infos in infos.items()
+            }
+            result.graph = build_import_graph(runtime_infos, Path(main_file).as_posix())
+        if result.graph is not None:
+            reachable = result.graph.reachable_files()
+            used = set()
+            for rel_path in reachable:
+                used.update(imp.module for imp in infos[rel_path])
+            result.unused_third_party = result.third_party - used
+            result.third_party &= used
+            for module in result.unused_third_party:
+                result.pip_names.pop(module, None)
+            self._apply_guards(result, [imp for rel_path in reachable for imp in infos[rel_path]])
+        else:
+            self._apply_guards(result, [imp for file_infos in infos.values() for imp in file_infos])
         
         return result
     
@@ -361,16 +737,10 @@ class DependencyDetective:
                     result.imports[imp.module] = []
                 result.imports[imp.module].append(imp)
                 
-                if imp.module in self.stdlib:
-                    result.stdlib.add(imp.module)
-                elif imp.module in MACOS_FRAMEWORKS:
-                    # Skip macOS frameworks - they come from pyobjc, not pip directly
-                    pass
-                elif imp.full_import.startswith("."):
-                    result.local.add(imp.module)
-                else:
-                    # Can't know for sure if it's local without project context
-                    result.third_party.add(imp.module)
+                # Can't know for sure if it's local without project context
+                self._categorize(result, imp, set())
+            
+            self._apply_guards(result, imports)
                     
         except SyntaxError as e:
             result.errors[file_path] = f"Syntax error: {e}"
@@ -379,50 +749,89 @@ class DependencyDetective:
         
         return result
     
+    def _categorize(self, result: ScanResult, imp: ImportInfo, local_modules: set[str]) -> None:
+        """File one import under stdlib, local or third-party."""
+        if self.resolver.is_stdlib(imp.module):
+            result.stdlib.add(imp.module)
+        elif imp.module in MACOS_FRAMEWORKS:
+            # Skip macOS frameworks - they come from pyobjc, not pip directly
+            pass
+        elif imp.module in local_modules or imp.full_import.startswith("."):
+            result.local.add(imp.module)
+        else:
+            result.third_party.add(imp.module)
+            pip_name = self.resolver.pip_name(imp.module)
+            if pip_name:
+                result.pip_names[imp.module] = pip_name
+    
+    def _apply_guards(self, result: ScanResult, imports: list[ImportInfo]) -> None:
+        """
+        Drop third-party packages whose every import is guarded away on this
+        machine, and note the ones that are only optional or lazy.
+        """
+        needed = {}
+        reasons = {}
+        for imp in imports:
+            if imp.module not in result.third_party:
+                continue
+            if imp.type_only:
+                reasons.setdefault(imp.module, "type checking only")
+            elif not imp.needed_here:
+                reasons[imp.module] = f"only when {imp.platform_test}"
+            else:
+                needed.setdefault(imp.module, []).append(imp)
+        
+        for module in result.third_party - set(needed):
+            result.not_needed[module] = reasons[module]
+            result.pip_names.pop(module, None)
+        result.third_party = set(needed)
+        result.optional = {m for m, imps in needed.items() if all(imp.optional for imp in imps)}
+        result.lazy = {m for m, imps in needed.items() if all(imp.in_function for imp in imps)}
+    
+    def _parse_files(self, batch: list[tuple[str, Optional[str]]]) -> list[tuple]:
+        """
+        Run _parse_file over (path, known hash) pairs; results come back in the same order.
+        
+        Parsing is CPU-bound, so threads wouldn't help. Big scans are split
+        into batches across a process pool instead; small ones (and any
+        pool failure) run right here.
+        """
+        workers = min(8, os.cpu_count() or 1)
+        if workers > 1 and len(batch) >= PARALLEL_MIN_FILES:
+            batches = [batch[i:i + PARSE_BATCH_SIZE] for i in range(0, len(batch), PARSE_BATCH_SIZE)]
+            try:
+                # Spawned, not forked: forking a process that's running Qt
+                # threads can deadlock. Frozen builds get their workers
+                # through multiprocessing.freeze_support() in main.py.
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    return [parsed for results in pool.map(_parse_batch, batches) for parsed in results]
+            except (OSError, BrokenProcessPool, RuntimeError):
+                pass  # No subprocesses here (sandbox, odd frozen setup) - parse serially
+        
+        return _parse_batch(batch)
+    
+    @staticmethod
+    def _to_import_infos(imports: list[list], file_path: Path) -> list[ImportInfo]:
+        return [
+            ImportInfo(
+                module=module,
+                full_import=full_import,
+                source_file=file_path,
+                line_number=line_number,
+                is_from_import=is_from_import,
+                names=names,
+                optional=guard.get("optional", False),
+                type_only=guard.get("type_only", False),
+                in_function=guard.get("in_function", False),
+                platform_test=guard.get("platform"),
+            )
+            for module, full_import, line_number, is_from_import, names, guard in imports
+        ]
+    
     def _scan_file(self, file_path: Path) -> list[ImportInfo]:
         """Parse a Python file and extract all imports."""
-        imports = []
-        
-        source = file_path.read_text(encoding="utf-8", errors="replace")
-        tree = ast.parse(source, filename=str(file_path))
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    module = self._get_top_level_module(alias.name)
-                    imports.append(ImportInfo(
-                        module=module,
-                        full_import=alias.name,
-                        source_file=file_path,
-                        line_number=node.lineno,
-                        is_from_import=False
-                    ))
-                    
-            elif isinstance(node, ast.ImportFrom):
-                # node.level > 0 means relative import (from . or from .. etc)
-                if node.level > 0:
-                    # Relative import - always local
-                    prefix = "." * node.level
-                    full = prefix + (node.module or "")
-                    imports.append(ImportInfo(
-                        module=".",  # Mark as relative
-                        full_import=full,
-                        source_file=file_path,
-                        line_number=node.lineno,
-                        is_from_import=True
-                    ))
-                elif node.module:
-                    # Absolute import: from x.y import z
-                    module = self._get_top_level_module(node.module)
-                    imports.append(ImportInfo(
-                        module=module,
-                        full_import=node.module,
-                        source_file=file_path,
-                        line_number=node.lineno,
-                        is_from_import=True
-                    ))
-        
-        return imports
+        return self._to_import_infos(_extract_imports(file_path.read_bytes(), str(file_path)), file_path)
     
     def _get_top_level_module(self, module_name: str) -> str:
         """Extract the top-level module from a dotted path."""
@@ -607,9 +1016,14 @@ if __name__ == "__main__":
         path = Path(__file__).parent.parent
     
     print(f"Scanning: {path}\n")
-    result = detective.scan_project(path)
+    main_file = sys.argv[2] if len(sys.argv) > 2 else None
+    result = detective.scan_project(path, main_file)
     print(result.summary())
     
+    if result.graph is not None:
+        print("\n--- Import graph ---")
+        print(result.graph.format_tree(result.third_party))
+    
     print("\n--- Pip packages needed ---")
     for pkg in sorted(result.get_pip_packages()):
         print(f"  {pkg}")
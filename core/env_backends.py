@@ -0,0 +1,166 @@
+"""
+Environment backends for TPC's Environment Wrangler.
+
+A backend knows the commands that create a venv and install packages into
+it, and how to read progress from their output. EnvironmentWrangler runs
+them and keeps everything else (timeouts, progress reports, results) the
+same whichever backend does the work.
+
+- PipBackend: python -m venv and pip. Works wherever Python does.
+- UvBackend: uv (https://docs.astral.sh/uv/). Resolves and downloads in
+  parallel and installs from its global cache, so setting up an
+  environment takes seconds instead of tens of seconds.
+
+Which one is used comes from "env_backend" in ~/.tpc/config.json:
+"auto" (uv when it's installed, pip otherwise), "uv" or "pip". A venv
+stays with the backend that created it - uv's have no pip inside.
+"""
+
+import re
+import shutil
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from .config import get_config
+
+
+# pip output lines that mark progress on a requested package
+PIP_COLLECTING = re.compile(r"^Collecting ([A-Za-z0-9][A-Za-z0-9._-]*)")
+PIP_PROCESSING = re.compile(r"^Processing (?:.*[/\\])?([A-Za-z0-9][A-Za-z0-9._]*)-\d")  # Local wheel or sdist
+PIP_SATISFIED = re.compile(r"^Requirement already satisfied: ([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+# uv output lines that mark progress on a package
+UV_DOWNLOADING = re.compile(r"^\s*Downloading ([A-Za-z0-9][A-Za-z0-9._-]*)")
+UV_INSTALLED = re.compile(r"^\s*\+ ([A-Za-z0-9][A-Za-z0-9._-]*)==")
+
+# Where uv's installers put it, for when TPC is started without a shell PATH
+UV_LOCATIONS = [
+    Path.home() / ".local" / "bin",
+    Path.home() / ".cargo" / "bin",
+    Path("/opt/homebrew/bin"),
+    Path("/usr/local/bin"),
+]
+
+
+class EnvironmentBackend(ABC):
+    """The commands behind EnvironmentWrangler's create_venv and install_packages."""
+
+    name = ""
+
+    # Whether installing needs pip inside the venv
+    uses_pip = False
+
+    @abstractmethod
+    def create_command(self, python_exe: str, venv_path: Path) -> list[str]:
+        """Command that creates a venv at venv_path from python_exe."""
+
+    def setup_commands(self, python_path: Path, pip_path: Path) -> list[list[str]]:
+        """Best-effort commands to run in a freshly created venv."""
+        return []
+
+    @abstractmethod
+    def install_command(self, python_path: Path, pip_path: Path, args: list[str]) -> list[str]:
+        """Command that installs args (package names, or "-r", file) into the venv."""
+
+    @abstractmethod
+    def freeze_command(self, python_path: Path, pip_path: Path) -> list[str]:
+        """Command that lists the venv's packages as "name==version" lines."""
+
+    def parse_progress(self, line: str) -> Optional[tuple[str, str]]:
+        """
+        Read one line of install output.
+
+        Returns (package name, status) for lines about a package, where
+        status is 'installing', 'installed' or 'already installed'.
+        """
+        return None
+
+
+class PipBackend(EnvironmentBackend):
+    """python -m venv, then pip."""
+
+    name = "pip"
+    uses_pip = True
+
+    def create_command(self, python_exe: str, venv_path: Path) -> list[str]:
+        return [python_exe, "-m", "venv", str(venv_path)]
+
+    def setup_commands(self, python_path: Path, pip_path: Path) -> list[list[str]]:
+        # Upgrade pip to avoid warnings
+        return [[str(pip_path), "install", "--upgrade", "pip"]]
+
+    def install_command(self, python_path: Path, pip_path: Path, args: list[str]) -> list[str]:
+        return [str(pip_path), "install", *args]
+
+    def freeze_command(self, python_path: Path, pip_path: Path) -> list[str]:
+        return [str(pip_path), "freeze"]
+
+    def parse_progress(self, line: str) -> Optional[tuple[str, str]]:
+        match = PIP_COLLECTING.match(line) or PIP_PROCESSING.match(line)
+        if match:
+            return match.group(1), 'installing'
+        match = PIP_SATISFIED.match(line)
+        if match:
+            return match.group(1), 'already installed'
+        return None
+
+
+class UvBackend(EnvironmentBackend):
+    """uv venv, then uv pip install."""
+
+    name = "uv"
+
+    def __init__(self, uv_path: str):
+        self.uv_path = uv_path
+
+    def create_command(self, python_exe: str, venv_path: Path) -> list[str]:
+        # No pip inside - uv installs from outside the venv
+        return [self.uv_path, "venv", "--python", python_exe, str(venv_path)]
+
+    def install_command(self, python_path: Path, pip_path: Path, args: list[str]) -> list[str]:
+        return [self.uv_path, "pip", "install", "--python", str(python_path), *args]
+
+    def freeze_command(self, python_path: Path, pip_path: Path) -> list[str]:
+        return [self.uv_path, "pip", "freeze", "--python", str(python_path)]
+
+    def parse_progress(self, line: str) -> Optional[tuple[str, str]]:
+        match = UV_DOWNLOADING.match(line)
+        if match:
+            return match.group(1), 'installing'
+        match = UV_INSTALLED.match(line)
+        if match:
+            return match.group(1), 'installed'
+        return None
+
+
+def find_uv() -> Optional[str]:
+    """Path to the uv executable, or None if it isn't installed."""
+    found = shutil.which("uv")
+    if found:
+        return found
+
+    exe = "uv.exe" if sys.platform == "win32" else "uv"
+    for folder in UV_LOCATIONS:
+        if (folder / exe).is_file():
+            return str(folder / exe)
+    return None
+
+
+def get_backend(name: Optional[str] = None) -> EnvironmentBackend:
+    """
+    Get the environment backend to use.
+
+    Args:
+        name: "auto", "uv" or "pip"; None reads "env_backend" from the
+            app config. uv falls back to pip when it isn't installed.
+    """
+    if name is None:
+        name = get_config().env_backend
+
+    if name != "pip":
+        uv_path = find_uv()
+        if uv_path:
+            return UvBackend(uv_path)
+    return PipBackend()
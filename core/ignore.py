@@ -0,0 +1,121 @@
+"""
+Ignore-pattern matching for TPC.
+
+Snapshots, the secrets scan and the dependency scan all need to skip
+things like venv/, node_modules/ and *.pyc. IgnoreMatcher compiles a
+pattern list once into a handful of regexes and sets. The tree walker
+(core/walker.py) uses it to prune ignored folders before descending into
+them - so a project with a 50,000-file venv costs one check for "venv",
+not 50,000.
+
+Pattern rules (a simplified .gitignore):
+- "name/"      matches directories with that name at any depth
+- "name"       matches files or directories with that name at any depth
+- "a/b" "a/b/" contain a slash, so they're anchored to the project root
+- "/name" "/name/" a leading slash anchors a single name the same way
+- Wildcards (*, ?, [abc]) work anywhere, as in fnmatch
+- Backslashes are treated as forward slashes, so Windows paths work too
+- Case only matters where the file system cares about it: "Thumbs.db"
+  matches "thumbs.db" on Windows, as fnmatch does there
+"""
+
+import fnmatch
+import os
+import re
+from typing import Iterable, Optional
+
+
+_WILDCARD_CHARS = set("*?[")
+
+# Whether paths differ only by case on this OS (Windows)
+_CASE_INSENSITIVE = os.path.normcase("A") == "a"
+
+
+def _compile(patterns: list[str], ignore_case: bool) -> Optional[re.Pattern]:
+    """Compile fnmatch-style patterns into one alternation regex."""
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), flags)
+
+
+class IgnoreMatcher:
+    """
+    A compiled set of ignore patterns.
+
+    Usage:
+        matcher = IgnoreMatcher(["venv/", "*.pyc", "docs/build/"])
+
+        matcher.is_ignored("venv", is_dir=True)         # True
+        matcher.is_ignored("src/app.pyc")               # True
+        matcher.is_ignored_path("venv/lib/site.py")     # True (checks parents)
+
+        for entry in scan_tree(project_path, matcher):
+            ...
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), ignore_case: bool = _CASE_INSENSITIVE):
+        self.patterns = [p.replace("\\", "/") for p in patterns if p and p.strip()]
+        self.ignore_case = ignore_case
+
+        # Four buckets: (directories only | files and directories) x (by name | by anchored path)
+        buckets: dict[tuple[bool, bool], list[str]] = {
+            (True, False): [], (True, True): [], (False, False): [], (False, True): [],
+        }
+        for pattern in self.patterns:
+            dir_only = pattern.endswith("/")
+            anchored = "/" in pattern.rstrip("/")
+            pattern = pattern.strip("/")
+            if not pattern:
+                continue
+            buckets[(dir_only, anchored)].append(pattern)
+
+        # Plain names are the common case - a set lookup beats any regex
+        dir_names = {p for p in buckets[(True, False)] if not _WILDCARD_CHARS & set(p)}
+        any_names = {p for p in buckets[(False, False)] if not _WILDCARD_CHARS & set(p)}
+        self._dir_names = {p.lower() for p in dir_names} if ignore_case else dir_names
+        self._any_names = {p.lower() for p in any_names} if ignore_case else any_names
+
+        self._dir_name_re = _compile([p for p in buckets[(True, False)] if p not in dir_names], ignore_case)
+        self._any_name_re = _compile([p for p in buckets[(False, False)] if p not in any_names], ignore_case)
+        self._dir_path_re = _compile(buckets[(True, True)], ignore_case)
+        self._any_path_re = _compile(buckets[(False, True)], ignore_case)
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a single entry, assuming its parent folders aren't ignored.
+
+        Args:
+            rel_path: Path relative to the project root, "/"-separated
+            is_dir: Whether the entry is a directory
+        """
+        name = rel_path.rsplit("/", 1)[-1]
+        key = name.lower() if self.ignore_case else name
+
+        if key in self._any_names:
+            return True
+        if self._any_name_re and self._any_name_re.match(name):
+            return True
+        if self._any_path_re and self._any_path_re.match(rel_path):
+            return True
+
+        if is_dir:
+            if key in self._dir_names:
+                return True
+            if self._dir_name_re and self._dir_name_re.match(name):
+                return True
+            if self._dir_path_re and self._dir_path_re.match(rel_path):
+                return True
+
+        return False
+
+    def is_ignored_path(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check a path, including whether any of its parent folders are ignored."""
+        parts = rel_path.replace("\\", "/").strip("/").split("/")
+
+        for i in range(1, len(parts)):
+            if self.is_ignored("/".join(parts[:i]), is_dir=True):
+                return True
+
+        return self.is_ignored("/".join(parts), is_dir=is_dir)
+
@@ -0,0 +1,140 @@
+"""
+Import cache for TPC's dependency scanner.
+
+Finding a project's imports means reading and parsing every .py file,
+and the Pack screen rescans every time it's opened. Most files haven't
+changed since the last scan, so their imports are kept in
+.tpc/cache/imports.json:
+
+    {"version": 3, "written_ns": ...,
+     "files": {"app/main.py": {"size": ..., "mtime_ns": ..., "hash": ...,
+                               "imports": [[module, full_import, line, is_from, names, guard], ...],
+                               "error": null}}}
+
+A file whose size and mtime still match isn't opened at all. One whose
+stat changed is read and hashed, and only parsed again if the content
+really is different (a touch, a checkout of the same version...).
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from .walker import FileEntry
+
+
+# Cache file inside the project's .tpc/ folder
+IMPORT_CACHE_FILE = "cache/imports.json"
+
+# Bump when the shape of a cached import changes
+CACHE_VERSION = 3
+
+# Files modified this close to the last save may have changed again within
+# the same mtime tick, so their stat alone isn't trusted (2 seconds covers FAT)
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class ImportCache:
+    """
+    Remembers each file's imports between dependency scans.
+
+    Usage:
+        cache = ImportCache(project_path / ".tpc" / IMPORT_CACHE_FILE)
+
+        record = cache.get(entry)                  # Stat matches - no read
+        record = cache.get_by_hash(entry, digest)  # Same content, new stat
+        digest = cache.known_hash(entry)           # To compare before parsing
+        cache.put(entry, digest, imports, error)
+        cache.save()
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._files: dict[str, dict] = {}
+        self._seen: set[str] = set()
+        self._written_ns = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION and isinstance(data.get("files"), dict):
+                self._files = data["files"]
+                self._written_ns = data.get("written_ns", 0)
+        except (OSError, ValueError, AttributeError):
+            pass  # Missing or damaged - everything gets parsed once
+
+    def get(self, entry: FileEntry) -> Optional[dict]:
+        """Return the cached record for a file whose size and mtime haven't changed."""
+        self._seen.add(entry.rel_path)
+        record = self._files.get(entry.rel_path)
+        if record is None or (record["size"], record["mtime_ns"]) != (entry.size, entry.mtime_ns):
+            return None
+        if entry.mtime_ns >= self._written_ns - RACY_WINDOW_NS:
+            self._dirty = True  # Saving again moves the window past it
+            return None  # Too close to the last save to trust the mtime
+        return record
+
+    def known_hash(self, entry: FileEntry) -> Optional[str]:
+        """The content hash cached for a file's path, whatever its stat."""
+        record = self._files.get(entry.rel_path)
+        return record["hash"] if record else None
+
+    def get_by_hash(self, entry: FileEntry, digest: str) -> Optional[dict]:
+        """Return the cached record for a file whose stat changed but whose content didn't."""
+        self._seen.add(entry.rel_path)
+        record = self._files.get(entry.rel_path)
+        if record is None or record["hash"] != digest:
+            return None
+        if (record["size"], record["mtime_ns"]) != (entry.size, entry.mtime_ns):
+            record["size"], record["mtime_ns"] = entry.size, entry.mtime_ns
+            self._dirty = True
+        return record
+
+    def put(self, entry: FileEntry, digest: str, imports: list[list], error: Optional[str] = None) -> dict:
+        """Store a freshly parsed file's imports. Returns the record."""
+        self._seen.add(entry.rel_path)
+        record = {
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "hash": digest,
+            "imports": imports,
+            "error": error,
+        }
+        self._files[entry.rel_path] = record
+        self._dirty = True
+        return record
+
+    def save(self) -> None:
+        """
+        Write the cache, dropping files this scan didn't see (deleted, renamed).
+
+        Best effort - without a cache the next scan just parses everything.
+        """
+        gone = set(self._files) - self._seen
+        for rel_path in gone:
+            del self._files[rel_path]
+
+        if not self._dirty and not gone:
+            return
+
+        data = {
+            "version": CACHE_VERSION,
+            "written_ns": time.time_ns(),
+            "files": self._files,
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._written_ns = data["written_ns"]
+            self._dirty = False
+        except OSError:
+            pass
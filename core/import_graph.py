@@ -0,0 +1,186 @@
+"""
+Import graph for TPC's dependency scanner.
+
+A project folder often holds more than the app itself: test scripts, old
+experiments, vendored examples. Their imports shouldn't end up in the
+build's venv. The graph follows imports from the main file through the
+project's own modules and packages (absolute and relative imports both),
+so a scan can report just the packages the app can actually reach.
+
+Modules are named the way Python sees them when it runs the main file:
+relative to the main file's folder (sys.path[0]) first, then to the
+project root.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .deps import ImportInfo
+
+
+@dataclass
+class ImportGraph:
+    """
+    Which project modules import which, starting from the main file.
+
+    Usage:
+        graph = build_import_graph(imports_by_file, "main.py")
+
+        graph.reachable_files()       # {"main.py", "app/__init__.py", ...}
+        graph.importers("requests")   # ["app.net"] - why it's needed
+        print(graph.format_tree())
+    """
+    entry: str                                                   # Module name of the main file
+    files: dict[str, str] = field(default_factory=dict)          # Module name -> relative path
+    edges: dict[str, set[str]] = field(default_factory=dict)     # Module -> project modules it imports
+    external: dict[str, set[str]] = field(default_factory=dict)  # Module -> other top-level modules it imports
+    reachable: set[str] = field(default_factory=set)
+
+    def reachable_files(self) -> set[str]:
+        """Relative paths of the files the main file can reach."""
+        return {self.files[module] for module in self.reachable}
+
+    def reachable_external(self) -> set[str]:
+        """Top-level modules outside the project imported by reachable files."""
+        found = set()
+        for module in self.reachable:
+            found |= self.external.get(module, set())
+        return found
+
+    def importers(self, top_level: str) -> list[str]:
+        """Reachable project modules that import a top-level module."""
+        return sorted(m for m in self.reachable if top_level in self.external.get(m, ()))
+
+    def format_tree(self, packages: Optional[set[str]] = None) -> str:
+        """
+        Indented tree of project modules from the main file.
+
+        Modules already shown aren't expanded again (imports can be
+        circular). With packages, each module also lists which of those
+        it imports.
+        """
+        lines = []
+        shown = set()
+
+        def visit(module: str, depth: int) -> None:
+            indent = "    " * depth
+            if module in shown:
+                lines.append(f"{indent}{module} ...")
+                return
+            shown.add(module)
+            lines.append(f"{indent}{module}")
+            if packages:
+                for package in sorted(self.external.get(module, set()) & packages):
+                    lines.append(f"{indent}    📦 {package}")
+            for child in sorted(self.edges.get(module, ())):
+                visit(child, depth + 1)
+
+        visit(self.entry, 0)
+        return "\n".join(lines)
+
+
+def _module_names(rel_paths: list[str], roots: list[str]) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Name each file as an importable module.
+
+    Returns (module name -> path, path -> module name). A file under
+    more than one root keeps the name from the first; files whose path
+    isn't a valid module name ("old scripts/x.py") can't be imported and
+    are left out.
+    """
+    by_name = {}
+    by_path = {}
+    for root in roots:
+        for rel in rel_paths:
+            if not rel.startswith(root):
+                continue
+            parts = rel[len(root):-len(".py")].split("/")
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            if not parts or not all(part.isidentifier() for part in parts):
+                continue
+            name = ".".join(parts)
+            by_name.setdefault(name, rel)
+            by_path.setdefault(rel, name)
+    return by_name, by_path
+
+
+def _import_targets(module: str, is_package: bool, imp: "ImportInfo") -> tuple[list[str], bool]:
+    """
+    Module names one import statement may load.
+
+    Returns (candidates, is_relative): every package on the way down plus
+    each "from x import name" that may be a submodule. Only candidates
+    that are project files matter to the caller.
+    """
+    full = imp.full_import
+    is_relative = full.startswith(".")
+    if is_relative:
+        level = len(full) - len(full.lstrip("."))
+        package = module.split(".") if is_package else module.split(".")[:-1]
+        if level - 1 > len(package):
+            return [], True  # Goes above the top-level package - fails at runtime
+        parts = package[:len(package) - (level - 1)]
+        if full[level:]:
+            parts += full[level:].split(".")
+    else:
+        parts = full.split(".")
+
+    candidates = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    prefix = ".".join(parts) + "." if parts else ""
+    candidates += [prefix + name for name in imp.names if name != "*"]
+    return candidates, is_relative
+
+
+def build_import_graph(imports: dict[str, list["ImportInfo"]], main_file: str) -> Optional[ImportGraph]:
+    """
+    Build the import graph of a project from its main file.
+
+    Args:
+        imports: Each parsed .py file's imports, keyed by "/"-separated
+            path relative to the project root
+        main_file: The entry point, relative to the project root
+
+    Returns:
+        ImportGraph, or None if main_file isn't among the parsed files
+    """
+    main_dir = main_file.rpartition("/")[0]
+    roots = [main_dir + "/", ""] if main_dir else [""]
+    by_name, by_path = _module_names(sorted(imports), roots)
+    if main_file not in by_path:
+        return None
+
+    # Top-level names the project provides, including folders without __init__.py
+    local_top = {name.split(".")[0] for name in by_name}
+
+    graph = ImportGraph(entry=by_path[main_file])
+    for rel, file_imports in imports.items():
+        module = by_path.get(rel)
+        if module is None:
+            continue
+        graph.files[module] = rel
+        is_package = rel.endswith("/__init__.py") or rel == "__init__.py"
+        edges = graph.edges.setdefault(module, set())
+        external = graph.external.setdefault(module, set())
+
+        for imp in file_imports:
+            candidates, is_relative = _import_targets(module, is_package, imp)
+            for candidate in candidates:
+                target = by_name.get(candidate)
+                # A module's own packages are always loaded before it
+                if target is not None and not module.startswith(candidate + ".") and target != rel:
+                    edges.add(by_path[target])
+            if not is_relative and imp.module not in local_top:
+                external.add(imp.module)
+
+    queue = deque([graph.entry])
+    graph.reachable.add(graph.entry)
+    while queue:
+        for child in graph.edges.get(queue.popleft(), ()):
+            if child not in graph.reachable:
+                graph.reachable.add(child)
+                queue.append(child)
+
+    return graph
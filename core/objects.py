@@ -0,0 +1,657 @@
+"""
+Content-addressed object store for TPC snapshots.
+
+Instead of copying every file into every snapshot folder, files are stored
+once under .tpc/objects/, named by the SHA-256 of their contents. A snapshot
+then only needs a manifest that says which blob each path points at, so a
+file that didn't change between versions costs zero bytes and zero copy time.
+
+Layout: .tpc/objects/ab/cdef0123...  (first two hex chars fan out the folder)
+
+Blobs are written once and never modified. They're marked read-only so a
+hardlinked "browse" folder can't be used to edit history by accident.
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import errno
+import functools
+import hashlib
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from .chunking import CHUNKING_THRESHOLD, iter_chunks
+
+
+# Read/write block size for hashing and copying
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# A chunked file's digest names a "<digest>.chunks" list instead of a blob
+CHUNK_LIST_SUFFIX = ".chunks"
+
+# Bytes per in-kernel copy call (copy_file_range / sendfile)
+KERNEL_CHUNK_SIZE = 8 * CHUNK_SIZE
+
+# Errors that mean "the OS can't do an in-kernel copy between these files"
+# rather than a real I/O failure - fall back to a plain read/write loop.
+_NO_KERNEL_COPY = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EBADF, errno.ENOTSOCK,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL), getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def copy_and_hash(src: Path, dest: Path, progress: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Copy a file and hash it in a single read pass.
+
+    Copies metadata like shutil.copy2 does. Returns the SHA-256 hex digest.
+    progress, if given, is called with the byte count of each block written.
+    """
+    digest = hashlib.sha256()
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+            digest.update(block)
+            fdest.write(block)
+            if progress:
+                progress(len(block))
+    shutil.copystat(src, dest)
+    return digest.hexdigest()
+
+
+def _kernel_copy(copy_chunk, fsrc: BinaryIO, fdest: BinaryIO, progress) -> bool:
+    """
+    Copy a whole file with an in-kernel copy call.
+
+    Returns False (having written nothing) if the OS won't do it for these
+    two files, so the caller can fall back to another method.
+    """
+    in_fd, out_fd = fsrc.fileno(), fdest.fileno()
+    offset = 0
+
+    while True:
+        try:
+            sent = copy_chunk(in_fd, out_fd, offset)
+        except OSError as e:
+            if offset == 0 and e.errno in _NO_KERNEL_COPY:
+                return False
+            raise
+
+        if sent == 0:
+            return True
+
+        offset += sent
+        if progress:
+            progress(sent)
+
+
+def copy_data(src: Path, dest: Path, progress: Optional[Callable[[int], None]] = None) -> None:
+    """
+    Copy a file's contents, keeping the data in the kernel where possible.
+
+    Tries os.copy_file_range (which can reflink or copy server-side on
+    filesystems that support it), then os.sendfile, then a plain
+    read/write loop. progress is called with byte counts as data is copied.
+    """
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        if hasattr(os, "copy_file_range"):
+            # Offsets of None use (and advance) each file's position
+            if _kernel_copy(lambda i, o, _: os.copy_file_range(i, o, KERNEL_CHUNK_SIZE), fsrc, fdest, progress):
+                return
+
+        if hasattr(os, "sendfile"):
+            # File-to-file works on Linux; macOS wants a socket and says ENOTSOCK
+            if _kernel_copy(lambda i, o, offset: os.sendfile(o, i, offset, KERNEL_CHUNK_SIZE), fsrc, fdest, progress):
+                return
+
+        for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+            fdest.write(block)
+            if progress:
+                progress(len(block))
+
+
+def copy_file(src: Path, dest: Path, progress: Optional[Callable[[int], None]] = None) -> None:
+    """Copy a file's contents and metadata, like shutil.copy2 (see copy_data)."""
+    copy_data(src, dest, progress)
+    shutil.copystat(src, dest)
+
+
+# How files get into a snapshot, best first
+COPY_MODE_REFLINK = "reflink"    # Copy-on-write clone: instant, no space used until edited
+COPY_MODE_HARDLINK = "hardlink"  # Shared inode: only for files that never change again
+COPY_MODE_COPY = "copy"          # Plain byte copy
+COPY_MODES = (COPY_MODE_REFLINK, COPY_MODE_HARDLINK, COPY_MODE_COPY)
+
+# ioctl that clones one file into another on btrfs, XFS and friends (linux/fs.h)
+_FICLONE = 0x40049409
+
+_clonefile = None
+if sys.platform == "darwin":
+    try:
+        _clonefile = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True).clonefile
+    except (OSError, AttributeError):
+        _clonefile = None
+
+
+def reflink(src: Path, dest: Path) -> bool:
+    """
+    Clone a file copy-on-write (FICLONE on Linux, clonefile() on macOS/APFS).
+
+    The clone shares blocks with the source until either is modified, so
+    it's instant and takes no space. Returns False if the filesystem
+    can't do it; dest is left absent in that case.
+    """
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+
+    if _clonefile is not None:
+        return _clonefile(os.fsencode(src), os.fsencode(dest), 0) == 0
+
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+            fcntl.ioctl(fdest.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+        return False
+
+
+# Detected copy mode per (source device, destination device)
+_copy_modes: dict[tuple[int, int], str] = {}
+_copy_modes_lock = threading.Lock()
+
+
+def detect_copy_mode(src_dir: Path, dest_dir: Path) -> str:
+    """
+    Work out the cheapest safe way to copy files from src_dir to dest_dir.
+
+    Probes with a scratch file in dest_dir the first time each pair of
+    volumes is seen; after that the answer comes from memory.
+    Returns one of COPY_MODES.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        key = (os.stat(src_dir).st_dev, os.stat(dest_dir).st_dev)
+    except OSError:
+        return COPY_MODE_COPY
+
+    with _copy_modes_lock:
+        if key in _copy_modes:
+            return _copy_modes[key]
+
+        mode = COPY_MODE_COPY
+        if key[0] == key[1]:  # Neither clones nor links cross volumes
+            probe = dest_dir / f".tpc-probe-{uuid.uuid4().hex}"
+            clone = probe.with_name(probe.name + "-clone")
+            try:
+                probe.write_bytes(b"tpc")
+                if reflink(probe, clone):
+                    mode = COPY_MODE_REFLINK
+                else:
+                    os.link(probe, clone)
+                    mode = COPY_MODE_HARDLINK
+            except OSError:
+                pass
+            finally:
+                for path in (clone, probe):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+
+        _copy_modes[key] = mode
+        return mode
+
+
+def clone_or_copy(
+    src: Path,
+    dest: Path,
+    copy_mode: str = COPY_MODE_COPY,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """
+    Copy a file and its metadata, as a reflink when copy_mode allows it.
+
+    Hardlink mode is treated as a plain copy: the result is a separate
+    file the user can edit.
+    """
+    if copy_mode == COPY_MODE_REFLINK and reflink(src, dest):
+        shutil.copystat(src, dest)
+        return
+    copy_file(src, dest, progress)
+
+
+def fsync_path(path: Path) -> None:
+    """
+    Flush a file or folder to disk (best effort).
+
+    Folders can't be opened on Windows; its renames are already durable
+    once they return, so folders are skipped there.
+    """
+    if os.name == "nt":
+        if os.path.isdir(path):
+            return
+        flags = os.O_RDWR | getattr(os, "O_BINARY", 0)
+    else:
+        flags = os.O_RDONLY
+
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _clear_readonly(func, path, exc_info):
+    """shutil.rmtree error handler that retries after clearing read-only bits."""
+    try:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        func(path)
+    except Exception:
+        pass
+
+
+def rmtree(path: Path) -> None:
+    """
+    Remove a directory tree, including read-only blobs and hardlinks to them.
+
+    Windows refuses to delete read-only files, so plain shutil.rmtree
+    fails on anything that came out of the object store.
+    """
+    shutil.rmtree(path, onerror=_clear_readonly)
+
+
+class ChunkedReader(io.RawIOBase):
+    """
+    Reads a chunked file by streaming its chunks one after another.
+
+    Each item of `opens` opens one chunk (a blob, a bundle member...) when
+    the reader gets to it.
+    """
+
+    def __init__(self, opens: list[Callable[[], BinaryIO]]):
+        super().__init__()
+        self._opens = iter(opens)
+        self._current: Optional[BinaryIO] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self._current is None:
+                open_chunk = next(self._opens, None)
+                if open_chunk is None:
+                    return 0
+                self._current = open_chunk()
+
+            count = self._current.readinto(buffer)
+            if count:
+                return count
+            self._current.close()
+            self._current = None
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
+
+
+class ObjectStore:
+    """
+    Stores file contents by hash under a project's .tpc/objects/ folder.
+
+    Files of CHUNKING_THRESHOLD or more are stored as content-defined chunks
+    (see core/chunking.py): each chunk is a blob of its own, and the file's
+    digest maps to a "<digest>.chunks" list instead of one big blob. Callers
+    don't see the difference - open() and materialize() reassemble it.
+
+    Usage:
+        store = ObjectStore(project_path / ".tpc" / "objects")
+
+        digest = store.put_file(Path("main.py"))
+        store.materialize(digest, Path("restored/main.py"))
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._tmp_dir = root / "tmp"
+
+    def object_path(self, digest: str) -> Path:
+        """Where the blob for a digest lives (whether or not it exists)."""
+        return self.root / digest[:2] / digest[2:]
+
+    def chunk_list_path(self, digest: str) -> Path:
+        """Where the chunk list for a chunked file's digest lives."""
+        return self.root / digest[:2] / (digest[2:] + CHUNK_LIST_SUFFIX)
+
+    def has(self, digest: str) -> bool:
+        """Check if a blob (or chunked file) is already stored."""
+        return self.object_path(digest).is_file() or self.chunk_list_path(digest).is_file()
+
+    def chunks(self, digest: str) -> Optional[list[str]]:
+        """The chunk digests of a chunked file, in order, or None if it's a single blob."""
+        try:
+            with open(self.chunk_list_path(digest)) as f:
+                return [chunk for chunk, _size in json.load(f)["chunks"]]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _new_tmp(self) -> Path:
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self._tmp_dir / f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex}"
+
+    def _install(self, tmp: Path, final: Path) -> None:
+        """
+        Move a finished temp file into place as a read-only blob.
+
+        If the same content got there first (another thread or snapshot),
+        the temp file is just dropped.
+        """
+        fsync_path(tmp)  # On disk before it has its real name
+
+        if final.exists():
+            tmp.unlink()
+            return
+
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(tmp, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        try:
+            os.replace(tmp, final)
+            fsync_path(final.parent)
+        except OSError:
+            # Lost a race with another thread storing the same content
+            # (Windows won't replace the read-only blob it just wrote)
+            if not final.exists():
+                raise
+            os.chmod(tmp, stat.S_IWRITE | stat.S_IREAD)
+            tmp.unlink()
+
+    def _discard(self, tmp: Path) -> None:
+        if tmp.exists():
+            try:
+                os.chmod(tmp, stat.S_IWRITE | stat.S_IREAD)
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def _put_chunked(self, fsrc: BinaryIO, progress: Optional[Callable[[int], None]] = None) -> str:
+        """Store a big file as content-defined chunks and return the whole file's digest."""
+        file_digest = hashlib.sha256()
+        chunks = []
+
+        for data in iter_chunks(fsrc):
+            file_digest.update(data)
+            chunk_digest = hashlib.sha256(data).hexdigest()
+            chunks.append([chunk_digest, len(data)])
+
+            if not self.object_path(chunk_digest).is_file():
+                tmp = self._new_tmp()
+                try:
+                    with open(tmp, "wb") as fdest:
+                        fdest.write(data)
+                    self._install(tmp, self.object_path(chunk_digest))
+                except Exception:
+                    self._discard(tmp)
+                    raise
+
+            if progress:
+                progress(len(data))
+
+        digest = file_digest.hexdigest()
+        tmp = self._new_tmp()
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"size": sum(size for _chunk, size in chunks), "chunks": chunks}, f)
+            self._install(tmp, self.chunk_list_path(digest))
+        except Exception:
+            self._discard(tmp)
+            raise
+        return digest
+
+    def put_file(
+        self,
+        src: Path,
+        digest: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        clone: bool = False,
+    ) -> str:
+        """
+        Store a file's contents and return its digest.
+
+        If the digest is already known and the blob exists, nothing is read
+        or written. Otherwise the file is copied to a temp name while being
+        hashed, then renamed into place so a half-written blob never exists.
+        With clone, the temp copy is a reflink and only the hashing reads data.
+        Big files are always stored as chunks, cloning or not, so versions
+        of them share their unchanged parts.
+
+        Safe to call from several threads at once.
+        """
+        if digest and self.has(digest):
+            return digest
+
+        tmp = self._new_tmp()
+
+        try:
+            if os.path.getsize(src) >= CHUNKING_THRESHOLD:
+                with open(src, "rb") as fsrc:
+                    return self._put_chunked(fsrc, progress)
+            elif clone and reflink(src, tmp):
+                digest = hash_file(tmp)  # Hash the clone - it can't change under us
+            else:
+                digest = copy_and_hash(src, tmp, progress)
+
+            if self.has(digest):
+                tmp.unlink()  # Someone else stored the same content first
+            else:
+                self._install(tmp, self.object_path(digest))
+            return digest
+        except Exception:
+            self._discard(tmp)
+            raise
+
+    def put_stream(
+        self,
+        fsrc: BinaryIO,
+        size: int,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """
+        Store contents read from a stream (e.g. a ZIP member) and return the digest.
+
+        size decides between chunks and a single blob, as for put_file.
+        """
+        if size >= CHUNKING_THRESHOLD:
+            return self._put_chunked(fsrc, progress)
+
+        tmp = self._new_tmp()
+        try:
+            digest = hashlib.sha256()
+            with open(tmp, "wb") as fdest:
+                for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                    digest.update(block)
+                    fdest.write(block)
+                    if progress:
+                        progress(len(block))
+            digest = digest.hexdigest()
+
+            if self.has(digest):
+                tmp.unlink()
+            else:
+                self._install(tmp, self.object_path(digest))
+            return digest
+        except Exception:
+            self._discard(tmp)
+            raise
+
+    def open(self, digest: str) -> BinaryIO:
+        """Open a blob (or reassembled chunked file) for reading."""
+        chunks = None if self.object_path(digest).is_file() else self.chunks(digest)
+        if chunks is None:
+            return open(self.object_path(digest), "rb")
+        return io.BufferedReader(
+            ChunkedReader([functools.partial(open, self.object_path(chunk), "rb") for chunk in chunks]), CHUNK_SIZE
+        )
+
+    def materialize(
+        self,
+        digest: str,
+        dest: Path,
+        use_hardlink: bool = False,
+        mtime_ns: Optional[int] = None,
+        mode: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        use_reflink: bool = False,
+    ) -> None:
+        """
+        Write a blob out to a regular path.
+
+        Args:
+            digest: Blob to write
+            dest: Destination file path (parents are created)
+            use_hardlink: Link to the blob instead of copying. Only for
+                read-only views - the result shares the blob's inode.
+            mtime_ns: Modification time to stamp on the copy
+            mode: Permission bits to apply to the copy
+            progress: Called with byte counts as data is copied
+            use_reflink: Clone the blob copy-on-write if the volume allows it
+        """
+        src = self.object_path(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+
+        if not src.is_file() and self.chunks(digest) is not None:
+            # Chunked - stream the chunks back into one file
+            with self.open(digest) as fsrc, open(dest, "wb") as fdest:
+                for block in iter(lambda: fsrc.read(CHUNK_SIZE), b""):
+                    fdest.write(block)
+                    if progress:
+                        progress(len(block))
+        else:
+            if use_hardlink:
+                try:
+                    os.link(src, dest)
+                    return
+                except OSError:
+                    pass  # Cross-device or unsupported - fall back to a copy
+
+            if not (use_reflink and reflink(src, dest)):
+                copy_data(src, dest, progress)
+
+        if mode is None:
+            # A clone carries the blob's read-only bits; a copy gets the default
+            os.chmod(dest, stat.S_IMODE(os.stat(dest).st_mode) | stat.S_IWRITE)
+        else:
+            os.chmod(dest, mode)
+        if mtime_ns is not None:
+            os.utime(dest, ns=(mtime_ns, mtime_ns))
+
+    def iter_digests(self) -> Iterator[str]:
+        """Yield the digest of every stored blob and chunked file."""
+        if not self.root.exists():
+            return
+
+        for fan_dir in self.root.iterdir():
+            if len(fan_dir.name) != 2 or not fan_dir.is_dir():
+                continue  # Skip tmp/ and anything unexpected
+            for blob in fan_dir.iterdir():
+                yield fan_dir.name + blob.name.removesuffix(CHUNK_LIST_SUFFIX)
+
+    def remove(self, digest: str) -> int:
+        """Delete a blob or chunk list (not the chunks). Returns the number of bytes freed."""
+        freed = 0
+        for path in (self.object_path(digest), self.chunk_list_path(digest)):
+            try:
+                size = path.stat().st_size
+                os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+                path.unlink()
+                freed += size
+            except OSError:
+                pass
+        return freed
+
+    def clean_tmp(self, max_age: float) -> int:
+        """Delete temp files older than max_age seconds (left by a crash). Returns how many."""
+        removed = 0
+        cutoff = time.time() - max_age
+        try:
+            with os.scandir(self._tmp_dir) as it:
+                for entry in it:
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.chmod(entry.path, stat.S_IWRITE | stat.S_IREAD)
+                            os.unlink(entry.path)
+                            removed += 1
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return removed
+
+    def prune(
+        self,
+        keep: set[str],
+        may_remove: Optional[Callable[[str], bool]] = None,
+        lock: Optional[threading.Lock] = None,
+    ) -> tuple[int, int]:
+        """
+        Delete every blob whose digest isn't in `keep`.
+
+        Chunks of kept chunked files are kept too. With may_remove, each
+        blob is only deleted if it still says yes; lock is held around
+        that check and the delete.
+
+        Returns (blobs_removed, bytes_freed).
+        """
+        removed = 0
+        freed = 0
+
+        keep = set(keep)
+        for digest in list(keep):
+            keep.update(self.chunks(digest) or ())
+
+        for digest in set(self.iter_digests()):
+            if digest in keep:
+                continue
+            with lock or contextlib.nullcontext():
+                if may_remove and not may_remove(digest):
+                    continue
+                freed += self.remove(digest)
+            removed += 1
+
+        return removed, freed
@@ -11,12 +11,25 @@ The user sees their code + version history. That's it.
 
 import json
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Optional
-
-from .snapshots import SnapshotManager, Snapshot, SnapshotResult
+from typing import Callable, Iterable, Optional
+
+from .ignore import IgnoreMatcher
+from .retention import DEFAULT_RETENTION, RetentionPolicy
+from .snapshots import (
+    CleanupResult,
+    Snapshot,
+    SnapshotDiff,
+    SnapshotManager,
+    SnapshotResult,
+    TransferCallback,
+    VerifyResult,
+    read_bundle,
+)
+from .walker import find_dirs_named
 
 
 def _subprocess_args() -> dict:
@@ -39,6 +52,19 @@ DEFAULT_PROJECTS_ROOT = Path.home() / "TPC Projects"
 TPC_CONFIG_DIR = Path.home() / ".tpc"
 KNOWN_PROJECTS_FILE = TPC_CONFIG_DIR / "known_projects.json"
 
+# Folders that can't contain projects, skipped when searching for them.
+# "snapshots/" keeps us from finding projects inside snapshot backups.
+PROJECT_SEARCH_SKIP = [
+    ".git/", "__pycache__/", "node_modules/", "venv/", ".venv/", "snapshots/",
+]
+
+# Project settings that travel with exported versions (see export_versions).
+# Machine-specific ones - GitHub repo, icon path - stay behind.
+BUNDLE_SETTINGS = (
+    "main_file", "description", "python_version", "project_type", "launch_command",
+    "ignore_patterns", "snapshot_limit", "snapshot_storage", "snapshot_retention",
+)
+
 # Old config locations (for migration) - DEPRECATED, kept for reference only
 OLD_DEFAULT_ROOT = Path.home() / "Documents" / "TPC Projects"
 
@@ -87,7 +113,7 @@ def remove_from_tpc(path: Path) -> tuple[bool, str]:
     Deletes .tpc/ folder and removes from registry.
     Does NOT touch source files.
     """
-    import shutil
+    from .objects import rmtree
     
     tpc_dir = path / ".tpc"
     
@@ -95,7 +121,7 @@ def remove_from_tpc(path: Path) -> tuple[bool, str]:
         unregister_project_path(path)
         
         if tpc_dir.exists():
-            shutil.rmtree(tpc_dir)
+            rmtree(tpc_dir)  # Handles read-only object store blobs
             return True, f"Removed '{path.name}' from TPC. Your files are still there."
         else:
             return True, f"Removed '{path.name}' from TPC registry."
@@ -178,7 +204,11 @@ class Project:
     created: str = field(default_factory=lambda: datetime.now().isoformat())
     github_repo: Optional[str] = None
     icon_path: Optional[str] = None  # Persisted icon path
-    snapshot_limit: int = 10
+    snapshot_limit: int = 10  # Always keep at least this many recent snapshots
+    snapshot_retention: Optional[dict] = field(default_factory=lambda: dict(DEFAULT_RETENTION))  # None = count limit only
+    snapshot_storage: str = "folder"  # "folder" (full copies), "objects" (deduplicated) or "archive" (compressed)
+    auto_save: bool = False  # Take a snapshot on its own after files change
+    auto_save_delay: int = 30  # Seconds without changes before an auto-save
     ignore_patterns: list[str] = field(default_factory=list)
     project_type: str = "python"  # "python" or "folder"
     launch_command: Optional[str] = None  # Custom launch command (for folder projects)
@@ -191,7 +221,12 @@ class Project:
     def snapshot_manager(self) -> SnapshotManager:
         """Get or create the snapshot manager for this project."""
         if self._snapshot_manager is None:
-            self._snapshot_manager = SnapshotManager(self.path, self.snapshot_limit)
+            self._snapshot_manager = SnapshotManager(
+                self.path,
+                self.snapshot_limit,
+                storage=self.snapshot_storage,
+                retention=RetentionPolicy.from_config(self.snapshot_retention, keep_last=self.snapshot_limit),
+            )
             if self.ignore_patterns:
                 self._snapshot_manager.set_custom_ignores(self.ignore_patterns)
         return self._snapshot_manager
@@ -221,16 +256,15 @@ class Project:
         """
         Check if there are changes since the last snapshot.
         
-        For now, this always returns True if no snapshots exist,
-        or False if snapshots exist (user should check history).
-        
-        A more sophisticated implementation could compare file
-        modification times against the latest snapshot.
+        Compares the working tree against the stat index the last snapshot
+        left in .tpc/, hashing only files whose size/mtime changed.
+        Projects whose snapshots predate the index report True only if
+        there are no snapshots at all.
         """
-        # Simple implementation: if snapshots exist, we can't easily detect changes
-        # without doing a full file comparison. Just return False.
-        # The UI will always allow saving a new version.
-        return not self.has_snapshots
+        changed = self.snapshot_manager.has_changes()
+        if changed is None:
+            return not self.has_snapshots
+        return changed
     
     def save_config(self) -> None:
         """Save project configuration to .tpc/project.json."""
@@ -245,6 +279,10 @@ class Project:
             "github_repo": self.github_repo,
             "icon_path": self.icon_path,
             "snapshot_limit": self.snapshot_limit,
+            "snapshot_storage": self.snapshot_storage,
+            "snapshot_retention": self.snapshot_retention,
+            "auto_save": self.auto_save,
+            "auto_save_delay": self.auto_save_delay,
             "ignore_patterns": self.ignore_patterns,
             "project_type": self.project_type,
             "launch_command": self.launch_command,
@@ -275,6 +313,11 @@ class Project:
             github_repo=config.get("github_repo"),
             icon_path=config.get("icon_path"),
             snapshot_limit=config.get("snapshot_limit", 10),
+            snapshot_storage=config.get("snapshot_storage", "folder"),
+            # Projects from before retention policies keep their count limit
+            snapshot_retention=config.get("snapshot_retention"),
+            auto_save=config.get("auto_save", False),
+            auto_save_delay=config.get("auto_save_delay", 30),
             ignore_patterns=config.get("ignore_patterns", []),
             project_type=config.get("project_type", "python"),
             launch_command=config.get("launch_command"),
@@ -411,6 +454,7 @@ if __name__ == "__main__":
         main_file: str = "main.py",
         description: str = "",
         project_type: str = "python",
+        initial_snapshot: bool = True,
     ) -> "Project":
         """
         Import an existing project folder into TPC management.
@@ -421,6 +465,7 @@ if __name__ == "__main__":
             main_file: Main file (for Python projects)
             description: Project description
             project_type: "python" or "folder"
+            initial_snapshot: Save a first version of the folder as it is
         """
         if not folder.is_dir():
             raise ValueError(f"Not a directory: {folder}")
@@ -442,23 +487,84 @@ if __name__ == "__main__":
         register_project_path(folder)
         
         # Create initial snapshot
-        project.save_version("Imported into TPC")
+        if initial_snapshot:
+            project.save_version("Imported into TPC")
+        
+        return project
+    
+    @classmethod
+    def import_bundle(
+        cls,
+        bundle: Path,
+        folder: Path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> "Project":
+        """
+        Recreate a project from a bundle made by export_versions.
+        
+        The project gets the bundle's settings and versions, and its files
+        are restored from the newest version.
+        
+        Args:
+            bundle: The .tpcbundle file
+            folder: Where the project goes (created if needed)
+        """
+        settings = read_bundle(bundle)["project"]
+        folder.mkdir(parents=True, exist_ok=True)
+        
+        project = cls.import_existing(
+            folder,
+            settings.get("name") or folder.name,
+            main_file=settings.get("main_file", "main.py"),
+            description=settings.get("description", ""),
+            project_type=settings.get("project_type", "python"),
+            initial_snapshot=False,
+        )
+        for key in BUNDLE_SETTINGS:
+            if key in settings:
+                setattr(project, key, settings[key])
+        project.save_config()
+        
+        result = project.import_versions(bundle, progress_callback)
+        if not result.success:
+            raise ValueError(result.message)
+        
+        history = project.get_version_history()
+        if history:
+            result = project.restore_version(history[0], progress_callback)
+            if not result.success:
+                raise ValueError(result.message)
         
         return project
     
     # === Version Management (Snapshots) ===
     
-    def save_version(self, note: str = "") -> SnapshotResult:
+    def save_version(
+        self,
+        note: str = "",
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        changed_paths: Optional[Iterable[str]] = None,
+        skip_unchanged: bool = False,
+    ) -> SnapshotResult:
         """
         Save the current state as a new version (snapshot).
         
         Args:
             note: Optional description for this version
+            progress_callback: Optional callback for progress messages
+            transfer_callback: Optional callback for (files_done, total_files, bytes_done, total_bytes)
+            cancel_event: Set it to cancel the save
+            changed_paths: Paths known to have changed (skips the full scan)
+            skip_unchanged: Save nothing if no file changed since the last version
             
         Returns:
             SnapshotResult with success status
         """
-        return self.snapshot_manager.create_snapshot(note)
+        return self.snapshot_manager.create_snapshot(
+            note, progress_callback, transfer_callback, cancel_event, changed_paths, skip_unchanged
+        )
     
     def get_version_history(self) -> list[Snapshot]:
         """
@@ -468,13 +574,103 @@ if __name__ == "__main__":
         """
         return self.snapshot_manager.list_snapshots()
     
-    def restore_version(self, snapshot: Snapshot) -> SnapshotResult:
+    def restore_version(
+        self,
+        snapshot: Snapshot,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> SnapshotResult:
         """
         Restore to a previous version.
         
-        Creates a safety backup first, then restores.
+        Creates a safety backup first, then restores. Cancelling puts the
+        current files back.
         """
-        return self.snapshot_manager.restore_snapshot(snapshot)
+        return self.snapshot_manager.restore_snapshot(
+            snapshot,
+            progress_callback,
+            transfer_callback=transfer_callback,
+            cancel_event=cancel_event,
+        )
+    
+    def restore_files(
+        self,
+        snapshot: Snapshot,
+        paths: list[str],
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> SnapshotResult:
+        """
+        Restore just some files or folders from a version.
+        
+        Everything else in the project stays as it is. Each file that gets
+        overwritten is backed up first.
+        """
+        return self.snapshot_manager.restore_paths(
+            snapshot,
+            paths,
+            progress_callback,
+            transfer_callback=transfer_callback,
+            cancel_event=cancel_event,
+        )
+    
+    def get_version_files(self, snapshot: Snapshot) -> list[str]:
+        """List the files in a version (relative paths with "/")."""
+        return self.snapshot_manager.snapshot_files(snapshot)
+    
+    def verify_version(
+        self,
+        snapshot: Snapshot,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> VerifyResult:
+        """Check a version's files against the checksums saved with it."""
+        return self.snapshot_manager.verify(snapshot, progress_callback)
+    
+    def clean_up_versions(self) -> CleanupResult:
+        """Remove unused objects, old safety backups and unfinished snapshots."""
+        return self.snapshot_manager.gc()
+    
+    def export_versions(
+        self,
+        snapshots: list[Snapshot],
+        dest: Path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+    ) -> SnapshotResult:
+        """
+        Save versions to one portable .tpcbundle file.
+        
+        Files shared between the versions are stored once. The bundle
+        carries the project's settings, so Project.import_bundle can
+        recreate the project elsewhere.
+        """
+        settings = {key: getattr(self, key) for key in ("name", *BUNDLE_SETTINGS)}
+        return self.snapshot_manager.export_bundle(
+            snapshots, dest, settings, progress_callback, transfer_callback
+        )
+    
+    def import_versions(
+        self,
+        bundle: Path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+    ) -> SnapshotResult:
+        """
+        Add the versions in a .tpcbundle file to this project's history.
+        
+        Versions it already has are skipped. The project's files aren't changed.
+        """
+        return self.snapshot_manager.import_bundle(bundle, progress_callback, transfer_callback)
+    
+    def compare_versions(self, old: Snapshot, new: Optional[Snapshot] = None) -> SnapshotDiff:
+        """
+        See what changed between two versions.
+        
+        Leave out `new` to compare against the current files.
+        """
+        return self.snapshot_manager.diff(old, new)
     
     def get_snapshot_count(self) -> tuple[int, int]:
         """Get (current_count, max_count) for snapshots."""
@@ -593,11 +789,6 @@ def find_tpc_projects(root: Optional[Path] = None, use_cache: bool = True) -> li
     projects = []
     seen_paths = set()  # Store resolved (real) paths to avoid duplicates
 
-    def is_inside_snapshots(path: Path) -> bool:
-        """Check if a path is inside a snapshots directory."""
-        path_str = str(path)
-        return '/snapshots/' in path_str or '\\snapshots\\' in path_str
-
     def get_real_path(path: Path) -> Path:
         """Resolve symlinks to get the canonical path."""
         try:
@@ -607,12 +798,9 @@ def find_tpc_projects(root: Optional[Path] = None, use_cache: bool = True) -> li
 
     # Only search configured root (removed OLD_DEFAULT_ROOT double-scan)
     if root.exists():
-        for tpc_dir in root.rglob(".tpc"):
-            # Skip if this is inside a snapshots folder
-            if is_inside_snapshots(tpc_dir):
-                continue
-
-            if tpc_dir.is_dir() and (tpc_dir / "project.json").exists():
+        # Doesn't descend into .tpc folders, venvs or snapshot backups
+        for tpc_dir in find_dirs_named(root, ".tpc", IgnoreMatcher(PROJECT_SEARCH_SKIP)):
+            if (tpc_dir / "project.json").exists():
                 project_path = tpc_dir.parent
                 real_path = get_real_path(project_path)
 
@@ -0,0 +1,192 @@
+"""
+Module resolver for TPC's dependency scanner.
+
+Deciding whether "import x" is the standard library, and which pip
+package provides it, used to rely only on hand-kept lists in deps.py.
+Those drift: modules leave the stdlib (distutils in 3.12), and many
+packages install under a different import name. The resolver asks the
+interpreter that will actually run the build instead:
+
+- sys.stdlib_module_names, for the standard library
+- importlib.metadata.packages_distributions() in the project's venv,
+  for which installed distribution provides each import
+
+Both are cached under ~/.tpc/cache/ so a scan never waits on them:
+the stdlib list per Python version, the distributions per venv until
+its site-packages changes. The lists in deps.py remain the fallback for
+anything the runtime data doesn't cover (packages not installed yet).
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+# Where resolver tables are cached
+RESOLVER_CACHE_DIR = Path.home() / ".tpc" / "cache" / "resolver"
+
+# Run inside the target interpreter to read its tables in one go
+_PROBE = (
+    "import importlib.metadata, json, sys; "
+    "print(json.dumps({"
+    "'version': '%d.%d.%d' % sys.version_info[:3], "
+    "'stdlib': sorted(set(sys.stdlib_module_names) | set(sys.builtin_module_names)), "
+    "'distributions': importlib.metadata.packages_distributions()"
+    "}))"
+)
+
+
+def _subprocess_args() -> dict:
+    """Keep console windows from popping up on Windows (frozen builds)."""
+    kwargs = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = 0x08000000
+    return kwargs
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Best effort - without a cache the tables are just read again next time."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _venv_version(venv_path: Path) -> Optional[str]:
+    """The venv's Python version from pyvenv.cfg (no need to start Python)."""
+    try:
+        with open(venv_path / "pyvenv.cfg", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return ".".join(value.strip().split(".")[:3])
+    except OSError:
+        pass
+    return None
+
+
+def _site_packages(venv_path: Path) -> Optional[Path]:
+    """The venv's site-packages folder (Lib/ on Windows, lib/pythonX.Y/ elsewhere)."""
+    candidates = [venv_path / "Lib" / "site-packages", *sorted(venv_path.glob("lib/python*/site-packages"))]
+    for path in candidates:
+        if path.is_dir():
+            return path
+    return None
+
+
+@dataclass
+class ModuleResolver:
+    """
+    Classifies top-level import names for one target interpreter.
+
+    Usage:
+        resolver = ModuleResolver.for_venv(venv_path)  # or ModuleResolver.current()
+
+        resolver.is_stdlib("tomllib")   # True on 3.11+
+        resolver.pip_name("yaml")       # "PyYAML" if it's installed in the venv
+    """
+    stdlib: frozenset[str]
+    distributions: dict[str, list[str]] = field(default_factory=dict)  # Import name -> distribution names
+    python_version: str = ""
+
+    @classmethod
+    def current(cls) -> "ModuleResolver":
+        """Resolver for the interpreter running TPC (no installed-package data)."""
+        return cls(
+            stdlib=frozenset(sys.stdlib_module_names) | frozenset(sys.builtin_module_names),
+            python_version="%d.%d.%d" % sys.version_info[:3],
+        )
+
+    @classmethod
+    def for_venv(cls, venv_path: Path, python_path: Optional[Path] = None) -> "ModuleResolver":
+        """
+        Resolver for a project's venv, from the disk cache when it's still valid.
+
+        Falls back to current() if the venv doesn't exist or can't be asked.
+        """
+        if python_path is None:
+            python_path = venv_path / ("Scripts/python.exe" if sys.platform == "win32" else "bin/python")
+        version = _venv_version(venv_path)
+        site_packages = _site_packages(venv_path)
+        if not python_path.exists() or version is None or site_packages is None:
+            return cls.current()
+
+        try:
+            site_mtime_ns = site_packages.stat().st_mtime_ns
+        except OSError:
+            return cls.current()
+
+        stdlib_file = RESOLVER_CACHE_DIR / f"stdlib-{version}.json"
+        dists_file = RESOLVER_CACHE_DIR / "distributions" / f"{venv_path.name}.json"
+
+        stdlib = _read_json(stdlib_file)
+        dists = _read_json(dists_file)
+        # A package installed or removed changes site-packages' mtime
+        if dists is not None and (dists.get("venv") != str(venv_path) or dists.get("site_mtime_ns") != site_mtime_ns):
+            dists = None
+
+        if stdlib is None or dists is None:
+            probed = cls._probe(python_path)
+            if probed is None:
+                return cls.current()
+
+            version = probed["version"]
+            stdlib = {"version": version, "modules": probed["stdlib"]}
+            dists = {"venv": str(venv_path), "site_mtime_ns": site_mtime_ns, "distributions": probed["distributions"]}
+            _write_json(RESOLVER_CACHE_DIR / f"stdlib-{version}.json", stdlib)
+            _write_json(dists_file, dists)
+
+        return cls(
+            stdlib=frozenset(stdlib["modules"]),
+            distributions=dists["distributions"],
+            python_version=version,
+        )
+
+    @staticmethod
+    def _probe(python_path: Path) -> Optional[dict]:
+        """Ask an interpreter for its stdlib names and installed distributions."""
+        try:
+            result = subprocess.run(
+                [str(python_path), "-c", _PROBE],
+                capture_output=True,
+                text=True,
+                timeout=30,
+                **_subprocess_args()
+            )
+            if result.returncode == 0:
+                return json.loads(result.stdout)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            pass
+        return None  # Python older than 3.10, broken venv...
+
+    def is_stdlib(self, module: str) -> bool:
+        """Whether a top-level module ships with the target Python."""
+        return module in self.stdlib
+
+    def pip_name(self, module: str) -> Optional[str]:
+        """
+        The distribution that provides a top-level module in the venv.
+
+        None if it isn't installed there, or if several distributions share
+        the name (namespace packages like "google") - no single answer.
+        """
+        dists = self.distributions.get(module)
+        if dists and len(set(dists)) == 1:
+            return dists[0]
+        return None
@@ -0,0 +1,103 @@
+"""
+Snapshot retention for TPC.
+
+Deleting the oldest snapshot whenever a count limit is hit means a busy
+afternoon of saves pushes out all of last week. A generational policy
+thins history out with age instead:
+
+- Every snapshot from today
+- The newest snapshot of each day for the past week
+- The newest snapshot of each week for the past month
+- And always the N most recent, however old they are
+
+Configured per project in .tpc/project.json:
+
+    "snapshot_retention": {"keep_all_days": 1, "daily_days": 7, "weekly_weeks": 4}
+
+Set it to null to go back to keeping only the newest `snapshot_limit`.
+Projects saved before this setting existed have no entry and keep their
+count limit (keep_last = snapshot_limit).
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .snapshots import Snapshot
+
+
+# What new projects get in project.json
+DEFAULT_RETENTION = {"keep_all_days": 1, "daily_days": 7, "weekly_weeks": 4}
+
+
+@dataclass
+class RetentionPolicy:
+    """Which snapshots to keep as they age."""
+    keep_all_days: int = 1  # Keep everything from the last N calendar days (1 = today)
+    daily_days: int = 7  # Then the newest snapshot per day, for N days
+    weekly_weeks: int = 4  # Then the newest snapshot per week, for N weeks
+    keep_last: int = 10  # Always keep the N newest snapshots
+
+    @classmethod
+    def from_config(cls, config: Optional[dict], keep_last: int = 10) -> "RetentionPolicy":
+        """
+        Build a policy from project.json's "snapshot_retention".
+
+        None means count-only retention: just the newest `keep_last`.
+        """
+        if config is None:
+            return cls(keep_all_days=0, daily_days=0, weekly_weeks=0, keep_last=keep_last)
+
+        return cls(
+            keep_all_days=int(config.get("keep_all_days", DEFAULT_RETENTION["keep_all_days"])),
+            daily_days=int(config.get("daily_days", DEFAULT_RETENTION["daily_days"])),
+            weekly_weeks=int(config.get("weekly_weeks", DEFAULT_RETENTION["weekly_weeks"])),
+            keep_last=keep_last,
+        )
+
+    def to_config(self) -> dict:
+        """The project.json form (keep_last comes from snapshot_limit)."""
+        config = asdict(self)
+        del config["keep_last"]
+        return config
+
+    def select_expired(self, snapshots: list["Snapshot"], now: Optional[datetime] = None) -> list["Snapshot"]:
+        """
+        Return the snapshots this policy no longer keeps, oldest first.
+
+        The newest snapshot is never expired.
+        """
+        now = now or datetime.now()
+        today = now.date()
+        keep_all_since = today - timedelta(days=self.keep_all_days - 1) if self.keep_all_days > 0 else None
+        daily_since = today - timedelta(days=self.daily_days)
+        weekly_since = today - timedelta(weeks=self.weekly_weeks)
+
+        seen_days = set()
+        seen_weeks = set()
+        expired = []
+
+        for i, snapshot in enumerate(sorted(snapshots, key=lambda s: s.created, reverse=True)):
+            day = snapshot.created.date()
+            week = day.isocalendar()[:2]  # (ISO year, ISO week)
+
+            if i < max(self.keep_last, 1):
+                keep = True
+            elif keep_all_since is not None and day >= keep_all_since:
+                keep = True
+            elif self.daily_days > 0 and day > daily_since and day not in seen_days:
+                keep = True
+            elif self.weekly_weeks > 0 and day > weekly_since and week not in seen_weeks:
+                keep = True
+            else:
+                keep = False
+
+            # Kept snapshots (for any reason) fill their day and week
+            if keep:
+                seen_days.add(day)
+                seen_weeks.add(week)
+            else:
+                expired.append(snapshot)
+
+        return list(reversed(expired))
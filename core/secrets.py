@@ -13,6 +13,9 @@ from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 
+from .ignore import IgnoreMatcher
+from .walker import scan_tree
+
 
 @dataclass
 class SecretFinding:
@@ -85,7 +88,7 @@ SENSITIVE_PATTERNS = [
     (r".*\.bak$", "Backup file - may contain old secrets", "low"),
 ]
 
-# Directories to skip entirely
+# Names to skip entirely - files with these names too, so a .env file isn't reported
 SKIP_DIRECTORIES = {
     ".git", ".tpc", "__pycache__", "node_modules",
     "venv", ".venv", "env", ".env",  # virtual environments, not .env files
@@ -108,58 +111,16 @@ def scan_for_secrets(
         List of SecretFinding objects for files that might contain secrets
     """
     findings = []
-    ignore_patterns = ignore_patterns or []
-    
-    def should_ignore(path: Path) -> bool:
-        """Check if a path should be ignored."""
-        rel_path = str(path.relative_to(project_path))
-        
-        for pattern in ignore_patterns:
-            # Simple glob-style matching
-            if pattern.endswith('/'):
-                # Directory pattern
-                if rel_path.startswith(pattern.rstrip('/')):
-                    return True
-            elif '*' in pattern:
-                # Wildcard pattern
-                import fnmatch
-                if fnmatch.fnmatch(rel_path, pattern):
-                    return True
-                if fnmatch.fnmatch(path.name, pattern):
-                    return True
-            else:
-                # Exact match
-                if rel_path == pattern or path.name == pattern:
-                    return True
-        
-        return False
-    
-    def scan_directory(directory: Path):
-        """Recursively scan a directory."""
-        try:
-            for item in directory.iterdir():
-                # Skip hidden TPC/git directories
-                if item.name in SKIP_DIRECTORIES:
-                    continue
-                
-                # Skip if matches ignore patterns
-                if should_ignore(item):
-                    continue
-                
-                if item.is_dir():
-                    # Check if directory name itself is sensitive
-                    check_item(item)
-                    # Recurse into directory
-                    scan_directory(item)
-                else:
-                    check_item(item)
-        except PermissionError:
-            pass
-    
-    def check_item(item: Path):
+    # Custom "dir/" patterns only ever matched from the project root here
+    custom = [
+        "/" + pattern if pattern.endswith("/") and "/" not in pattern.rstrip("/") else pattern
+        for pattern in ignore_patterns or []
+    ]
+    matcher = IgnoreMatcher(list(SKIP_DIRECTORIES) + custom)
+    
+    def check_item(item: Path, rel_path: str):
         """Check a single file or directory for sensitivity."""
         name_lower = item.name.lower()
-        rel_path = str(item.relative_to(project_path))
         
         # Check exact filename matches
         if name_lower in SENSITIVE_FILENAMES:
@@ -183,7 +144,9 @@ def scan_for_secrets(
                 ))
                 return  # Only report once per file
     
-    scan_directory(project_path)
+    # Ignored folders are pruned, never walked into
+    for entry in scan_tree(project_path, matcher, include_dirs=True):
+        check_item(entry.path, str(Path(entry.rel_path)))
     
     # Sort by severity (high first)
     severity_order = {"high": 0, "medium": 1, "low": 2}
@@ -5,15 +5,105 @@ Simple, folder-based version control. No Git, no branches, no merge conflicts.
 Just timestamped copies of your project that you can see, understand, and restore.
 
 Snapshots live in: .tpc/snapshots/YYYY-MM-DD_HHMM_Optional-Note/
+(written under a hidden .staging-* name, renamed once complete)
+
+Three storage modes:
+- "folder" (default): each snapshot folder holds a full copy of the files
+- "objects": each snapshot folder holds only a manifest; file contents live
+  once in .tpc/objects/ and are shared by every snapshot that has them
+- "archive": each snapshot folder holds a compressed files.zip; single
+  files can be previewed or restored without unpacking it
+
+How files are copied depends on the volume, detected once per volume:
+- "reflink": copy-on-write clones (btrfs, XFS, APFS) - instant, no extra space
+- "hardlink": unchanged files share an inode with the previous snapshot;
+  snapshot files are made read-only so editing one can't change the others
+- "copy": plain copies
 """
 
+import contextlib
+import difflib
+import errno
+import functools
+import hashlib
+import io
 import json
+import os
+import platform
 import shutil
-from pathlib import Path
+import stat
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path, PureWindowsPath
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Optional, Callable
-import fnmatch
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Callable
+
+from .archive import ARCHIVE_FILE, SnapshotArchive
+from .catalog import SnapshotCatalog
+from .chunking import CHUNKING_THRESHOLD, iter_chunks
+from .retention import RetentionPolicy
+from .ignore import IgnoreMatcher
+from .objects import (
+    CHUNK_SIZE,
+    COPY_MODE_COPY,
+    COPY_MODE_HARDLINK,
+    COPY_MODE_REFLINK,
+    ChunkedReader,
+    ObjectStore,
+    clone_or_copy,
+    copy_and_hash,
+    detect_copy_mode,
+    fsync_path,
+    hash_file,
+    reflink,
+    rmtree,
+)
+from .walker import FileEntry, scan_tree, tree_size
+
+
+# Snapshot storage modes
+STORAGE_FOLDER = "folder"
+STORAGE_OBJECTS = "objects"
+STORAGE_ARCHIVE = "archive"
+SNAPSHOT_STORAGE_MODES = (STORAGE_FOLDER, STORAGE_OBJECTS, STORAGE_ARCHIVE)
+
+# Files TPC writes into each snapshot folder (never restored into the project)
+METADATA_FILE = "_snapshot.json"
+MANIFEST_FILE = "_manifest.json"
+
+# Portable bundles (see SnapshotManager.export_bundle): a ZIP holding
+# bundle.json plus every distinct file content (or chunk) once, as objects/<sha256>
+BUNDLE_SUFFIX = ".tpcbundle"
+BUNDLE_INDEX = "bundle.json"
+BUNDLE_FORMAT = "tpc-bundle"
+
+# Snapshots being written live in .tpc/snapshots/.staging-<host>-<pid>-<random>/
+STAGING_PREFIX = ".staging-"
+
+# Staging folders from other computers (cloud sync) are stale after this many seconds
+STAGING_MAX_AGE = 24 * 3600
+
+# Names this computer in staging folder names ("-" is the separator)
+_HOST = (platform.node() or "host").replace("-", "_")
+
+# Stat index of the working tree as of the last snapshot, relative to .tpc/
+INDEX_FILE = "cache/snapshot_index.json"
+
+# Files modified this close to when the index was written might change again
+# without their mtime moving (coarse filesystem timestamps), so their cached
+# hash isn't trusted.
+RACY_WINDOW_NS = 2_000_000_000
+
+# Files copied at once. Copying is I/O-bound, so more threads than cores
+# pays off - especially on Dropbox/OneDrive folders backed by the network.
+COPY_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+# Seconds between progress messages while copying
+PROGRESS_INTERVAL = 0.25
 
 
 # Default patterns to ignore when creating snapshots
@@ -39,6 +129,8 @@ DEFAULT_IGNORE_PATTERNS = [
     
     # TPC internal
     ".tpc/snapshots/",  # Don't snapshot the snapshots!
+    ".tpc/objects/",    # ...or the object store behind them
+    ".tpc/cache/",      # Indexes TPC rebuilds on its own
     "TPC Builds/",
     
     # Build artifacts
@@ -78,6 +170,8 @@ class Snapshot:
     note: str
     file_count: int
     total_size: int  # bytes
+    storage: str = STORAGE_FOLDER  # "folder", "objects" or "archive"
+    copy_mode: str = COPY_MODE_COPY  # "reflink", "hardlink" or "copy"
     
     @property
     def display_name(self) -> str:
@@ -102,12 +196,152 @@ class Snapshot:
     @property
     def size_display(self) -> str:
         """Human-readable file size."""
-        size = self.total_size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        return format_size(self.total_size)
+
+
+def format_size(size: float) -> str:
+    """Human-readable byte count (e.g., '12.3 MB')."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process on this computer is still running."""
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate it on Windows - ask the kernel instead
+        import ctypes
+        SYNCHRONIZE = 0x00100000
+        handle = ctypes.windll.kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return False
+        try:
+            WAIT_TIMEOUT = 0x102
+            return ctypes.windll.kernel32.WaitForSingleObject(handle, 0) == WAIT_TIMEOUT
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists, owned by someone else
+    return True
+
+
+class SnapshotCancelled(Exception):
+    """Raised inside a snapshot operation when its cancel event is set."""
+
+
+# (files_done, total_files, bytes_done, total_bytes)
+TransferCallback = Callable[[int, int, int, int], None]
+
+
+def _run_copy_jobs(
+    entries: list[FileEntry],
+    copy_one: Callable[[FileEntry, Callable[[int], None]], Any],
+    label: str,
+    report: Callable[[str], None],
+    workers: int = COPY_WORKERS,
+    transfer: Optional[TransferCallback] = None,
+    cancel: Optional[threading.Event] = None,
+) -> tuple[dict[str, Any], list[tuple[str, Exception]]]:
+    """
+    Run copy_one(entry, progress) for each entry on a pool of `workers` threads.
+
+    copy_one calls progress(n) as it copies n bytes; a file it skips
+    (linked, already stored) is counted as done when it returns. Progress is
+    reported from the calling thread as "<label>... 12/40 files (3.0 MB of 9.1 MB)",
+    and as numbers through `transfer` if given.
+
+    Only a few jobs per worker are queued at once, so a huge tree doesn't
+    pile up thousands of pending futures. One failure doesn't stop the
+    other copies - callers decide what an error means.
+
+    Setting `cancel` stops new copies from starting; once the ones in
+    flight finish, SnapshotCancelled is raised.
+
+    Returns:
+        (results by rel_path, [(rel_path, exception)] sorted by rel_path)
+    """
+    total_files = len(entries)
+    total_bytes = sum(entry.size for entry in entries)
+    done_bytes = 0
+    lock = threading.Lock()
+
+    def add_bytes(count: int) -> None:
+        nonlocal done_bytes
+        with lock:
+            done_bytes += count
+
+    def run(entry: FileEntry) -> Any:
+        if cancel is not None and cancel.is_set():
+            raise SnapshotCancelled()
+
+        copied = 0
+
+        def progress(count: int) -> None:
+            nonlocal copied
+            copied += count
+            add_bytes(count)
+
+        try:
+            return copy_one(entry, progress)
+        finally:
+            # Settle up so the total lands exactly on total_bytes
+            add_bytes(entry.size - copied)
+
+    results: dict[str, Any] = {}
+    errors: list[tuple[str, Exception]] = []
+    files_done = 0
+    last_report = 0.0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tpc-copy") as pool:
+        pending: dict = {}
+        queue = iter(entries)
+
+        while True:
+            while len(pending) < workers * 4 and not (cancel is not None and cancel.is_set()):
+                entry = next(queue, None)
+                if entry is None:
+                    break
+                pending[pool.submit(run, entry)] = entry
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                entry = pending.pop(future)
+                try:
+                    results[entry.rel_path] = future.result()
+                except SnapshotCancelled:
+                    continue  # Never started - not done
+                except Exception as e:
+                    errors.append((entry.rel_path, e))
+                files_done += 1
+
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL or not pending:
+                last_report = now
+                with lock:
+                    copied = done_bytes
+                report(
+                    f"{label}... {files_done}/{total_files} files "
+                    f"({format_size(copied)} of {format_size(total_bytes)})"
+                )
+                if transfer:
+                    transfer(files_done, total_files, copied, total_bytes)
+
+    if cancel is not None and cancel.is_set():
+        raise SnapshotCancelled()
+
+    # Completion order depends on thread timing; path order doesn't
+    errors.sort(key=lambda error: error[0])
+    return results, errors
 
 
 @dataclass
@@ -116,7 +350,146 @@ class SnapshotResult:
     success: bool
     message: str
     snapshot: Optional[Snapshot] = None
-    deleted_old: Optional[str] = None  # Name of deleted snapshot if limit reached
+    deleted_old: Optional[str] = None  # Comma-separated names of old snapshots the retention policy is removing
+    expired: list[str] = field(default_factory=list)  # ...and their folder names
+
+
+# Text diffs are skipped for files bigger than this
+MAX_TEXT_DIFF_SIZE = 1024 * 1024  # 1 MB
+
+
+@dataclass
+class FileChange:
+    """One file that differs between two versions."""
+    path: str  # Relative, "/"-separated
+    status: str  # "added", "removed" or "modified"
+    old_size: int = 0  # bytes (0 if added)
+    new_size: int = 0  # bytes (0 if removed)
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    What changed between two versions of a project.
+    
+    old/new are snapshots; None means the working tree. Text diffs are
+    only built when asked for, one file at a time.
+    """
+    old: Optional[Snapshot]
+    new: Optional[Snapshot]
+    added: list[FileChange] = field(default_factory=list)
+    removed: list[FileChange] = field(default_factory=list)
+    modified: list[FileChange] = field(default_factory=list)
+    
+    # (version, path) -> bytes, supplied by SnapshotManager.diff()
+    _read: Optional[Callable[[Optional[Snapshot], str], bytes]] = field(default=None, repr=False, compare=False)
+    _text_diffs: dict = field(default_factory=dict, repr=False, compare=False)
+    
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+    
+    @property
+    def changes(self) -> list[FileChange]:
+        """Every change, sorted by path."""
+        return sorted(self.added + self.removed + self.modified, key=lambda c: c.path)
+    
+    @property
+    def summary(self) -> str:
+        """Human-readable summary (e.g., '2 added, 1 removed, 3 modified')."""
+        if not self.has_changes:
+            return "No changes"
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.modified)} modified"
+    
+    def text_diff(self, path: str, context: int = 3) -> Optional[str]:
+        """
+        Unified diff of one changed file.
+        
+        Returns None for binary files, files over MAX_TEXT_DIFF_SIZE and
+        paths that didn't change.
+        """
+        if path in self._text_diffs:
+            return self._text_diffs[path]
+        
+        change = next((c for c in self.changes if c.path == path), None)
+        result = None
+        
+        if change and max(change.old_size, change.new_size) <= MAX_TEXT_DIFF_SIZE:
+            old_text = self._read_text(self.old, path) if change.status != "added" else ""
+            new_text = self._read_text(self.new, path) if change.status != "removed" else ""
+            
+            if old_text is not None and new_text is not None:
+                result = "".join(difflib.unified_diff(
+                    old_text.splitlines(keepends=True),
+                    new_text.splitlines(keepends=True),
+                    fromfile=f"a/{path}",
+                    tofile=f"b/{path}",
+                    n=context,
+                ))
+        
+        self._text_diffs[path] = result
+        return result
+    
+    def _read_text(self, version: Optional[Snapshot], path: str) -> Optional[str]:
+        """A file's text, or None if it's binary or unreadable."""
+        try:
+            data = self._read(version, path)
+        except (OSError, KeyError):
+            return None
+        if b"\0" in data[:8192]:
+            return None
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
+
+@dataclass
+class VerifyResult:
+    """Result of checking a snapshot's files against its manifest."""
+    snapshot: Snapshot
+    checked: int = 0
+    missing: list[str] = field(default_factory=list)
+    corrupted: list[str] = field(default_factory=list)
+    verifiable: bool = True  # False for snapshots made before manifests existed
+    
+    @property
+    def ok(self) -> bool:
+        return self.verifiable and not self.missing and not self.corrupted
+    
+    @property
+    def summary(self) -> str:
+        """Human-readable summary (e.g., 'All 120 files OK')."""
+        if not self.verifiable:
+            return "This snapshot is too old to verify (it has no checksums)"
+        if self.ok:
+            return f"All {self.checked} files OK"
+        problems = []
+        if self.missing:
+            problems.append(f"{len(self.missing)} missing")
+        if self.corrupted:
+            problems.append(f"{len(self.corrupted)} damaged")
+        return f"{', '.join(problems)} of {self.checked} files"
+
+
+@dataclass
+class CleanupResult:
+    """What SnapshotManager.gc() cleared away."""
+    objects_removed: int = 0
+    bytes_freed: int = 0
+    safety_backups_removed: int = 0
+    leftovers_removed: int = 0  # Half-written or half-deleted snapshot folders
+    
+    @property
+    def summary(self) -> str:
+        parts = []
+        if self.objects_removed:
+            parts.append(f"{self.objects_removed} unused objects ({format_size(self.bytes_freed)})")
+        if self.safety_backups_removed:
+            parts.append(f"{self.safety_backups_removed} old safety backups")
+        if self.leftovers_removed:
+            parts.append(f"{self.leftovers_removed} unfinished snapshot folders")
+        return "Removed " + ", ".join(parts) if parts else "Nothing to clean up"
 
 
 class SnapshotManager:
@@ -136,51 +509,61 @@ class SnapshotManager:
         result = manager.restore_snapshot(snapshot)
     """
     
-    def __init__(self, project_path: Path, snapshot_limit: int = 10):
+    def __init__(
+        self,
+        project_path: Path,
+        snapshot_limit: int = 10,
+        storage: str = STORAGE_FOLDER,
+        retention: Optional[RetentionPolicy] = None,
+    ):
         self.project_path = project_path
         self.snapshot_limit = snapshot_limit
+        # Without a policy: keep the newest `snapshot_limit`, like always
+        self.retention = retention or RetentionPolicy.from_config(None, keep_last=snapshot_limit)
+        self.storage = storage if storage in SNAPSHOT_STORAGE_MODES else STORAGE_FOLDER
         self.snapshots_dir = project_path / ".tpc" / "snapshots"
+        self.catalog = SnapshotCatalog(self.snapshots_dir)
+        self.object_store = ObjectStore(project_path / ".tpc" / "objects")
+        self.index_file = project_path / ".tpc" / INDEX_FILE
         self._custom_ignores: list[str] = []
+        self._matcher: Optional[IgnoreMatcher] = None
+        self._copy_mode: Optional[str] = None
+        self._repair_thread: Optional[threading.Thread] = None
+        self._prune_thread: Optional[threading.Thread] = None
+        self._prune_queue: list[tuple[Path, str]] = []  # (detached folder, storage)
+        self._prune_lock = threading.Lock()
+        # Blobs that saves in progress rely on before their manifest is in the
+        # catalog (a set per save), and how many of those saves have ended.
+        # Only touched under _store_lock, which is never held for long.
+        self._store_lock = threading.Lock()
+        self._held_objects: list[set[str]] = []
+        self._holds_released = 0
+        
+        if self.snapshots_dir.exists():
+            self._cleanup_staging()
     
     def set_custom_ignores(self, patterns: list[str]) -> None:
         """Set additional ignore patterns from project config."""
         self._custom_ignores = patterns
+        self._matcher = None
     
-    def _should_ignore(self, path: Path, relative_to: Path) -> bool:
-        """Check if a path should be ignored based on patterns."""
-        try:
-            rel_path = path.relative_to(relative_to)
-            rel_str = str(rel_path)
-            
-            # Check if it's inside the .tpc folder (always ignore snapshots)
-            if rel_str.startswith(".tpc/snapshots") or rel_str.startswith(".tpc\\snapshots"):
-                return True
-            
-            # Combine default and custom patterns
-            all_patterns = DEFAULT_IGNORE_PATTERNS + self._custom_ignores
-            
-            for pattern in all_patterns:
-                # Handle directory patterns (ending with /)
-                if pattern.endswith('/'):
-                    dir_pattern = pattern[:-1]
-                    # Check if any part of the path matches
-                    for part in rel_path.parts:
-                        if fnmatch.fnmatch(part, dir_pattern):
-                            return True
-                    # Also check the full relative path
-                    if fnmatch.fnmatch(rel_str, f"*{dir_pattern}*"):
-                        return True
-                else:
-                    # File pattern - match against filename or full path
-                    if fnmatch.fnmatch(path.name, pattern):
-                        return True
-                    if fnmatch.fnmatch(rel_str, pattern):
-                        return True
-            
-            return False
-        except ValueError:
-            # Path is not relative to project
-            return True
+    @property
+    def ignore_matcher(self) -> IgnoreMatcher:
+        """Default and custom ignore patterns, compiled once."""
+        if self._matcher is None:
+            self._matcher = IgnoreMatcher(DEFAULT_IGNORE_PATTERNS + self._custom_ignores)
+        return self._matcher
+    
+    @property
+    def copy_mode(self) -> str:
+        """How files are copied between the project and its snapshots on this volume."""
+        if self._copy_mode is None:
+            self._copy_mode = detect_copy_mode(self.project_path, self.snapshots_dir)
+        return self._copy_mode
+    
+    def _iter_project_files(self):
+        """Yield a FileEntry (with stat data) for every project file that isn't ignored."""
+        return scan_tree(self.project_path, self.ignore_matcher)
     
     def _generate_snapshot_name(self, note: str = "") -> str:
         """Generate a snapshot folder name."""
@@ -194,27 +577,92 @@ class SnapshotManager:
         else:
             return timestamp
     
-    def _calculate_dir_size(self, path: Path) -> tuple[int, int]:
-        """Calculate total size and file count of a directory."""
-        total_size = 0
-        file_count = 0
+    def _staging_name(self) -> str:
+        """Name for a snapshot that's still being written (see create_snapshot)."""
+        return f"{STAGING_PREFIX}{_HOST}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    
+    def _safety_path(self) -> Path:
+        """
+        Folder for a restore's safety backup.
+        
+        Unique even for two restores in the same second - a failed or
+        cancelled restore deletes its own backup, and must never touch
+        another one's.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.snapshots_dir / f"_pre_restore_{timestamp}_{uuid.uuid4().hex[:8]}"
+    
+    def _publish_staging(self, staging_path: Path, snapshot_name: str) -> Path:
+        """
+        Give a finished staging folder its snapshot name, in one rename.
+        
+        Two snapshots saved in the same minute with the same note would get
+        the same name, so "-2", "-3"... is added when the name is taken.
+        Returns the snapshot's path.
+        """
+        suffix = 1
+        while True:
+            name = snapshot_name if suffix == 1 else f"{snapshot_name}-{suffix}"
+            snapshot_path = self.snapshots_dir / name
+            suffix += 1
+            
+            if snapshot_path.exists():
+                continue
+            try:
+                os.rename(staging_path, snapshot_path)
+            except FileExistsError:
+                continue  # Taken since we looked (Windows)
+            except OSError as e:
+                if e.errno in (errno.EEXIST, errno.ENOTEMPTY):
+                    continue
+                raise
+            
+            fsync_path(self.snapshots_dir)
+            return snapshot_path
+    
+    def _cleanup_staging(self) -> None:
+        """Delete snapshots that were still being written when TPC was killed."""
+        stale = self._stale_staging()
+        if stale:
+            self._delete_in_background([(path, self.storage) for path in stale])
+    
+    def _stale_staging(self) -> list[Path]:
+        """
+        Find staging folders nobody is writing to anymore.
         
+        A staging folder is stale once the process that made it on this
+        computer has exited. Ones from other computers (the project synced
+        through Dropbox and the like) are left for a day in case that
+        computer is still writing.
+        """
         try:
-            for item in path.rglob("*"):
-                if item.is_file():
-                    try:
-                        total_size += item.stat().st_size
-                        file_count += 1
-                    except (OSError, PermissionError):
-                        pass
-        except (OSError, PermissionError):
-            pass
+            with os.scandir(self.snapshots_dir) as it:
+                staging = [Path(entry.path) for entry in it if entry.name.startswith(STAGING_PREFIX)]
+        except OSError:
+            return []
+        
+        stale = []
+        cutoff = time.time() - STAGING_MAX_AGE
+        for path in staging:
+            try:
+                host, pid, _ = path.name[len(STAGING_PREFIX):].rsplit("-", 2)
+                if host == _HOST:
+                    if int(pid) != os.getpid() and not _process_alive(int(pid)):
+                        stale.append(path)
+                elif path.stat().st_mtime < cutoff:
+                    stale.append(path)
+            except (ValueError, OSError):
+                continue
         
-        return total_size, file_count
+        return stale
+    
+    def _calculate_dir_size(self, path: Path) -> tuple[int, int]:
+        """Calculate total size and file count of a directory."""
+        return tree_size(path)
     
     def _load_snapshot_metadata(self, snapshot_path: Path) -> Optional[dict]:
         """Load metadata from a snapshot's _snapshot.json file."""
-        meta_file = snapshot_path / "_snapshot.json"
+        meta_file = snapshot_path / METADATA_FILE
         if meta_file.exists():
             try:
                 with open(meta_file) as f:
@@ -223,233 +671,771 @@ class SnapshotManager:
                 pass
         return None
     
-    def _save_snapshot_metadata(self, snapshot_path: Path, note: str, file_count: int, total_size: int) -> None:
-        """Save metadata to a snapshot's _snapshot.json file."""
+    def _save_snapshot_metadata(
+        self,
+        snapshot_path: Path,
+        note: str,
+        file_count: int,
+        total_size: int,
+        storage: str = STORAGE_FOLDER,
+        copy_mode: str = COPY_MODE_COPY,
+        created: Optional[datetime] = None,
+    ) -> dict:
+        """Save metadata to a snapshot's _snapshot.json file. Returns the metadata."""
         meta = {
-            "created": datetime.now().isoformat(),
+            "created": (created or datetime.now()).isoformat(),
             "note": note,
             "project_path": str(self.project_path),
             "file_count": file_count,
-            "total_size": total_size
+            "total_size": total_size,
+            "storage": storage,
+            "copy_mode": copy_mode,
         }
         
-        meta_file = snapshot_path / "_snapshot.json"
+        meta_file = snapshot_path / METADATA_FILE
         with open(meta_file, "w") as f:
             json.dump(meta, f, indent=2)
+        
+        return meta
     
-    def create_snapshot(self, note: str = "", progress_callback: Optional[Callable[[str], None]] = None) -> SnapshotResult:
+    def _save_manifest(self, snapshot_path: Path, files: dict[str, dict]) -> None:
         """
-        Create a new snapshot of the current project state.
+        Save a snapshot's _manifest.json file.
         
-        Args:
-            note: Optional description for this snapshot
-            progress_callback: Optional callback for progress updates
-            
-        Returns:
-            SnapshotResult with success status and snapshot info
+        Maps each relative path (always with forward slashes) to its
+        content hash, size, mtime and permission bits.
         """
-        def report(msg: str):
-            if progress_callback:
-                progress_callback(msg)
-        
-        report("Preparing snapshot...")
-        
-        # Ensure snapshots directory exists
-        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate snapshot name
-        snapshot_name = self._generate_snapshot_name(note)
-        snapshot_path = self.snapshots_dir / snapshot_name
-        
-        # Check if we need to delete an old snapshot
-        deleted_old = None
-        existing = self.list_snapshots()
-        if len(existing) >= self.snapshot_limit:
-            # Delete oldest (last in list, since list is sorted newest first)
-            oldest = existing[-1]
-            try:
-                shutil.rmtree(oldest.path)
-                deleted_old = oldest.display_name
-                report(f"Removed old snapshot: {deleted_old}")
-            except Exception as e:
-                return SnapshotResult(
-                    success=False,
-                    message=f"Couldn't remove old snapshot: {e}"
-                )
-        
-        report("Copying files...")
+        manifest = {
+            "version": 1,
+            "files": files,
+        }
         
+        with open(snapshot_path / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+    
+    @staticmethod
+    def _snapshot_from_metadata(snapshot_path: Path, meta: dict) -> Snapshot:
+        """Build a Snapshot from _snapshot.json / catalog metadata."""
         try:
-            # Create the snapshot directory
-            snapshot_path.mkdir(parents=True, exist_ok=True)
-            
-            # Copy all files that aren't ignored
-            file_count = 0
-            total_size = 0
-            
-            for item in self.project_path.rglob("*"):
-                if self._should_ignore(item, self.project_path):
-                    continue
-                
-                if item.is_file():
-                    # Calculate relative path
-                    rel_path = item.relative_to(self.project_path)
-                    dest = snapshot_path / rel_path
-                    
-                    # Create parent directories
-                    dest.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Copy the file
-                    try:
-                        shutil.copy2(item, dest)
-                        file_count += 1
-                        total_size += item.stat().st_size
-                    except (OSError, PermissionError) as e:
-                        # Skip files we can't read, but continue
-                        pass
-            
-            # Save metadata
-            self._save_snapshot_metadata(snapshot_path, note, file_count, total_size)
-            
-            report("Snapshot complete!")
-            
-            snapshot = Snapshot(
-                name=snapshot_name,
-                path=snapshot_path,
-                created=datetime.now(),
-                note=note,
-                file_count=file_count,
-                total_size=total_size
-            )
-            
-            return SnapshotResult(
-                success=True,
-                message=f"Saved snapshot with {file_count} files",
-                snapshot=snapshot,
-                deleted_old=deleted_old
-            )
-            
-        except Exception as e:
-            # Clean up failed snapshot
-            if snapshot_path.exists():
-                try:
-                    shutil.rmtree(snapshot_path)
-                except:
-                    pass
-            
-            return SnapshotResult(
-                success=False,
-                message=f"Snapshot failed: {e}"
-            )
+            created = datetime.fromisoformat(meta["created"])
+        except (KeyError, TypeError, ValueError):
+            created = datetime.fromtimestamp(snapshot_path.stat().st_mtime)
+        
+        return Snapshot(
+            name=snapshot_path.name,
+            path=snapshot_path,
+            created=created,
+            note=meta.get("note", ""),
+            file_count=meta.get("file_count", 0),
+            total_size=meta.get("total_size", 0),
+            storage=meta.get("storage", STORAGE_FOLDER),
+            copy_mode=meta.get("copy_mode", COPY_MODE_COPY),
+        )
     
-    def list_snapshots(self) -> list[Snapshot]:
+    def _rebuild_catalog(self) -> dict[str, dict]:
         """
-        List all snapshots for this project.
+        Rebuild the catalog from each snapshot's _snapshot.json.
         
-        Returns list sorted by date (newest first).
+        Snapshots with no metadata at all (very old, or copied in by hand)
+        need their whole folder measured. That happens on a background
+        thread; until it finishes they're listed with a size of zero.
         """
-        snapshots = []
-        
-        if not self.snapshots_dir.exists():
-            return snapshots
+        records: dict[str, dict] = {}
+        missing: list[Path] = []
         
         for item in self.snapshots_dir.iterdir():
             if not item.is_dir():
                 continue
             
-            if item.name.startswith("_"):
-                continue  # Skip special folders like _pre_restore backups
+            if item.name.startswith(("_", ".")):
+                continue  # Skip special folders like _pre_restore backups and staging
             
-            # Try to load metadata
             meta = self._load_snapshot_metadata(item)
-            
             if meta:
-                try:
-                    created = datetime.fromisoformat(meta["created"])
-                except:
-                    created = datetime.fromtimestamp(item.stat().st_mtime)
-                
-                note = meta.get("note", "")
-                file_count = meta.get("file_count", 0)
-                total_size = meta.get("total_size", 0)
+                records[item.name] = meta
             else:
-                # No metadata - reconstruct from folder name and stats
+                missing.append(item)
+        
+        try:
+            self.catalog.rewrite(records)
+        except OSError:
+            pass  # Read-only folder - listing still works, just slower
+        
+        if missing and not (self._repair_thread and self._repair_thread.is_alive()):
+            self._repair_thread = threading.Thread(
+                target=self._repair_metadata, args=(missing,), daemon=True
+            )
+            self._repair_thread.start()
+        
+        for item in missing:
+            records[item.name] = {
+                "created": datetime.fromtimestamp(item.stat().st_mtime).isoformat(),
+                "note": self._note_from_name(item.name),
+            }
+        
+        return records
+    
+    @staticmethod
+    def _note_from_name(name: str) -> str:
+        """Recover the note from a snapshot folder name (YYYY-MM-DD_HHMM_Note)."""
+        parts = name.split("_", 2)
+        return parts[2].replace("-", " ") if len(parts) > 2 else ""
+    
+    def _repair_metadata(self, snapshot_paths: list[Path]) -> None:
+        """Measure snapshots that have no metadata, save it and add them to the catalog."""
+        for item in snapshot_paths:
+            try:
                 created = datetime.fromtimestamp(item.stat().st_mtime)
-
-                # Try to parse note from folder name
-                parts = item.name.split("_", 2)
-                note = parts[2].replace("-", " ") if len(parts) > 2 else ""
-
-                # Calculate size and save metadata for future (so next load is fast)
                 total_size, file_count = self._calculate_dir_size(item)
-                try:
-                    self._save_snapshot_metadata(item, note, file_count, total_size)
-                except Exception:
-                    pass  # Don't fail if we can't write metadata
-            
-            snapshots.append(Snapshot(
-                name=item.name,
-                path=item,
-                created=created,
-                note=note,
-                file_count=file_count,
-                total_size=total_size
-            ))
+                meta = self._save_snapshot_metadata(
+                    item, self._note_from_name(item.name), file_count, total_size, created=created
+                )
+                self.catalog.add(item.name, meta)
+            except Exception:
+                pass  # Don't fail if we can't write metadata
+    
+    def get_manifest(self, snapshot: Snapshot) -> Optional[dict[str, dict]]:
+        """
+        Load the per-file manifest for a snapshot.
         
-        # Sort by created date, newest first
-        snapshots.sort(key=lambda s: s.created, reverse=True)
+        Returns {relative_path: {"hash", "size", "mtime_ns", "mode"}}, or None
+        for snapshots made before manifests existed.
+        """
+        return self._read_manifest(snapshot.path)
+    
+    @staticmethod
+    def _read_manifest(snapshot_path: Path) -> Optional[dict[str, dict]]:
+        manifest_file = snapshot_path / MANIFEST_FILE
+        if not manifest_file.exists():
+            return None
         
-        return snapshots
+        try:
+            with open(manifest_file) as f:
+                return json.load(f).get("files", {})
+        except Exception:
+            return None
+    
+    def _referenced_objects(self) -> set[str]:
+        """Collect every blob digest referenced by an object-store snapshot."""
+        referenced = set()
+        for snapshot in self.list_snapshots():
+            if snapshot.storage != STORAGE_OBJECTS:
+                continue
+            manifest = self.get_manifest(snapshot)
+            if manifest:
+                referenced.update(entry["hash"] for entry in manifest.values())
+        return referenced
+    
+    @contextlib.contextmanager
+    def _holding_objects(self) -> Iterator[set[str]]:
+        """Keep pruning off the blobs added to the yielded set until the block ends."""
+        held: set[str] = set()
+        with self._store_lock:
+            self._held_objects.append(held)
+        try:
+            yield held
+        finally:
+            with self._store_lock:
+                self._held_objects = [h for h in self._held_objects if h is not held]
+                self._holds_released += 1
     
-    def restore_snapshot(self, snapshot: Snapshot, progress_callback: Optional[Callable[[str], None]] = None) -> SnapshotResult:
+    def _hold_object(self, held: set[str], digest: str) -> bool:
         """
-        Restore project to a previous snapshot state.
+        Add a stored blob (and its chunks) to a save's held set.
         
-        This:
-        1. Creates a safety backup of current state
-        2. Clears the working directory (except .tpc/)
-        3. Copies snapshot contents back
+        Returns False if it isn't all there - a prune got to it first - and
+        it has to be stored again.
+        """
+        with self._store_lock:
+            held.add(digest)
+            chunks = self.object_store.chunks(digest)
+            if chunks is None:
+                return self.object_store.object_path(digest).is_file()
+            held.update(chunks)
+            return all(self.object_store.object_path(chunk).is_file() for chunk in chunks)
+    
+    def _prune_objects(self) -> tuple[int, int]:
+        """
+        Drop blobs no snapshot points at anymore. Returns (blobs_removed, bytes_freed).
         
-        Args:
-            snapshot: The snapshot to restore
-            progress_callback: Optional callback for progress updates
-            
-        Returns:
-            SnapshotResult with success status
+        Never waits for a save: blobs a running save holds are skipped, and
+        once a save ends (its manifest may point at anything) the rest is
+        left for the next prune.
         """
-        def report(msg: str):
-            if progress_callback:
-                progress_callback(msg)
+        if not self.object_store.root.exists():
+            return 0, 0
         
-        if not snapshot.path.exists():
-            return SnapshotResult(
-                success=False,
-                message="Snapshot no longer exists"
-            )
+        with self._store_lock:
+            released = self._holds_released
         
-        report("Creating safety backup...")
+        def may_remove(digest: str) -> bool:
+            # Called under _store_lock
+            if self._holds_released != released:
+                return False
+            return not any(digest in held for held in self._held_objects)
         
-        # Create safety backup first
-        safety_name = f"_pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        safety_path = self.snapshots_dir / safety_name
+        try:
+            return self.object_store.prune(self._referenced_objects(), may_remove, self._store_lock)
+        except Exception:
+            return 0, 0  # Leftover blobs waste space but never break anything
+    
+    @staticmethod
+    def _link_unchanged(previous_file: Path, dest: Path) -> bool:
+        """
+        Hardlink an unchanged file from the previous snapshot instead of copying it.
         
+        Snapshot files are never modified after they're written, so sharing
+        the inode is safe. Returns False if linking isn't possible here.
+        """
         try:
-            safety_path.mkdir(parents=True, exist_ok=True)
+            os.link(previous_file, dest)
+            return True
+        except OSError:
+            return False
+    
+    def _detach_snapshot(self, snapshot: Snapshot) -> Path:
+        """
+        Take a snapshot out of the listing without deleting its files yet.
+        
+        The folder is renamed to _deleting_<name>, which is instant even for
+        a huge tree. Returns the folder that's left to delete.
+        """
+        trash = self.snapshots_dir / f"_deleting_{snapshot.name}"
+        try:
+            os.rename(snapshot.path, trash)
+        except OSError:
+            trash = snapshot.path  # Something has a file open (Windows) - delete in place
+        
+        self.catalog.remove(snapshot.name)
+        return trash
+    
+    def _delete_snapshot_folder(self, snapshot: Snapshot) -> None:
+        """Remove a snapshot folder and any blobs only it was using."""
+        rmtree(self._detach_snapshot(snapshot))
+        if snapshot.storage == STORAGE_OBJECTS:
+            self._prune_objects()
+    
+    def _load_index(self) -> dict:
+        """
+        Load the stat index written by the last snapshot.
+        
+        Shape: {"snapshot": name, "indexed_ns": int,
+                "files": {rel_path: [size, mtime_ns, inode, hash]}}
+        """
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+            if isinstance(index.get("files"), dict):
+                return index
+        except Exception:
+            pass
+        return {"snapshot": None, "indexed_ns": 0, "files": {}}
+    
+    def _save_index(self, snapshot_name: str, files: dict[str, list], indexed_ns: Optional[int] = None) -> None:
+        """Persist the stat index for the snapshot that was just taken or restored."""
+        index = {
+            "version": 1,
+            "snapshot": snapshot_name,
+            "indexed_ns": indexed_ns or time.time_ns(),
+            "files": files,
+        }
+        
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp, self.index_file)
+        except Exception:
+            pass  # Without an index the next snapshot just rehashes everything
+    
+    def _same_as_indexed(self, index: dict, new_files: dict[str, list]) -> bool:
+        """Whether new_files has the same paths and contents as the indexed snapshot."""
+        if not index["snapshot"] or not (self.snapshots_dir / index["snapshot"]).is_dir():
+            return False
+        old_files = index["files"]
+        if old_files.keys() != new_files.keys():
+            return False
+        return all(old_files[rel_str][3] == info[3] for rel_str, info in new_files.items())
+    
+    def _forget_indexed(self, rel_paths: Iterable[str]) -> None:
+        """Drop files from the stat index, so the next snapshot reads them again."""
+        index = self._load_index()
+        if index["snapshot"] is None:
+            return
+        for rel_str in rel_paths:
+            index["files"].pop(rel_str, None)
+        self._save_index(index["snapshot"], index["files"], index["indexed_ns"])
+    
+    @staticmethod
+    def _cached_hash(index: dict, entry: FileEntry) -> Optional[str]:
+        """Return the indexed hash for a file if its stat hasn't changed since."""
+        indexed = index["files"].get(entry.rel_path)
+        if not indexed:
+            return None
+        
+        size, mtime_ns, inode, digest = indexed
+        if (size, mtime_ns, inode) != (entry.size, entry.mtime_ns, entry.inode):
+            return None
+        
+        if mtime_ns >= index["indexed_ns"] - RACY_WINDOW_NS:
+            return None  # Too close to the last snapshot to trust the mtime
+        
+        return digest
+    
+    def has_changes(self) -> Optional[bool]:
+        """
+        Check whether the working tree differs from the last snapshot.
+        
+        Only files whose size/mtime/inode moved are hashed, so this is
+        cheap on an untouched project. Returns None if there's no index
+        to compare against (e.g. snapshots made by an older TPC).
+        """
+        index = self._load_index()
+        if not index["snapshot"]:
+            return None
+        
+        indexed = index["files"]
+        seen = 0
+        
+        for entry in self._iter_project_files():
+            previous = indexed.get(entry.rel_path)
+            if previous is None:
+                return True  # New file
+            
+            seen += 1
+            if self._cached_hash(index, entry):
+                continue
+            try:
+                if entry.size != previous[0] or hash_file(entry.path) != previous[3]:
+                    return True  # Contents changed
+            except OSError:
+                continue
+        
+        # Anything indexed that we didn't see was deleted
+        return seen != len(indexed)
+    
+    def _entries_after_changes(self, index: dict, changed_paths: Iterable[str]) -> Optional[list[FileEntry]]:
+        """
+        Build the file list for a snapshot from the index and a set of changed paths.
+        
+        `changed_paths` are project-relative files or folders that something
+        (like a file watcher) saw change since the last snapshot. Every other
+        file is taken from the index without touching the disk. A changed
+        folder means entries were added, removed or renamed in it, so it's
+        listed - but only subfolders the index has never seen are walked.
+        
+        Returns None if the index can't be used (no last snapshot, or it's
+        gone); the caller scans the whole tree instead.
+        """
+        if not index["snapshot"]:
+            return None
+        manifest = self._read_manifest(self.snapshots_dir / index["snapshot"])
+        if manifest is None or manifest.keys() != index["files"].keys():
+            return None
+        
+        matcher = self.ignore_matcher
+        files = dict(index["files"])
+        indexed_dirs = {rel.rsplit("/", 1)[0] for rel in files if "/" in rel}
+        for rel_dir in list(indexed_dirs):
+            while "/" in rel_dir:
+                rel_dir = rel_dir.rsplit("/", 1)[0]
+                indexed_dirs.add(rel_dir)
+        
+        # Files to stat again: changed ones, plus any the index can't vouch for
+        restat = {rel for rel, state in files.items() if state[1] >= index["indexed_ns"] - RACY_WINDOW_NS}
+        found: dict[str, FileEntry] = {}
+        
+        def forget(rel_dir: str) -> None:
+            prefix = rel_dir + "/"
+            for rel in [rel for rel in files if rel.startswith(prefix)]:
+                del files[rel]
+        
+        for rel in sorted({p.replace("\\", "/").strip("/") for p in changed_paths}):
+            path = self.project_path / rel
+            is_dir = path.is_dir() and not path.is_symlink()
+            if rel and matcher.is_ignored_path(rel, is_dir=is_dir):
+                continue
+            
+            if not is_dir:
+                restat.add(rel)
+                forget(rel)  # In case it used to be a folder
+                continue
+            
+            # A folder's listing changed: stat its files, walk new subfolders
+            prefix = rel + "/" if rel else ""
+            present = set()
+            try:
+                with os.scandir(path) as it:
+                    children = list(it)
+            except OSError:
+                children = []
             
-            # Copy current state to safety backup
-            for item in self.project_path.rglob("*"):
-                if self._should_ignore(item, self.project_path):
+            for child in children:
+                child_rel = prefix + child.name
+                try:
+                    child_is_dir = child.is_dir(follow_symlinks=False)
+                except OSError:
                     continue
+                if matcher.is_ignored(child_rel, is_dir=child_is_dir):
+                    continue
+                present.add(child_rel)
                 
-                if item.is_file():
-                    rel_path = item.relative_to(self.project_path)
-                    dest = safety_path / rel_path
-                    dest.parent.mkdir(parents=True, exist_ok=True)
-                    try:
-                        shutil.copy2(item, dest)
-                    except:
-                        pass
+                if not child_is_dir:
+                    restat.add(child_rel)
+                elif child_rel not in indexed_dirs:
+                    for entry in scan_tree(Path(child.path), matcher, prefix=child_rel + "/"):
+                        found[entry.rel_path] = entry
+            
+            # Whatever was indexed directly in this folder and isn't there now is gone
+            for indexed in [r for r in files if r.startswith(prefix)]:
+                top = prefix + indexed[len(prefix):].split("/", 1)[0]
+                if top not in present:
+                    del files[indexed]
+        
+        for rel in restat:
+            files.pop(rel, None)
+            if rel in found:
+                continue
+            path = self.project_path / rel
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # Deleted
+            if stat.S_ISREG(st.st_mode) and not matcher.is_ignored_path(rel):
+                found[rel] = FileEntry(
+                    path=path,
+                    rel_path=rel,
+                    is_dir=False,
+                    size=st.st_size,
+                    mtime_ns=st.st_mtime_ns,
+                    inode=st.st_ino,
+                    mode=st.st_mode & 0o777,
+                )
+        
+        for rel, (size, mtime_ns, inode, _digest) in files.items():
+            found.setdefault(rel, FileEntry(
+                path=self.project_path / rel,
+                rel_path=rel,
+                is_dir=False,
+                size=size,
+                mtime_ns=mtime_ns,
+                inode=inode,
+                mode=manifest[rel].get("mode", 0o644),
+            ))
+        
+        return [found[rel] for rel in sorted(found)]
+    
+    def create_snapshot(
+        self,
+        note: str = "",
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        changed_paths: Optional[Iterable[str]] = None,
+        skip_unchanged: bool = False,
+    ) -> SnapshotResult:
+        """
+        Create a new snapshot of the current project state.
+        
+        Args:
+            note: Optional description for this snapshot
+            progress_callback: Optional callback for progress updates
+            transfer_callback: Optional callback for (files_done, total_files, bytes_done, total_bytes)
+            cancel_event: Set it to stop; the partial snapshot is removed
+            changed_paths: Files/folders known to have changed since the last
+                snapshot (e.g. from a file watcher). The tree isn't scanned;
+                everything else is taken as unchanged.
+            skip_unchanged: Don't publish a snapshot whose files are the
+                same as the last one's (auto-saves). The result is then a
+                success with no snapshot.
+            
+        Returns:
+            SnapshotResult with success status and snapshot info
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        run_jobs = functools.partial(_run_copy_jobs, report=report, transfer=transfer_callback, cancel=cancel_event)
+        
+        report("Preparing snapshot...")
+        
+        # Ensure snapshots directory exists
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Files go into a hidden staging folder that only gets the snapshot's
+        # name once everything is written and on disk. A snapshot killed
+        # halfway never shows up in the listing.
+        snapshot_name = self._generate_snapshot_name(note)
+        staging_path = self.snapshots_dir / self._staging_name()
+        
+        report("Copying files...")
+        
+        try:
+            staging_path.mkdir(parents=True)
+            
+            # Copy (or store) all files that aren't ignored. Files whose stat
+            # matches the index from the last snapshot aren't read at all.
+            index = self._load_index()
+            previous_path = self.snapshots_dir / index["snapshot"] if index["snapshot"] else None
+            copy_mode = self.copy_mode if self.storage != STORAGE_ARCHIVE else COPY_MODE_COPY
+            if copy_mode == COPY_MODE_HARDLINK and previous_path is not None:
+                # Only link to files that are already read-only. Chmodding a
+                # copy-mode snapshot's file would change that snapshot too.
+                previous_meta = self._load_snapshot_metadata(previous_path) or {}
+                if previous_meta.get("copy_mode") != COPY_MODE_HARDLINK:
+                    previous_path = None
+            file_count = 0
+            total_size = 0
+            changed_count = 0
+            files: dict[str, dict] = {}
+            new_index: dict[str, list] = {}
+            archive = None
+            if self.storage == STORAGE_ARCHIVE:
+                archive = SnapshotArchive(staging_path / ARCHIVE_FILE, "w")
+            
+            def snapshot_file(entry: FileEntry, progress: Callable[[int], None]) -> str:
+                digest = self._cached_hash(index, entry)
+                
+                if archive is not None:
+                    return archive.add_file(entry.path, entry.rel_path, progress)
+                
+                if self.storage == STORAGE_OBJECTS:
+                    # Unchanged content is already in the store - no copy. If a
+                    # prune removed the blob before this save held it, store it again.
+                    while not (digest and self._hold_object(held, digest)):
+                        digest = self.object_store.put_file(
+                            entry.path, None, progress, clone=copy_mode == COPY_MODE_REFLINK
+                        )
+                    return digest
+                
+                dest = staging_path / entry.rel_path
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                
+                if copy_mode == COPY_MODE_REFLINK and reflink(entry.path, dest):
+                    shutil.copystat(entry.path, dest)
+                    digest = digest or hash_file(dest)  # Hash the clone - it can't change under us
+                elif copy_mode != COPY_MODE_HARDLINK:
+                    digest = copy_and_hash(entry.path, dest, progress)
+                elif not (digest and previous_path and self._link_unchanged(previous_path / entry.rel_path, dest)):
+                    # Unchanged files are shared with the previous snapshot. Every
+                    # snapshot file is read-only so the shared copies can't drift.
+                    digest = copy_and_hash(entry.path, dest, progress)
+                else:
+                    return digest  # Linked - nothing new to flush
+                
+                fsync_path(dest)
+                if copy_mode == COPY_MODE_HARDLINK:
+                    os.chmod(dest, entry.mode & ~0o222)
+                return digest
+            
+            entries = None
+            if changed_paths is not None:
+                entries = self._entries_after_changes(index, changed_paths)
+            if entries is None:
+                entries = list(self._iter_project_files())
+            
+            # New blobs aren't referenced by anything until the snapshot is
+            # in the catalog - until then this save holds them
+            with self._holding_objects() as held:
+                try:
+                    # An archive has a single writer
+                    workers = 1 if archive is not None else COPY_WORKERS
+                    digests, errors = run_jobs(entries, snapshot_file, "Copying files", workers=workers)
+                finally:
+                    if archive is not None:
+                        archive.close()
+                
+                # Skip files we can't read, but fail on anything else
+                for rel_str, error in errors:
+                    if not isinstance(error, OSError):
+                        raise error
+                
+                for entry in entries:
+                    rel_str = entry.rel_path
+                    if rel_str not in digests:
+                        continue
+                    digest = digests[rel_str]
+                
+                    if rel_str not in index["files"] or index["files"][rel_str][3] != digest:
+                        changed_count += 1
+                
+                    files[rel_str] = {
+                        "hash": digest,
+                        "size": entry.size,
+                        "mtime_ns": entry.mtime_ns,
+                        "mode": entry.mode,
+                    }
+                    new_index[rel_str] = [entry.size, entry.mtime_ns, entry.inode, digest]
+                    file_count += 1
+                    total_size += entry.size
+                
+                if skip_unchanged and self._same_as_indexed(index, new_index):
+                    rmtree(staging_path)
+                    self._save_index(index["snapshot"], new_index)  # Keep the new stats
+                    report("Nothing changed")
+                    return SnapshotResult(success=True, message="No changes since the last snapshot")
+                
+                # Save manifest and metadata
+                self._save_manifest(staging_path, files)
+                meta = self._save_snapshot_metadata(staging_path, note, file_count, total_size, self.storage, copy_mode)
+                
+                # Flush what the data files don't cover, then publish
+                for name in (MANIFEST_FILE, METADATA_FILE, ARCHIVE_FILE if archive is not None else None):
+                    if name:
+                        fsync_path(staging_path / name)
+                folders = {staging_path}
+                for rel_str in files:
+                    folders.update((staging_path / rel_str).parents)
+                for folder in sorted(folders, reverse=True):
+                    if folder.is_relative_to(staging_path):
+                        fsync_path(folder)
+                
+                snapshot_path = self._publish_staging(staging_path, snapshot_name)
+                snapshot_name = snapshot_path.name
+                self._save_index(snapshot_name, new_index)
+                self.catalog.add(snapshot_name, meta)
+            
+            # Thin out old snapshots - deleting them happens in the background
+            deleted_old = None
+            expired = self.retention.select_expired(self.list_snapshots())
+            if expired:
+                deleted_old = ", ".join(s.display_name for s in expired)
+                self.prune_in_background(expired)
+            
+            report("Snapshot complete!")
+            
+            snapshot = Snapshot(
+                name=snapshot_name,
+                path=snapshot_path,
+                created=datetime.now(),
+                note=note,
+                file_count=file_count,
+                total_size=total_size,
+                storage=self.storage,
+                copy_mode=copy_mode,
+            )
             
+            return SnapshotResult(
+                success=True,
+                message=f"Saved snapshot with {file_count} files ({changed_count} changed)",
+                snapshot=snapshot,
+                deleted_old=deleted_old,
+                expired=[s.name for s in expired],
+            )
+            
+        except Exception as e:
+            # Clean up failed snapshot (its new blobs are collected later)
+            if staging_path.exists():
+                try:
+                    rmtree(staging_path)
+                except:
+                    pass
+            
+            if isinstance(e, SnapshotCancelled):
+                return SnapshotResult(
+                    success=False,
+                    message="Snapshot cancelled"
+                )
+            
+            return SnapshotResult(
+                success=False,
+                message=f"Snapshot failed: {e}"
+            )
+    
+    def list_snapshots(self) -> list[Snapshot]:
+        """
+        List all snapshots for this project.
+        
+        Normally a single read of the catalog. If the catalog is stale it's
+        rebuilt from the _snapshot.json files (see _rebuild_catalog).
+        
+        Returns list sorted by date (newest first).
+        """
+        if not self.snapshots_dir.exists():
+            return []
+        
+        records = self.catalog.load()
+        if records is None:
+            records = self._rebuild_catalog()
+        
+        snapshots = [
+            self._snapshot_from_metadata(self.snapshots_dir / name, meta)
+            for name, meta in records.items()
+        ]
+        
+        # Sort by created date, newest first
+        snapshots.sort(key=lambda s: s.created, reverse=True)
+        
+        return snapshots
+    
+    def restore_snapshot(
+        self,
+        snapshot: Snapshot,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        delta: bool = True,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> SnapshotResult:
+        """
+        Restore project to a previous snapshot state.
+        
+        By default only the difference is applied (see _restore_delta).
+        Snapshots without a manifest, or delta=False, get a full restore:
+        1. Creates a safety backup of current state
+        2. Clears the working directory (except .tpc/)
+        3. Copies snapshot contents back
+        
+        Args:
+            snapshot: The snapshot to restore
+            progress_callback: Optional callback for progress updates
+            delta: Only touch files that differ from the snapshot
+            transfer_callback: Optional callback for (files_done, total_files, bytes_done, total_bytes)
+            cancel_event: Set it to stop; files already changed are put back
+            
+        Returns:
+            SnapshotResult with success status
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        run_jobs = functools.partial(_run_copy_jobs, report=report, transfer=transfer_callback, cancel=cancel_event)
+        
+        if not snapshot.path.exists():
+            return SnapshotResult(
+                success=False,
+                message="Snapshot no longer exists"
+            )
+        
+        if delta:
+            manifest = self.get_manifest(snapshot)
+            if manifest is not None:
+                return self._restore_delta(snapshot, manifest, report, run_jobs)
+        
+        report("Creating safety backup...")
+        
+        # Create safety backup first
+        safety_path = self._safety_path()
+        
+        try:
+            safety_path.mkdir(parents=True, exist_ok=True)
+            
+            # Copy current state to safety backup (unreadable files are skipped)
+            def back_up(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                dest = safety_path / entry.rel_path
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                clone_or_copy(entry.path, dest, self.copy_mode, progress)
+            
+            run_jobs(list(self._iter_project_files()), back_up, "Creating safety backup")
+            
+        except SnapshotCancelled:
+            rmtree(safety_path)  # Nothing has been touched yet
+            return SnapshotResult(
+                success=False,
+                message="Restore cancelled"
+            )
         except Exception as e:
             return SnapshotResult(
                 success=False,
@@ -478,16 +1464,38 @@ class SnapshotManager:
         report("Restoring snapshot...")
         
         try:
-            # Copy snapshot contents to project
-            for item in snapshot.path.rglob("*"):
-                if item.name == "_snapshot.json":
-                    continue  # Don't copy metadata file
+            manifest = self.get_manifest(snapshot)
+            
+            if snapshot.storage == STORAGE_FOLDER:
+                # Copy snapshot contents to project (not its metadata files)
+                entries = [
+                    entry for entry in scan_tree(snapshot.path)
+                    if entry.rel_path not in (METADATA_FILE, MANIFEST_FILE)
+                ]
+            else:
+                # Write each file back out of the object store / archive
+                if manifest is None:
+                    raise RuntimeError("snapshot manifest is missing")
                 
-                if item.is_file():
-                    rel_path = item.relative_to(snapshot.path)
-                    dest = self.project_path / rel_path
-                    dest.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(item, dest)
+                entries = [
+                    FileEntry(path=self.project_path / rel_str, rel_path=rel_str, is_dir=False, size=entry.get("size", 0))
+                    for rel_str, entry in manifest.items()
+                ]
+            
+            with self._open_archive(snapshot) as archive:
+                def restore_file(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                    self._write_snapshot_file(
+                        snapshot, entry.rel_path, self.project_path / entry.rel_path, manifest, archive, progress
+                    )
+                
+                _, errors = run_jobs(entries, restore_file, "Restoring snapshot")
+            
+            if errors:
+                rel_str, error = errors[0]
+                more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+                raise RuntimeError(f"couldn't restore {rel_str}: {error}{more}")
+            
+            self._reindex_after_restore(snapshot)
             
             report("Restore complete!")
             
@@ -498,66 +1506,1102 @@ class SnapshotManager:
             
         except Exception as e:
             # Try to restore from safety backup
-            report("Restore failed, recovering from safety backup...")
-            try:
-                for item in safety_path.rglob("*"):
-                    if item.is_file():
-                        rel_path = item.relative_to(safety_path)
-                        dest = self.project_path / rel_path
-                        dest.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(item, dest)
-            except:
-                pass
+            if isinstance(e, SnapshotCancelled):
+                report("Restore cancelled, recovering from safety backup...")
+            else:
+                report("Restore failed, recovering from safety backup...")
+            
+            self._recover_from_backup(safety_path, report)
+            
+            if isinstance(e, SnapshotCancelled):
+                return SnapshotResult(
+                    success=False,
+                    message="Restore cancelled. Your files have been recovered."
+                )
             
             return SnapshotResult(
                 success=False,
                 message=f"Restore failed: {e}. Your files have been recovered."
             )
     
-    def delete_snapshot(self, snapshot: Snapshot) -> SnapshotResult:
-        """Delete a specific snapshot."""
-        if not snapshot.path.exists():
+    def _restore_delta(
+        self,
+        snapshot: Snapshot,
+        manifest: dict[str, dict],
+        report: Callable[[str], None],
+        run_jobs: Callable = _run_copy_jobs,
+    ) -> SnapshotResult:
+        """
+        Restore a snapshot by applying only what differs from the working tree.
+        
+        1. Compares the manifest with the project (stat index first, hashing
+           only files whose stat changed)
+        2. Backs up just the files that will be overwritten or deleted
+        3. Deletes extra files, then writes changed and missing ones
+        
+        Ignored files (venv/, build output...) are never touched. If anything
+        fails or is cancelled, files that were written are removed and the
+        backup is put back.
+        
+        run_jobs is _run_copy_jobs with restore_snapshot's report, transfer
+        and cancel arguments filled in.
+        """
+        safety_path = self._safety_path()
+        
+        report("Comparing files...")
+        
+        index = self._load_index()
+        live = list(self._iter_project_files())
+        
+        def live_hash(entry: FileEntry, progress: Callable[[int], None]) -> Optional[str]:
+            stored = manifest.get(entry.rel_path)
+            if stored is None or stored.get("size") != entry.size:
+                return None  # Deleted or obviously different - no need to read it
+            return self._cached_hash(index, entry) or hash_file(entry.path)
+        
+        try:
+            hashes, _ = run_jobs(live, live_hash, "Comparing files")
+        except SnapshotCancelled:
             return SnapshotResult(
                 success=False,
-                message="Snapshot doesn't exist"
+                message="Restore cancelled"
             )
         
-        try:
-            shutil.rmtree(snapshot.path)
+        to_delete = [entry for entry in live if entry.rel_path not in manifest]
+        to_overwrite = [
+            entry for entry in live
+            if entry.rel_path in manifest and hashes.get(entry.rel_path) != manifest[entry.rel_path]["hash"]
+        ]
+        live_paths = {entry.rel_path for entry in live}
+        to_write = [rel_str for rel_str in manifest if rel_str not in live_paths]
+        to_write += [entry.rel_path for entry in to_overwrite]
+        
+        if not to_delete and not to_write:
+            self._reindex_after_restore(snapshot)
+            report("Restore complete!")
             return SnapshotResult(
                 success=True,
-                message=f"Deleted '{snapshot.display_name}'"
+                message=f"Restored to '{snapshot.display_name}' (no files changed)"
             )
-        except Exception as e:
+        
+        backed_up = to_delete + to_overwrite
+        report(f"Backing up {len(backed_up)} files...")
+        
+        def back_up(entry: FileEntry, progress: Callable[[int], None]) -> None:
+            dest = safety_path / entry.rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            clone_or_copy(entry.path, dest, self.copy_mode, progress)
+        
+        try:
+            _, errors = run_jobs(backed_up, back_up, "Creating safety backup")
+        except SnapshotCancelled:
+            rmtree(safety_path)  # Nothing has been touched yet
             return SnapshotResult(
                 success=False,
-                message=f"Couldn't delete snapshot: {e}"
+                message="Restore cancelled"
             )
-    
-    def cleanup_safety_backups(self, max_age_hours: int = 24) -> int:
-        """
-        Remove old safety backups (created during restore operations).
         
-        Returns count of backups removed.
-        """
-        if not self.snapshots_dir.exists():
-            return 0
-        
-        removed = 0
-        cutoff = datetime.now().timestamp() - (max_age_hours * 3600)
+        if errors:
+            # Nothing has been touched yet - just drop the partial backup
+            rmtree(safety_path)
+            rel_str, error = errors[0]
+            return SnapshotResult(
+                success=False,
+                message=f"Couldn't create safety backup of {rel_str}: {error}"
+            )
         
-        for item in self.snapshots_dir.iterdir():
-            if item.is_dir() and item.name.startswith("_pre_restore_"):
-                try:
-                    if item.stat().st_mtime < cutoff:
-                        shutil.rmtree(item)
-                        removed += 1
-                except:
-                    pass
+        report(f"Restoring {len(to_write)} files...")
         
-        return removed
-    
-    def get_snapshot_by_name(self, name: str) -> Optional[Snapshot]:
+        try:
+            for entry in to_delete:
+                entry.path.unlink()
+            
+            # Remove folders the deletes left empty (unless the snapshot has files there)
+            keep_dirs = {str(Path(rel_str).parent) for rel_str in manifest}
+            for rel_dir in sorted({str(Path(entry.rel_path).parent) for entry in to_delete}, reverse=True):
+                while rel_dir != "." and rel_dir not in keep_dirs:
+                    try:
+                        (self.project_path / rel_dir).rmdir()
+                    except OSError:
+                        break  # Not empty (ignored files, more deletes to come...)
+                    rel_dir = str(Path(rel_dir).parent)
+            
+            entries = [
+                FileEntry(path=self.project_path / rel_str, rel_path=rel_str, is_dir=False, size=manifest[rel_str].get("size", 0))
+                for rel_str in sorted(to_write)
+            ]
+            
+            with self._open_archive(snapshot) as archive:
+                def restore_file(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                    self._write_snapshot_file(snapshot, entry.rel_path, entry.path, manifest, archive, progress)
+                
+                _, errors = run_jobs(entries, restore_file, "Restoring snapshot")
+            
+            if errors:
+                rel_str, error = errors[0]
+                more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+                raise RuntimeError(f"couldn't restore {rel_str}: {error}{more}")
+            
+            self._reindex_after_restore(snapshot)
+            
+            report("Restore complete!")
+            
+            return SnapshotResult(
+                success=True,
+                message=f"Restored to '{snapshot.display_name}' ({len(to_write)} written, {len(to_delete)} removed)"
+            )
+            
+        except Exception as e:
+            if isinstance(e, SnapshotCancelled):
+                report("Restore cancelled, recovering from safety backup...")
+            else:
+                report("Restore failed, recovering from safety backup...")
+            
+            # Take out files that weren't there before, then put the backup back
+            for rel_str in to_write:
+                if rel_str not in live_paths:
+                    try:
+                        (self.project_path / rel_str).unlink()
+                    except OSError:
+                        pass
+            
+            self._recover_from_backup(safety_path, report)
+            
+            if isinstance(e, SnapshotCancelled):
+                return SnapshotResult(
+                    success=False,
+                    message="Restore cancelled. Your files have been recovered."
+                )
+            
+            return SnapshotResult(
+                success=False,
+                message=f"Restore failed: {e}. Your files have been recovered."
+            )
+    
+    def _recover_from_backup(self, safety_path: Path, report: Callable[[str], None]) -> None:
+        """Copy a safety backup back over the project (best effort, never cancelled)."""
+        def recover(entry: FileEntry, progress: Callable[[int], None]) -> None:
+            dest = self.project_path / entry.rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            clone_or_copy(entry.path, dest, self.copy_mode, progress)
+        
+        try:
+            _run_copy_jobs(list(scan_tree(safety_path)), recover, "Recovering", report)
+        except:
+            pass
+    
+    def _open_archive(self, snapshot: Snapshot):
+        """Open an archive snapshot's files.zip (a no-op context for other snapshots)."""
+        if snapshot.storage == STORAGE_ARCHIVE:
+            return SnapshotArchive(snapshot.path / ARCHIVE_FILE)
+        return contextlib.nullcontext()
+    
+    def _write_snapshot_file(
+        self,
+        snapshot: Snapshot,
+        rel_str: str,
+        dest: Path,
+        manifest: Optional[dict[str, dict]],
+        archive: Optional[SnapshotArchive] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        Write one file from a snapshot to dest, with its original permissions and timestamp.
+        
+        archive must be the snapshot's open archive for archive snapshots.
+        """
+        stored = manifest.get(rel_str) if manifest else None
+        
+        if snapshot.storage == STORAGE_OBJECTS:
+            self.object_store.materialize(
+                stored["hash"],
+                dest,
+                mtime_ns=stored.get("mtime_ns"),
+                mode=stored.get("mode"),
+                progress=progress,
+                use_reflink=self.copy_mode == COPY_MODE_REFLINK,
+            )
+        elif snapshot.storage == STORAGE_ARCHIVE:
+            archive.extract(
+                rel_str,
+                dest,
+                mtime_ns=stored.get("mtime_ns") if stored else None,
+                mode=stored.get("mode") if stored else None,
+                progress=progress,
+            )
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            clone_or_copy(snapshot.path / rel_str, dest, self.copy_mode, progress)
+            
+            # Give back the recorded permissions - hardlinked snapshot files
+            # are read-only, and older snapshots may share their inodes
+            mode = stored.get("mode") if stored else None
+            if mode is not None:
+                os.chmod(dest, mode)
+            elif snapshot.copy_mode == COPY_MODE_HARDLINK:
+                os.chmod(dest, stat.S_IMODE(os.stat(dest).st_mode) | stat.S_IWUSR)
+    
+    def snapshot_has_file(self, snapshot: Snapshot, rel_path: str) -> bool:
+        """Check if a snapshot contains a file (relative, "/"-separated path)."""
+        manifest = self.get_manifest(snapshot)
+        if manifest is not None:
+            return rel_path in manifest
+        if snapshot.storage != STORAGE_FOLDER or rel_path in (METADATA_FILE, MANIFEST_FILE):
+            return False
+        return (snapshot.path / rel_path).is_file()
+    
+    def open_snapshot_file(self, snapshot: Snapshot, rel_path: str) -> BinaryIO:
+        """
+        Open one file from a snapshot for reading (e.g. to preview it).
+        
+        Only that file is read - archives and the object store aren't unpacked.
+        Raises FileNotFoundError if the snapshot doesn't have it.
+        """
+        if not self.snapshot_has_file(snapshot, rel_path):
+            raise FileNotFoundError(f"'{rel_path}' isn't in snapshot '{snapshot.display_name}'")
+        
+        if snapshot.storage == STORAGE_OBJECTS:
+            return self.object_store.open(self.get_manifest(snapshot)[rel_path]["hash"])
+        if snapshot.storage == STORAGE_ARCHIVE:
+            with SnapshotArchive(snapshot.path / ARCHIVE_FILE) as archive:
+                return archive.open(rel_path)
+        return open(snapshot.path / rel_path, "rb")
+    
+    def read_snapshot_file(self, snapshot: Snapshot, rel_path: str) -> bytes:
+        """Read one file's contents from a snapshot."""
+        with self.open_snapshot_file(snapshot, rel_path) as f:
+            return f.read()
+    
+    def snapshot_files(self, snapshot: Snapshot) -> list[str]:
+        """List the files in a snapshot (relative, "/"-separated paths), sorted."""
+        manifest = self.get_manifest(snapshot)
+        if manifest is not None:
+            return sorted(manifest)
+        if snapshot.storage != STORAGE_FOLDER:
+            return []
+        return sorted(
+            entry.rel_path for entry in scan_tree(snapshot.path)
+            if entry.rel_path not in (METADATA_FILE, MANIFEST_FILE)
+        )
+    
+    def restore_file(self, snapshot: Snapshot, rel_path: str) -> SnapshotResult:
+        """
+        Restore a single file from a snapshot, leaving everything else alone.
+        
+        The current version of the file (if any) is copied to a
+        _pre_restore_* folder first.
+        """
+        return self.restore_paths(snapshot, [rel_path])
+    
+    def restore_paths(
+        self,
+        snapshot: Snapshot,
+        paths: Iterable[str],
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> SnapshotResult:
+        """
+        Restore selected files and folders from a snapshot, leaving everything else alone.
+        
+        Unlike restore_snapshot, the project isn't walked at all. Only the
+        selected files are looked at: ones that already match the snapshot
+        are skipped, and each one about to be overwritten is copied to a
+        _pre_restore_* folder first. Files the snapshot doesn't have are
+        left in place. If anything fails or is cancelled, the files that
+        were written are put back.
+        
+        Args:
+            snapshot: The snapshot to restore from
+            paths: Files, or folders (everything under them), as relative "/"-separated paths
+            progress_callback: Optional callback for progress updates
+            transfer_callback: Optional callback for (files_done, total_files, bytes_done, total_bytes)
+            cancel_event: Set it to stop; files already written are put back
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        run_jobs = functools.partial(_run_copy_jobs, report=report, transfer=transfer_callback, cancel=cancel_event)
+        
+        if not snapshot.path.exists():
+            return SnapshotResult(
+                success=False,
+                message="Snapshot no longer exists"
+            )
+        
+        wanted = {path.replace("\\", "/").strip("/") for path in paths}
+        
+        def is_selected(rel_str: str) -> bool:
+            # The file itself or any folder above it
+            while rel_str:
+                if rel_str in wanted:
+                    return True
+                rel_str = rel_str.rpartition("/")[0]
+            return "" in wanted
+        
+        manifest = self.get_manifest(snapshot)
+        selected = [rel_str for rel_str in self.snapshot_files(snapshot) if is_selected(rel_str)]
+        if not selected:
+            return SnapshotResult(
+                success=False,
+                message="None of the selected files are in this snapshot"
+            )
+        
+        entries = [
+            FileEntry(
+                path=self.project_path / rel_str,
+                rel_path=rel_str,
+                is_dir=False,
+                size=manifest[rel_str]["size"] if manifest else (snapshot.path / rel_str).stat().st_size,
+            )
+            for rel_str in selected
+        ]
+        safety_path = self._safety_path()
+        
+        # Per file: skip it if it already matches, back it up if it doesn't
+        def back_up(entry: FileEntry, progress: Callable[[int], None]) -> str:
+            if not entry.path.is_file():
+                return "new"
+            stored = manifest.get(entry.rel_path) if manifest else None
+            if stored and os.path.getsize(entry.path) == stored["size"] and hash_file(entry.path) == stored["hash"]:
+                return "same"
+            
+            dest = safety_path / entry.rel_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            clone_or_copy(entry.path, dest, self.copy_mode, progress)
+            return "backed_up"
+        
+        try:
+            states, errors = run_jobs(entries, back_up, "Creating safety backup")
+        except SnapshotCancelled:
+            if safety_path.exists():
+                rmtree(safety_path)  # Nothing has been touched yet
+            return SnapshotResult(
+                success=False,
+                message="Restore cancelled"
+            )
+        
+        if errors:
+            if safety_path.exists():
+                rmtree(safety_path)
+            rel_str, error = errors[0]
+            return SnapshotResult(
+                success=False,
+                message=f"Couldn't create safety backup of {rel_str}: {error}"
+            )
+        
+        to_write = [entry for entry in entries if states[entry.rel_path] != "same"]
+        report(f"Restoring {len(to_write)} files...")
+        
+        try:
+            with self._open_archive(snapshot) as archive:
+                def restore_file(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                    self._write_snapshot_file(snapshot, entry.rel_path, entry.path, manifest, archive, progress)
+                
+                _, errors = run_jobs(to_write, restore_file, "Restoring files")
+            
+            if errors:
+                rel_str, error = errors[0]
+                more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+                raise RuntimeError(f"couldn't restore {rel_str}: {error}{more}")
+        except Exception as e:
+            if isinstance(e, SnapshotCancelled):
+                report("Restore cancelled, recovering from safety backup...")
+            else:
+                report("Restore failed, recovering from safety backup...")
+            
+            # Take out files that weren't there before, then put the backup back
+            for entry in to_write:
+                if states[entry.rel_path] == "new":
+                    try:
+                        entry.path.unlink()
+                    except OSError:
+                        pass
+            
+            self._recover_from_backup(safety_path, report)
+            
+            if isinstance(e, SnapshotCancelled):
+                return SnapshotResult(
+                    success=False,
+                    message="Restore cancelled. Your files have been recovered."
+                )
+            
+            return SnapshotResult(
+                success=False,
+                message=f"Restore failed: {e}. Your files have been recovered."
+            )
+        
+        # The index's hashes for these paths describe the files we just replaced
+        self._forget_indexed(entry.rel_path for entry in to_write)
+        
+        report("Restore complete!")
+        
+        if len(selected) == 1 and selected[0] in wanted:
+            message = f"Restored '{selected[0]}' from '{snapshot.display_name}'"
+        else:
+            message = f"Restored {len(to_write)} files from '{snapshot.display_name}'"
+        unchanged = len(selected) - len(to_write)
+        if unchanged:
+            message += f" ({unchanged} already matched)"
+        
+        return SnapshotResult(
+            success=True,
+            message=message,
+            snapshot=snapshot
+        )
+    
+    def _reindex_after_restore(self, snapshot: Snapshot) -> None:
+        """
+        Point the stat index at the snapshot that was just restored.
+        
+        The restored files are byte-for-byte the snapshot's, so their hashes
+        come straight from its manifest - one walk of the tree, no reading.
+        """
+        manifest = self.get_manifest(snapshot)
+        if manifest is None:
+            # Older snapshot without hashes - let the next save rebuild the index
+            try:
+                self.index_file.unlink()
+            except OSError:
+                pass
+            return
+        
+        files = {}
+        for entry in self._iter_project_files():
+            if entry.rel_path in manifest:
+                files[entry.rel_path] = [entry.size, entry.mtime_ns, entry.inode, manifest[entry.rel_path]["hash"]]
+        
+        self._save_index(snapshot.name, files)
+    
+    def delete_snapshot(self, snapshot: Snapshot) -> SnapshotResult:
+        """Delete a specific snapshot."""
+        if not snapshot.path.exists():
+            return SnapshotResult(
+                success=False,
+                message="Snapshot doesn't exist"
+            )
+        
+        try:
+            self._delete_snapshot_folder(snapshot)
+            return SnapshotResult(
+                success=True,
+                message=f"Deleted '{snapshot.display_name}'"
+            )
+        except Exception as e:
+            return SnapshotResult(
+                success=False,
+                message=f"Couldn't delete snapshot: {e}"
+            )
+    
+    def prune_snapshots(self) -> list[str]:
+        """
+        Delete every snapshot the retention policy no longer keeps.
+        
+        Returns the display names of the deleted snapshots.
+        """
+        deleted = []
+        for snapshot in self.retention.select_expired(self.list_snapshots()):
+            try:
+                self._delete_snapshot_folder(snapshot)
+                deleted.append(snapshot.display_name)
+            except Exception:
+                pass  # Try again on the next pass
+        return deleted
+    
+    def prune_in_background(self, snapshots: list[Snapshot]) -> None:
+        """
+        Delete snapshots without holding up the caller.
+        
+        They leave the listing straight away (see _detach_snapshot); their
+        files are deleted on a background thread, one pass at a time.
+        """
+        detached = []
+        for snapshot in snapshots:
+            try:
+                detached.append((self._detach_snapshot(snapshot), snapshot.storage))
+            except Exception:
+                pass  # Still listed - the next prune tries again
+        
+        self._delete_in_background(detached)
+    
+    def _delete_in_background(self, folders: list[tuple[Path, str]]) -> None:
+        """Queue (folder, storage) pairs that are out of the listing for deletion."""
+        with self._prune_lock:
+            self._prune_queue.extend(folders)
+            
+            if self._prune_thread is not None:
+                return  # The running pass picks these up
+            
+            self._prune_thread = threading.Thread(target=self._prune_worker, daemon=True)
+            self._prune_thread.start()
+    
+    def _prune_worker(self) -> None:
+        """Delete detached snapshot folders until the queue is empty."""
+        while True:
+            with self._prune_lock:
+                if not self._prune_queue:
+                    self._prune_thread = None
+                    return
+                trash, storage = self._prune_queue.pop(0)
+            
+            try:
+                rmtree(trash)
+                if storage == STORAGE_OBJECTS:
+                    self._prune_objects()
+            except Exception:
+                pass  # Leftover _deleting_ folders are cleared by a later pass
+    
+    def verify(
+        self,
+        snapshot: Snapshot,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+    ) -> VerifyResult:
+        """
+        Check every file in a snapshot against the checksum in its manifest.
+        
+        Catches snapshots that were only half synced by a cloud drive, or
+        damaged on disk. Files are hashed in parallel; object-store files
+        that share content are only read once.
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        result = VerifyResult(snapshot)
+        manifest = self.get_manifest(snapshot)
+        if manifest is None:
+            result.verifiable = False
+            return result
+        
+        # Object-store snapshots: one check per blob, whichever files share it
+        paths_by_hash: dict[str, list[str]] = {}
+        for rel_str, info in sorted(manifest.items()):
+            paths_by_hash.setdefault(info["hash"], []).append(rel_str)
+        if snapshot.storage == STORAGE_OBJECTS:
+            to_check = [paths[0] for paths in paths_by_hash.values()]
+        else:
+            to_check = sorted(manifest)
+        
+        entries = [
+            FileEntry(path=snapshot.path / rel_str, rel_path=rel_str, is_dir=False, size=manifest[rel_str]["size"])
+            for rel_str in to_check
+        ]
+        
+        try:
+            archive = SnapshotArchive(snapshot.path / ARCHIVE_FILE) if snapshot.storage == STORAGE_ARCHIVE else None
+        except (OSError, zipfile.BadZipFile):
+            result.checked = len(manifest)
+            result.missing = sorted(manifest)
+            return result
+        
+        def check(entry: FileEntry, progress: Callable[[int], None]) -> bool:
+            expected = manifest[entry.rel_path]["hash"]
+            if snapshot.storage == STORAGE_OBJECTS:
+                stream = self.object_store.open(expected)
+            elif archive is not None:
+                stream = archive.open(entry.rel_path)
+            else:
+                stream = open(entry.path, "rb")
+            
+            digest = hashlib.sha256()
+            with stream:
+                for block in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    digest.update(block)
+                    progress(len(block))
+            return digest.hexdigest() == expected
+        
+        try:
+            matches, errors = _run_copy_jobs(entries, check, "Verifying", report, transfer=transfer_callback)
+        finally:
+            if archive is not None:
+                archive.close()
+        
+        def affected(rel_str: str) -> list[str]:
+            if snapshot.storage == STORAGE_OBJECTS:
+                return paths_by_hash[manifest[rel_str]["hash"]]
+            return [rel_str]
+        
+        for rel_str, error in errors:
+            if isinstance(error, (FileNotFoundError, KeyError)):
+                result.missing.extend(affected(rel_str))
+            else:
+                result.corrupted.extend(affected(rel_str))  # Unreadable, or a zip CRC error
+        for rel_str, match in matches.items():
+            if not match:
+                result.corrupted.extend(affected(rel_str))
+        
+        result.checked = len(manifest)
+        result.missing.sort()
+        result.corrupted.sort()
+        report(result.summary)
+        return result
+    
+    def gc(self, max_backup_age_hours: int = 24) -> CleanupResult:
+        """
+        Clear out everything snapshots no longer need, in one pass:
+        
+        - Objects (and chunks) no snapshot's manifest points at
+        - Safety backups (_pre_restore_*) older than max_backup_age_hours
+        - _deleting_* folders a background delete didn't finish
+        - Staging folders of snapshots that were killed halfway
+        """
+        result = CleanupResult()
+        if not self.snapshots_dir.exists():
+            return result
+        
+        cutoff = datetime.now().timestamp() - (max_backup_age_hours * 3600)
+        with self._prune_lock:
+            queued = {path for path, _storage in self._prune_queue}
+        
+        for item in self.snapshots_dir.iterdir():
+            if not item.is_dir():
+                continue
+            
+            if item.name.startswith("_pre_restore_"):
+                # The name says when it was made - cloud sync can bump mtimes
+                try:
+                    timestamp = item.name[len("_pre_restore_"):][:len("YYYYmmdd_HHMMSS")]
+                    created = datetime.strptime(timestamp, "%Y%m%d_%H%M%S").timestamp()
+                except ValueError:
+                    created = item.stat().st_mtime
+                if created >= cutoff:
+                    continue
+                rmtree(item)
+                result.safety_backups_removed += 1
+            elif item.name.startswith("_deleting_") and item not in queued:
+                rmtree(item)
+                result.leftovers_removed += 1
+        
+        for item in self._stale_staging():
+            rmtree(item)
+            result.leftovers_removed += 1
+        
+        result.objects_removed, result.bytes_freed = self._prune_objects()
+        self.object_store.clean_tmp(STAGING_MAX_AGE)
+        return result
+    
+    def export_bundle(
+        self,
+        snapshots: list[Snapshot],
+        dest: Path,
+        project_config: Optional[dict] = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+    ) -> SnapshotResult:
+        """
+        Write one or more snapshots to a single portable bundle file.
+        
+        The bundle is a ZIP with bundle.json (each snapshot's metadata and
+        manifest, plus project_config) and each distinct file content once,
+        however many snapshots share it. Big files are cut into chunks the
+        way the object store cuts them, so versions of a big file only add
+        the chunks that differ. Contents stream straight from the snapshots
+        into the bundle - nothing is unpacked or copied first - and are
+        checked against the manifest on the way.
+        
+        Args:
+            snapshots: Snapshots to export
+            dest: Bundle file to write (replaced if it exists)
+            project_config: Project settings to carry along (see Project.import_bundle)
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        snapshots = sorted(snapshots, key=lambda s: s.created)
+        if not snapshots:
+            return SnapshotResult(success=False, message="No snapshots to export")
+        
+        records = []
+        sources: dict[str, tuple[Snapshot, str]] = {}  # hash -> first snapshot file with it
+        sizes: dict[str, int] = {}
+        for snapshot in snapshots:
+            manifest = self.get_manifest(snapshot)
+            if manifest is None:
+                return SnapshotResult(
+                    success=False,
+                    message=f"'{snapshot.display_name}' has no file list and can't be exported"
+                )
+            for rel_str, info in manifest.items():
+                if info["hash"] not in sources:
+                    sources[info["hash"]] = (snapshot, rel_str)
+                    sizes[info["hash"]] = info["size"]
+            
+            records.append({
+                "name": snapshot.name,
+                "metadata": self._load_snapshot_metadata(snapshot.path) or {
+                    "created": snapshot.created.isoformat(),
+                    "note": snapshot.note,
+                    "file_count": snapshot.file_count,
+                    "total_size": snapshot.total_size,
+                },
+                "manifest": manifest,
+            })
+        
+        chunk_lists: dict[str, list] = {}  # Big file hash -> [[chunk hash, size], ...]
+        written: set[str] = set()
+        
+        # Written next to dest and renamed at the end, so a failed export
+        # never leaves a truncated bundle behind
+        dest = Path(dest)
+        tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.part")
+        archives: dict[str, SnapshotArchive] = {}
+        
+        try:
+            with SnapshotArchive(tmp, "w") as bundle:
+                def export_object(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                    digest = entry.rel_path
+                    snapshot, rel_str = sources[digest]
+                    if snapshot.storage == STORAGE_OBJECTS:
+                        stream = self.object_store.open(digest)
+                    elif snapshot.storage == STORAGE_ARCHIVE:
+                        if snapshot.name not in archives:
+                            archives[snapshot.name] = SnapshotArchive(snapshot.path / ARCHIVE_FILE)
+                        stream = archives[snapshot.name].open(rel_str)
+                    else:
+                        stream = open(snapshot.path / rel_str, "rb")
+                    
+                    mtime_ns = int(snapshot.created.timestamp()) * 1_000_000_000
+                    with stream:
+                        if sizes[digest] < CHUNKING_THRESHOLD:
+                            content_digest = bundle.add_stream(stream, f"objects/{digest}", mtime_ns, progress=progress)
+                        else:
+                            file_digest = hashlib.sha256()
+                            chunks = []
+                            for data in iter_chunks(stream):
+                                file_digest.update(data)
+                                chunk_digest = hashlib.sha256(data).hexdigest()
+                                chunks.append([chunk_digest, len(data)])
+                                if chunk_digest not in written:
+                                    bundle.add_stream(io.BytesIO(data), f"objects/{chunk_digest}", mtime_ns)
+                                    written.add(chunk_digest)
+                                progress(len(data))
+                            content_digest = file_digest.hexdigest()
+                            chunk_lists[digest] = chunks
+                    
+                    if content_digest != digest:
+                        raise ValueError(f"'{rel_str}' in '{snapshot.display_name}' is damaged")
+                
+                entries = [
+                    FileEntry(path=dest, rel_path=digest, is_dir=False, size=sizes[digest])
+                    for digest in sources
+                ]
+                # A ZIP has a single writer
+                _, errors = _run_copy_jobs(entries, export_object, "Exporting", report, workers=1, transfer=transfer_callback)
+                if errors:
+                    raise errors[0][1]
+                
+                bundle.add_bytes(BUNDLE_INDEX, json.dumps({
+                    "format": BUNDLE_FORMAT,
+                    "version": 1,
+                    "exported": datetime.now().isoformat(),
+                    "project": project_config or {"name": self.project_path.name},
+                    "snapshots": records,
+                    "chunks": chunk_lists,
+                }).encode("utf-8"))
+            
+            fsync_path(tmp)
+            os.replace(tmp, dest)
+        except Exception as e:
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+            return SnapshotResult(success=False, message=f"Export failed: {e}")
+        finally:
+            for archive in archives.values():
+                archive.close()
+        
+        report("Export complete!")
+        return SnapshotResult(
+            success=True,
+            message=f"Exported {len(snapshots)} snapshot{'s' if len(snapshots) != 1 else ''} "
+                    f"({format_size(dest.stat().st_size)})",
+            snapshot=snapshots[-1],
+        )
+    
+    def import_bundle(
+        self,
+        bundle_path: Path,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        transfer_callback: Optional[TransferCallback] = None,
+    ) -> SnapshotResult:
+        """
+        Add the snapshots in a bundle (see export_bundle) to this project.
+        
+        Each is rebuilt in this project's own storage mode, straight from
+        the bundle, and published the same way create_snapshot publishes.
+        Snapshots already here (same name and time) are skipped, so
+        importing a bundle twice is harmless. The project's files aren't
+        touched.
+        
+        Returns:
+            SnapshotResult whose snapshot is the newest one imported
+        """
+        def report(msg: str):
+            if progress_callback:
+                progress_callback(msg)
+        
+        try:
+            index = read_bundle(bundle_path)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            return SnapshotResult(success=False, message=f"Can't read bundle: {e}")
+        
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        existing = {(s.name, s.created) for s in self.list_snapshots()}
+        imported: list[Snapshot] = []
+        skipped = 0
+        
+        try:
+            with SnapshotArchive(bundle_path) as bundle:
+                for record in index["snapshots"]:
+                    meta = record["metadata"]
+                    manifest: dict[str, dict] = record["manifest"]
+                    created = datetime.fromisoformat(meta["created"])
+                    if (record["name"], created) in existing:
+                        skipped += 1
+                        continue
+                    
+                    label = f"Importing {record['name']}"
+                    report(f"{label}...")
+                    snapshot = self._import_bundle_snapshot(
+                        bundle, index.get("chunks", {}), record["name"], meta.get("note", ""), created, manifest,
+                        functools.partial(_run_copy_jobs, label=label, report=report, transfer=transfer_callback),
+                    )
+                    imported.append(snapshot)
+        except Exception as e:
+            return SnapshotResult(
+                success=False,
+                message=f"Import failed after {len(imported)} snapshot{'s' if len(imported) != 1 else ''}: {e}",
+                snapshot=imported[-1] if imported else None,
+            )
+        
+        report("Import complete!")
+        message = f"Imported {len(imported)} snapshot{'s' if len(imported) != 1 else ''}"
+        if skipped:
+            message += f" ({skipped} already here)"
+        return SnapshotResult(
+            success=True,
+            message=message,
+            snapshot=imported[-1] if imported else None,
+        )
+    
+    def _import_bundle_snapshot(
+        self,
+        bundle: SnapshotArchive,
+        chunk_lists: dict[str, list],
+        snapshot_name: str,
+        note: str,
+        created: datetime,
+        manifest: dict[str, dict],
+        run_jobs: Callable,
+    ) -> Snapshot:
+        """Rebuild one bundled snapshot in a staging folder and publish it."""
+        staging_path = self.snapshots_dir / self._staging_name()
+        staging_path.mkdir(parents=True)
+        
+        try:
+            archive = None
+            if self.storage == STORAGE_ARCHIVE:
+                archive = SnapshotArchive(staging_path / ARCHIVE_FILE, "w")
+            
+            def open_content(digest: str) -> BinaryIO:
+                if digest not in chunk_lists:
+                    return bundle.open(f"objects/{digest}")
+                return io.BufferedReader(ChunkedReader([
+                    functools.partial(bundle.open, f"objects/{chunk}") for chunk, _size in chunk_lists[digest]
+                ]), CHUNK_SIZE)
+            
+            def import_file(entry: FileEntry, progress: Callable[[int], None]) -> None:
+                info = manifest[entry.rel_path]
+                with open_content(info["hash"]) as stream:
+                    if self.storage == STORAGE_OBJECTS:
+                        digest = self.object_store.put_stream(stream, info["size"], progress)
+                    elif archive is not None:
+                        digest = archive.add_stream(stream, entry.rel_path, info["mtime_ns"], info.get("mode", 0o644), progress)
+                    else:
+                        dest = staging_path / entry.rel_path
+                        dest.parent.mkdir(parents=True, exist_ok=True)
+                        hasher = hashlib.sha256()
+                        with open(dest, "wb") as fdest:
+                            for block in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                                hasher.update(block)
+                                fdest.write(block)
+                                progress(len(block))
+                        digest = hasher.hexdigest()
+                        if info.get("mode") is not None:
+                            os.chmod(dest, info["mode"])
+                        os.utime(dest, ns=(info["mtime_ns"], info["mtime_ns"]))
+                        fsync_path(dest)
+                if digest != info["hash"]:
+                    raise ValueError(f"'{entry.rel_path}' is damaged in the bundle")
+                if self.storage == STORAGE_OBJECTS and not self._hold_object(held, digest):
+                    import_file(entry, progress)  # Pruned before it was held - store it again
+            
+            # New blobs aren't referenced until the snapshot is in the catalog
+            with self._holding_objects() as held:
+                if self.storage == STORAGE_OBJECTS:
+                    # One job per distinct content - the rest are already stored
+                    to_store: dict[str, str] = {}
+                    for rel_str, info in sorted(manifest.items()):
+                        if not self._hold_object(held, info["hash"]):
+                            to_store.setdefault(info["hash"], rel_str)
+                    paths = sorted(to_store.values())
+                else:
+                    paths = sorted(manifest)
+                entries = [
+                    FileEntry(path=staging_path / rel_str, rel_path=rel_str, is_dir=False, size=manifest[rel_str]["size"])
+                    for rel_str in paths
+                ]
+                
+                try:
+                    # An archive has a single writer
+                    workers = 1 if archive is not None else COPY_WORKERS
+                    _, errors = run_jobs(entries, import_file, workers=workers)
+                finally:
+                    if archive is not None:
+                        archive.close()
+                if errors:
+                    raise errors[0][1]
+                
+                total_size = sum(info["size"] for info in manifest.values())
+                self._save_manifest(staging_path, manifest)
+                meta = self._save_snapshot_metadata(
+                    staging_path, note, len(manifest), total_size, self.storage, COPY_MODE_COPY, created
+                )
+                
+                for name in (MANIFEST_FILE, METADATA_FILE, ARCHIVE_FILE if archive is not None else None):
+                    if name:
+                        fsync_path(staging_path / name)
+                folders = {staging_path}
+                for rel_str in manifest:
+                    folders.update((staging_path / rel_str).parents)
+                for folder in sorted(folders, reverse=True):
+                    if folder.is_relative_to(staging_path):
+                        fsync_path(folder)
+                
+                snapshot_path = self._publish_staging(staging_path, snapshot_name)
+                self.catalog.add(snapshot_path.name, meta)
+        except Exception:
+            if staging_path.exists():
+                with contextlib.suppress(OSError):
+                    rmtree(staging_path)
+            raise
+        
+        return self._snapshot_from_metadata(snapshot_path, meta)
+    
+    def materialize_snapshot(
+        self,
+        snapshot: Snapshot,
+        dest: Optional[Path] = None,
+        use_hardlinks: bool = True,
+    ) -> Path:
+        """
+        Build a browsable folder of a snapshot's files (e.g. to open in Finder).
+        
+        Folder snapshots are already browsable and are returned as-is.
+        Object-store and archive snapshots are written out to `dest`
+        (default: a "files" folder inside the snapshot). With use_hardlinks
+        object-store files share the read-only blobs and take no extra space.
+        
+        Returns the folder path.
+        """
+        if snapshot.storage == STORAGE_FOLDER:
+            return snapshot.path
+        
+        if dest is None:
+            dest = snapshot.path / "files"
+        
+        if dest.exists():
+            return dest
+        
+        manifest = self.get_manifest(snapshot) or {}
+        
+        if snapshot.storage == STORAGE_ARCHIVE:
+            with SnapshotArchive(snapshot.path / ARCHIVE_FILE) as archive:
+                for rel_str, entry in manifest.items():
+                    archive.extract(rel_str, dest / rel_str, mtime_ns=entry.get("mtime_ns"), mode=entry.get("mode"))
+            return dest
+        
+        for rel_str, entry in manifest.items():
+            self.object_store.materialize(
+                entry["hash"],
+                dest / rel_str,
+                use_hardlink=use_hardlinks,
+                mtime_ns=entry.get("mtime_ns"),
+                mode=entry.get("mode"),
+            )
+        
+        return dest
+    
+    def _file_states(self, snapshot: Optional[Snapshot]) -> dict[str, list]:
+        """
+        {path: [size, hash or None]} for a snapshot, or the working tree if None.
+        
+        Hashes come from the manifest (or the stat index for the working
+        tree). Where none is stored it's left as None and only worked out
+        if a file's size can't already tell the two sides apart.
+        """
+        if snapshot is None:
+            index = self._load_index()
+            return {
+                entry.rel_path: [entry.size, self._cached_hash(index, entry)]
+                for entry in self._iter_project_files()
+            }
+        
+        manifest = self.get_manifest(snapshot)
+        if manifest is not None:
+            return {rel_str: [entry.get("size", 0), entry["hash"]] for rel_str, entry in manifest.items()}
+        
+        # Older folder snapshot without a manifest
+        return {
+            entry.rel_path: [entry.size, None]
+            for entry in scan_tree(snapshot.path)
+            if entry.rel_path not in (METADATA_FILE, MANIFEST_FILE)
+        }
+    
+    def _read_version_file(self, version: Optional[Snapshot], rel_path: str) -> bytes:
+        """Read a file from a snapshot, or from the working tree if version is None."""
+        if version is None:
+            return (self.project_path / rel_path).read_bytes()
+        return self.read_snapshot_file(version, rel_path)
+    
+    def diff(self, old: Optional[Snapshot], new: Optional[Snapshot] = None) -> SnapshotDiff:
+        """
+        Compare two versions file by file.
+        
+        Args:
+            old: Earlier snapshot (None = working tree)
+            new: Later snapshot (None = working tree, the default)
+        
+        Snapshots with manifests are compared purely by their stored
+        hashes - no file contents are read. Call text_diff() on the result
+        for a unified diff of a single file.
+        """
+        old_files = self._file_states(old)
+        new_files = self._file_states(new)
+        result = SnapshotDiff(old=old, new=new, _read=self._read_version_file)
+        
+        def file_hash(version: Optional[Snapshot], rel_str: str, state: list) -> str:
+            if state[1] is None:
+                path = (self.project_path if version is None else version.path) / rel_str
+                state[1] = hash_file(path)
+            return state[1]
+        
+        for rel_str in sorted(old_files.keys() | new_files.keys()):
+            before = old_files.get(rel_str)
+            after = new_files.get(rel_str)
+            
+            if before is None:
+                result.added.append(FileChange(rel_str, "added", new_size=after[0]))
+            elif after is None:
+                result.removed.append(FileChange(rel_str, "removed", old_size=before[0]))
+            elif before[0] != after[0] or file_hash(old, rel_str, before) != file_hash(new, rel_str, after):
+                result.modified.append(FileChange(rel_str, "modified", old_size=before[0], new_size=after[0]))
+        
+        return result
+    
+    def get_snapshot_by_name(self, name: str) -> Optional[Snapshot]:
         """Find a snapshot by its folder name."""
         for snapshot in self.list_snapshots():
             if snapshot.name == name:
@@ -567,6 +2611,46 @@ class SnapshotManager:
 
 # Convenience functions for use without instantiating the class
 
+def read_bundle(bundle_path: Path) -> dict:
+    """
+    Read a bundle's bundle.json: its project settings and snapshot list.
+    
+    Raises ValueError if the file isn't a TPC bundle.
+    """
+    with zipfile.ZipFile(bundle_path) as z:
+        try:
+            index = json.loads(z.read(BUNDLE_INDEX))
+        except KeyError:
+            raise ValueError(f"'{Path(bundle_path).name}' isn't a TPC bundle")
+    
+    if index.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"'{Path(bundle_path).name}' isn't a TPC bundle")
+    if index.get("version", 1) > 1:
+        raise ValueError("This bundle was made by a newer version of TPC")
+    
+    # Names and paths in a bundle end up as paths on disk - nothing may
+    # point outside the snapshot folder or the project
+    for record in index.get("snapshots", []):
+        name = record.get("name")
+        if not _is_safe_rel_path(name) or "/" in name:
+            raise ValueError(f"Bundle has a snapshot with a bad name: {name!r}")
+        if not isinstance(record.get("manifest"), dict):
+            raise ValueError(f"Bundle snapshot '{name}' has no file list")
+        for rel_str in record["manifest"]:
+            if not _is_safe_rel_path(rel_str):
+                raise ValueError(f"Bundle snapshot '{name}' has a bad file path: {rel_str!r}")
+    return index
+
+
+def _is_safe_rel_path(rel_str: Any) -> bool:
+    """Whether a "/"-separated path stays inside the folder it's relative to."""
+    if not isinstance(rel_str, str) or not rel_str or "\\" in rel_str:
+        return False
+    if rel_str.startswith("/") or PureWindowsPath(rel_str).drive:
+        return False
+    return all(part not in ("", ".", "..") for part in rel_str.split("/"))
+
+
 def create_project_snapshot(project_path: Path, note: str = "", snapshot_limit: int = 10) -> SnapshotResult:
     """Create a snapshot for a project."""
     manager = SnapshotManager(project_path, snapshot_limit)
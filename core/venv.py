@@ -6,16 +6,25 @@ Users never see these - they just click "Build" and it works.
 
 Venvs are stored at ~/.tpc/venvs/ProjectName/ to keep them
 out of the project folder and avoid confusing version control.
+
+They're made with uv when it's installed, or with venv and pip
+(see env_backends.py).
 """
 
+import re
 import subprocess
 import sys
 import platform
+import threading
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional, Callable
 import shutil
 
+from .env_backends import EnvironmentBackend, get_backend
+from .resolver import ModuleResolver
+from .walker import tree_size
+
 
 def _subprocess_args() -> dict:
     """
@@ -54,6 +63,22 @@ OPTIONAL_PACKAGES = {
     'keyboard',         # Can have permission issues
 }
 
+# Time allowed per package; a batch install gets this times the package count
+INSTALL_TIMEOUT = 300
+
+# File in each venv naming the backend that created it
+BACKEND_MARKER = "tpc-backend"
+
+
+def _requirement_name(requirement: str) -> str:
+    """
+    Normalized project name of a requirement, for matching install output.
+    
+    "PyQt6>=6.5" -> "pyqt6", "ruamel.yaml" -> "ruamel-yaml" (PEP 503).
+    """
+    name = re.split(r"[\s\[<>=!~;@]", requirement.strip(), maxsplit=1)[0]
+    return re.sub(r"[-_.]+", "-", name).lower()
+
 
 def find_best_python() -> tuple[str, str, list[str]]:
     """
@@ -247,10 +272,40 @@ class EnvironmentWrangler:
         
         # Get the Python executable for the venv
         python = wrangler.get_python_path("MyProject")
+    
+    Venvs are made by the backend from the app config (uv when it's
+    installed, venv + pip otherwise) unless one is passed in. After that
+    each venv keeps using the backend that made it.
     """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[EnvironmentBackend] = None):
         self.venvs_dir = TPC_VENVS_DIR
+        self._backend = backend
+    
+    @property
+    def backend(self) -> EnvironmentBackend:
+        """The environment backend, looked up the first time it's needed."""
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+    
+    def _venv_backend(self, project_name: str) -> EnvironmentBackend:
+        """
+        The backend for an existing venv: the one that created it.
+        
+        uv leaves pip out of its venvs, so switching env_backend to "pip"
+        mustn't switch the venvs uv already made.
+        """
+        try:
+            name = (self._get_venv_path(project_name) / BACKEND_MARKER).read_text().strip()
+        except OSError:
+            # Made before venvs were marked - only uv's lack pip
+            pip_missing = not self.get_pip_path(project_name).exists()
+            name = "uv" if self.backend.uses_pip and pip_missing else self.backend.name
+        
+        if name == self.backend.name:
+            return self.backend
+        return get_backend(name)
     
     def _get_venv_path(self, project_name: str) -> Path:
         """Get the path to a project's venv directory."""
@@ -282,6 +337,17 @@ class EnvironmentWrangler:
         python_path = self.get_python_path(project_name)
         return python_path.exists()
     
+    def get_module_resolver(self, project_name: str) -> ModuleResolver:
+        """
+        Get a ModuleResolver for the project's venv, for dependency scans.
+        
+        Falls back to TPC's own Python if the venv hasn't been created yet.
+        """
+        return ModuleResolver.for_venv(
+            self._get_venv_path(project_name),
+            self.get_python_path(project_name),
+        )
+    
     def create_venv(self, project_name: str, force: bool = False) -> VenvResult:
         """
         Create a virtual environment for a project.
@@ -341,7 +407,7 @@ class EnvironmentWrangler:
             python_exe, python_version, version_warnings = find_best_python()
             
             result = subprocess.run(
-                [python_exe, "-m", "venv", str(venv_path)],
+                self.backend.create_command(python_exe, venv_path),
                 capture_output=True,
                 text=True,
                 timeout=120,  # 2 minute timeout
@@ -363,17 +429,23 @@ class EnvironmentWrangler:
                     details=f"Expected at: {self.get_python_path(project_name)}"
                 )
             
-            # Upgrade pip to avoid warnings
-            pip_path = self.get_pip_path(project_name)
-            subprocess.run(
-                [str(pip_path), "install", "--upgrade", "pip"],
-                capture_output=True,
-                timeout=60,
-                **_subprocess_args()
-            )
+            try:
+                (venv_path / BACKEND_MARKER).write_text(self.backend.name)
+            except OSError:
+                pass  # _venv_backend can still tell from whether pip is there
+            
+            for command in self.backend.setup_commands(
+                self.get_python_path(project_name), self.get_pip_path(project_name)
+            ):
+                subprocess.run(
+                    command,
+                    capture_output=True,
+                    timeout=60,
+                    **_subprocess_args()
+                )
             
             # Build details message
-            details = f"Created with Python {python_version}\nLocation: {venv_path}"
+            details = f"Created with Python {python_version} ({self.backend.name})\nLocation: {venv_path}"
             if version_warnings:
                 details += "\n\n⚠️ " + "\n⚠️ ".join(version_warnings)
             
@@ -428,20 +500,201 @@ class EnvironmentWrangler:
         
         pip_path = self.get_pip_path(project_name)
         
-        if not pip_path.exists():
+        if self._venv_backend(project_name).uses_pip and not pip_path.exists():
             return VenvResult(
                 success=False,
                 message="pip not found in environment",
-                details=f"Expected at: {pip_path}"
+                details=f"Expected at: {pip_path}\n(Made with uv? Install uv, or recreate the environment.)"
+            )
+        
+        # One run resolves and installs everything together, instead of
+        # paying startup and dependency resolution once per package. If it
+        # fails, going one by one finds the package at fault and still
+        # installs the rest.
+        already_installed = set()
+        if len(packages) > 1:
+            try:
+                success, already_installed = self._install_batch(project_name, packages, progress_callback)
+            except subprocess.TimeoutExpired:
+                # One by one would only spend that long again
+                return VenvResult(
+                    success=False,
+                    message="Timed out installing packages",
+                    details=", ".join(packages)
+                )
+            if success:
+                return VenvResult(
+                    success=True,
+                    message=f"Installed {len(packages)} package(s)",
+                    details=", ".join(packages)
+                )
+        
+        installed_packages, failed_packages = self._install_each(
+            project_name, packages, already_installed, progress_callback
+        )
+        
+        # Build result
+        # Separate required failures from optional package failures
+        required_failures = [(p, e) for p, e in failed_packages if p.lower() not in OPTIONAL_PACKAGES]
+        optional_failures = [(p, e) for p, e in failed_packages if p.lower() in OPTIONAL_PACKAGES]
+        
+        if not failed_packages:
+            return VenvResult(
+                success=True,
+                message=f"Installed {len(installed_packages)} package(s)",
+                details=", ".join(installed_packages)
+            )
+        elif not required_failures:
+            # Only optional packages failed - that's OK
+            optional_names = [p[0] for p in optional_failures]
+            details = f"Installed: {', '.join(installed_packages)}"
+            details += f"\n\n⚠️ Optional packages skipped (platform-specific): {', '.join(optional_names)}"
+            return VenvResult(
+                success=True,  # Still success!
+                message=f"Installed {len(installed_packages)} package(s) ({len(optional_failures)} optional skipped)",
+                details=details
+            )
+        elif installed_packages:
+            failed_names = [p[0] for p in required_failures]
+            return VenvResult(
+                success=False,
+                message=f"Installed {len(installed_packages)}, failed {len(required_failures)}",
+                details=f"Failed: {', '.join(failed_names)}"
+            )
+        else:
+            return VenvResult(
+                success=False,
+                message="All package installations failed",
+                details="\n".join(f"{p}: {e}" for p, e in failed_packages)
+            )
+    
+    def _install_command(self, project_name: str, args: list[str]) -> list[str]:
+        """The install command for a project's venv, from the backend that made it."""
+        return self._venv_backend(project_name).install_command(
+            self.get_python_path(project_name), self.get_pip_path(project_name), args
+        )
+    
+    def _install_batch(
+        self,
+        project_name: str,
+        packages: list[str],
+        progress_callback: Optional[Callable[[InstallProgress], None]] = None
+    ) -> tuple[bool, set[str]]:
+        """
+        Install all packages with a single backend run.
+        
+        Reads the output as it goes to report each package: 'installing'
+        once the backend starts on it, 'done' when it's installed or
+        already there.
+        
+        Returns:
+            (success, packages found already installed)
+        
+        Raises:
+            subprocess.TimeoutExpired: The batch ran out of time (unfinished
+                packages are reported as failed)
+        """
+        backend = self._venv_backend(project_name)
+        total = len(packages)
+        by_name = {_requirement_name(package): package for package in packages}
+        order = []  # Requested packages in the order the backend got to them
+        finished = set()
+        already_installed = set()
+        
+        def report(package: str, status: str, message: str):
+            if package not in order:
+                order.append(package)
+            if progress_callback:
+                progress_callback(InstallProgress(
+                    package=package,
+                    index=order.index(package) + 1,
+                    total=total,
+                    status=status,
+                    message=message
+                ))
+        
+        try:
+            process = subprocess.Popen(
+                backend.install_command(
+                    self.get_python_path(project_name), self.get_pip_path(project_name), packages
+                ),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                **_subprocess_args()
             )
+        except Exception:
+            return False, already_installed
+        
+        # The whole batch gets the time the packages would have had one by one
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(INSTALL_TIMEOUT * total, kill)
+        timer.start()
+        try:
+            for line in iter(process.stdout.readline, ''):
+                progress = backend.parse_progress(line)
+                if progress is None:
+                    continue
+                package = by_name.get(_requirement_name(progress[0]))
+                if package is None or package in finished:
+                    continue
+                if progress[1] == 'installing':
+                    if package not in order:
+                        report(package, 'installing', f"Installing {package}...")
+                else:
+                    finished.add(package)
+                    if progress[1] == 'already installed':
+                        already_installed.add(package)
+                        report(package, 'done', f"{package} is already installed")
+                    else:
+                        report(package, 'done', f"Installed {package}")
+            process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+        
+        if timed_out.is_set():
+            for package in packages:
+                if package not in finished:
+                    report(package, 'failed', f"Timed out installing {package}")
+            raise subprocess.TimeoutExpired(process.args, INSTALL_TIMEOUT * total)
+        
+        if process.returncode != 0:
+            return False, already_installed
+        
+        for package in packages:
+            if package not in finished:
+                report(package, 'done', f"Installed {package}")
+        return True, already_installed
+    
+    def _install_each(
+        self,
+        project_name: str,
+        packages: list[str],
+        already_installed: set[str],
+        progress_callback: Optional[Callable[[InstallProgress], None]] = None
+    ) -> tuple[list[str], list[tuple[str, str]]]:
+        """
+        Install packages one run at a time, so one failure can't stop the rest.
         
-        # Install all packages at once (faster than one by one)
-        # But we'll report progress for UX
+        Returns:
+            (installed packages, [(failed package, error), ...])
+        """
         total = len(packages)
         failed_packages = []
         installed_packages = []
         
         for i, package in enumerate(packages):
+            if package in already_installed:
+                installed_packages.append(package)
+                continue
+            
             if progress_callback:
                 progress_callback(InstallProgress(
                     package=package,
@@ -453,10 +706,10 @@ class EnvironmentWrangler:
             
             try:
                 result = subprocess.run(
-                    [str(pip_path), "install", package],
+                    self._install_command(project_name, [package]),
                     capture_output=True,
                     text=True,
-                    timeout=300,  # 5 minute timeout per package
+                    timeout=INSTALL_TIMEOUT,
                     **_subprocess_args()
                 )
                 
@@ -502,40 +755,7 @@ class EnvironmentWrangler:
                         message=f"Error installing {package}: {e}"
                     ))
         
-        # Build result
-        # Separate required failures from optional package failures
-        required_failures = [(p, e) for p, e in failed_packages if p.lower() not in OPTIONAL_PACKAGES]
-        optional_failures = [(p, e) for p, e in failed_packages if p.lower() in OPTIONAL_PACKAGES]
-        
-        if not failed_packages:
-            return VenvResult(
-                success=True,
-                message=f"Installed {len(installed_packages)} package(s)",
-                details=", ".join(installed_packages)
-            )
-        elif not required_failures:
-            # Only optional packages failed - that's OK
-            optional_names = [p[0] for p in optional_failures]
-            details = f"Installed: {', '.join(installed_packages)}"
-            details += f"\n\n⚠️ Optional packages skipped (platform-specific): {', '.join(optional_names)}"
-            return VenvResult(
-                success=True,  # Still success!
-                message=f"Installed {len(installed_packages)} package(s) ({len(optional_failures)} optional skipped)",
-                details=details
-            )
-        elif installed_packages:
-            failed_names = [p[0] for p in required_failures]
-            return VenvResult(
-                success=False,
-                message=f"Installed {len(installed_packages)}, failed {len(required_failures)}",
-                details=f"Failed: {', '.join(failed_names)}"
-            )
-        else:
-            return VenvResult(
-                success=False,
-                message="All package installations failed",
-                details="\n".join(f"{p}: {e}" for p, e in failed_packages)
-            )
+        return installed_packages, failed_packages
     
     def install_from_requirements(
         self,
@@ -567,8 +787,6 @@ class EnvironmentWrangler:
             if not result.success:
                 return result
         
-        pip_path = self.get_pip_path(project_name)
-        
         if progress_callback:
             progress_callback(InstallProgress(
                 package="requirements.txt",
@@ -580,7 +798,7 @@ class EnvironmentWrangler:
         
         try:
             result = subprocess.run(
-                [str(pip_path), "install", "-r", str(requirements_path)],
+                self._install_command(project_name, ["-r", str(requirements_path)]),
                 capture_output=True,
                 text=True,
                 timeout=600,  # 10 minute timeout for all packages
@@ -741,11 +959,11 @@ class EnvironmentWrangler:
         if not self.venv_exists(project_name):
             return []
         
-        pip_path = self.get_pip_path(project_name)
-        
         try:
             result = subprocess.run(
-                [str(pip_path), "freeze"],
+                self._venv_backend(project_name).freeze_command(
+                    self.get_python_path(project_name), self.get_pip_path(project_name)
+                ),
                 capture_output=True,
                 text=True,
                 timeout=30,
@@ -775,14 +993,8 @@ class EnvironmentWrangler:
         if not venv_path.exists():
             return None
         
-        total = 0
-        try:
-            for path in venv_path.rglob('*'):
-                if path.is_file():
-                    total += path.stat().st_size
-            return total
-        except Exception:
-            return None
+        total, _ = tree_size(venv_path)
+        return total
     
     def format_size(self, size_bytes: int) -> str:
         """Format bytes as human-readable size."""
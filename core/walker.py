@@ -0,0 +1,159 @@
+"""
+Fast project tree walking for TPC.
+
+Snapshots, dependency scans, secrets checks and size calculations all
+walk folder trees. Path.rglob() plus is_file() plus stat() costs three
+system calls per entry and happily walks through venv/ and node_modules/.
+scan_tree() uses os.scandir instead: the directory listing already says
+what's a folder, files get exactly one stat, and ignored folders are
+skipped without being opened.
+"""
+
+import os
+import stat
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .ignore import IgnoreMatcher
+
+
+@dataclass
+class FileEntry:
+    """A file or folder found while walking a tree."""
+    path: Path        # Full path
+    rel_path: str     # Relative to the walk root, always "/"-separated
+    is_dir: bool
+    size: int = 0     # Bytes (files only)
+    mtime_ns: int = 0  # Modification time (files only)
+    inode: int = 0    # Inode / file index (files only)
+    mode: int = 0     # Permission bits (files only)
+
+
+def scan_tree(
+    root: Path,
+    matcher: Optional[IgnoreMatcher] = None,
+    include_dirs: bool = False,
+    prefix: str = "",
+) -> Iterator[FileEntry]:
+    """
+    Walk a tree and yield an entry for every regular file that isn't ignored.
+
+    Args:
+        root: Folder to walk
+        matcher: Ignore patterns. Ignored folders are never opened.
+        include_dirs: Also yield entries for (non-ignored) folders
+        prefix: Put in front of every rel_path, e.g. "src/" when walking
+            one folder of a project (ignore patterns then see project paths)
+
+    Entries come out in a stable, sorted, depth-first order. Symlinked
+    folders aren't followed; symlinked files are reported as the file they
+    point to. Unreadable folders and broken links are skipped silently.
+    """
+    root_str = os.fspath(root)
+    stack = [(root_str, prefix)]
+
+    while stack:
+        dir_path, prefix = stack.pop()
+
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel = prefix + entry.name
+
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if matcher and matcher.is_ignored(rel, is_dir=True):
+                    continue
+                if include_dirs:
+                    yield FileEntry(path=Path(entry.path), rel_path=rel, is_dir=True)
+                subdirs.append((entry.path, rel + "/"))
+                continue
+
+            if matcher and matcher.is_ignored(rel):
+                continue
+
+            try:
+                st = entry.stat()  # Follows symlinks - one syscall on any OS
+            except OSError:
+                continue
+
+            if not stat.S_ISREG(st.st_mode):
+                continue  # Sockets, FIFOs, links to folders...
+
+            yield FileEntry(
+                path=Path(entry.path),
+                rel_path=rel,
+                is_dir=False,
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                inode=st.st_ino,
+                mode=st.st_mode & 0o777,
+            )
+
+        # Pop in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def tree_size(root: Path, matcher: Optional[IgnoreMatcher] = None) -> tuple[int, int]:
+    """Return (total_bytes, file_count) for a folder tree."""
+    total_size = 0
+    file_count = 0
+
+    for entry in scan_tree(root, matcher):
+        total_size += entry.size
+        file_count += 1
+
+    return total_size, file_count
+
+
+def find_dirs_named(
+    root: Path,
+    name: str,
+    matcher: Optional[IgnoreMatcher] = None,
+) -> Iterator[Path]:
+    """
+    Yield every folder called `name` under root.
+
+    Matching folders are reported but not walked into.
+    """
+    stack = [os.fspath(root)]
+    root_len = len(stack[0].rstrip(os.sep)) + 1
+
+    while stack:
+        dir_path = stack.pop()
+
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+
+            if entry.name == name:
+                yield Path(entry.path)
+                continue
+
+            rel = entry.path[root_len:].replace(os.sep, "/")
+            if matcher and matcher.is_ignored(rel, is_dir=True):
+                continue
+
+            subdirs.append(entry.path)
+
+        stack.extend(reversed(subdirs))
@@ -11,6 +11,7 @@ Contains:
 - Build options and PyInstaller integration (future)
 """
 
+import html
 import platform
 from pathlib import Path
 from PyQt6.QtWidgets import (
@@ -35,14 +36,18 @@ class DependencyScanWorker(QThread):
     finished = pyqtSignal(object)  # Emits ScanResult
     error = pyqtSignal(str)
     
-    def __init__(self, project_path: Path):
+    def __init__(self, project_path: Path, project_name: str, main_file: str | None = None):
         super().__init__()
         self.project_path = project_path
+        self.project_name = project_name
+        self.main_file = main_file
     
     def run(self):
         try:
-            detective = DependencyDetective()
-            result = detective.scan_project(self.project_path)
+            # Classify against the venv's Python, not the one running TPC
+            resolver = EnvironmentWrangler().get_module_resolver(self.project_name)
+            detective = DependencyDetective(resolver)
+            result = detective.scan_project(self.project_path, self.main_file)
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
@@ -886,7 +891,7 @@ class PackWorkspace(QWidget):
         self.deps_actions.hide()
         
         # Run scan in background
-        self.worker = DependencyScanWorker(self.project.path)
+        self.worker = DependencyScanWorker(self.project.path, self.project.name, self.project.main_file)
         self.worker.finished.connect(self._on_scan_finished)
         self.worker.error.connect(self._on_scan_error)
         self.worker.start()
@@ -912,8 +917,36 @@ class PackWorkspace(QWidget):
                 f"✓ Scanned {file_count} Python file(s), found {pkg_count} third-party package(s)"
             )
         
+        # Packages left out of the environment and build, and why
+        skipped_note = ""
+        if result.not_needed:
+            not_needed = ", ".join(sorted(result.not_needed))
+            skipped_note += (
+                f"<br><br><span style='color: #888;'>"
+                f"Not needed on this platform, so left out: {not_needed}</span>"
+            )
+        if result.unused_third_party:
+            # Only imported by files the main file never reaches (tests, old scripts)
+            unused = ", ".join(sorted(result.unused_third_party))
+            skipped_note += (
+                f"<br><br><span style='color: #888;'>"
+                f"Not used by {self.project.main_file}, so left out: {unused}</span>"
+            )
+        
+        # Hover the list to see which of the project's files pull in what
+        if result.graph is not None:
+            self.package_display.setToolTip(
+                f"<pre>{html.escape(result.graph.format_tree(result.third_party))}</pre>"
+            )
+        else:
+            self.package_display.setToolTip("")
+        
         if result.third_party:
-            packages = sorted(result.third_party)
+            # try/except ImportError around every import - the app runs without it
+            packages = [
+                f"{pkg} <i>(optional)</i>" if pkg in result.optional else pkg
+                for pkg in sorted(result.third_party)
+            ]
             display_text = "<b>Detected packages:</b><br>" + ", ".join(packages)
             
             # Check against requirements.txt
@@ -940,6 +973,7 @@ class PackWorkspace(QWidget):
                         f"✓ {len(in_both)} package(s) already in requirements.txt</span>"
                     )
             
+            display_text += skipped_note
             self.package_display.setText(display_text)
             self.package_display.show()
             
@@ -952,6 +986,7 @@ class PackWorkspace(QWidget):
             self.package_display.setText(
                 "No third-party packages detected.<br>"
                 "<i>Your project only uses Python's standard library — nice and simple!</i>"
+                + skipped_note
             )
             self.package_display.show()
             self.deps_actions.hide()
@@ -13,19 +13,23 @@ import shutil
 import sys
 import os
 import platform
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QFrame, QScrollArea, QPlainTextEdit,
     QDialog, QLineEdit, QMessageBox, QSplitter,
-    QApplication
+    QApplication, QCheckBox, QTreeWidget, QTreeWidgetItem, QMenu
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QProcess, QThread, QObject, QPoint
+from PyQt6.QtCore import Qt, pyqtSignal, QProcess, QThread, QObject, QPoint, QFileSystemWatcher, QTimer
 from PyQt6.QtGui import QFont, QTextCursor, QPixmap
 
-from core import Project, Snapshot, __version__
+from core import Project, Snapshot, SnapshotResult, format_size, __version__
+from core.walker import scan_tree
 
 
 def generate_track_help_prompt(project: Project, last_output: str = "") -> str:
@@ -231,6 +235,254 @@ class BackupWorker(QObject):
         self.finished.emit(result)
 
 
+@dataclass
+class SnapshotJob:
+    """A queued save, restore, check or clean-up."""
+    kind: str  # "save", "restore", "restore_files", "verify" or "clean_up"
+    project: Project
+    note: str = ""
+    snapshot: Optional[Snapshot] = None
+    paths: list[str] = field(default_factory=list)  # What to bring back, for "restore_files"
+    changed_paths: Optional[set[str]] = None  # Known changes (auto-save); None = scan the project
+    auto: bool = False
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    
+    @property
+    def label(self) -> str:
+        return {"save": "Saving", "verify": "Checking", "clean_up": "Cleaning up"}.get(self.kind, "Restoring")
+
+
+class SnapshotWorker(QObject):
+    """Worker to save or restore a snapshot in background thread."""
+    finished = pyqtSignal(object)  # Emits SnapshotResult
+    progress = pyqtSignal(str)
+    transfer = pyqtSignal(object, object, object, object)  # files done, total files, bytes done, total bytes
+    
+    def __init__(self, job: SnapshotJob):
+        super().__init__()
+        self.job = job
+    
+    def run(self):
+        job = self.job
+        callbacks = dict(
+            progress_callback=lambda msg: self.progress.emit(msg),
+            transfer_callback=lambda *counts: self.transfer.emit(*counts),
+            cancel_event=job.cancel_event,
+        )
+        try:
+            if job.kind == "save":
+                result = job.project.save_version(
+                    job.note, changed_paths=job.changed_paths, skip_unchanged=job.auto, **callbacks
+                )
+            elif job.kind == "restore_files":
+                result = job.project.restore_files(job.snapshot, job.paths, **callbacks)
+            elif job.kind == "verify":
+                checked = job.project.verify_version(job.snapshot, callbacks["progress_callback"])
+                message = checked.summary
+                problems = checked.missing + checked.corrupted
+                if problems:
+                    message += "\n\n" + "\n".join(problems[:10])
+                    if len(problems) > 10:
+                        message += f"\n...and {len(problems) - 10} more"
+                result = SnapshotResult(success=not problems, message=message)
+            elif job.kind == "clean_up":
+                result = SnapshotResult(success=True, message=job.project.clean_up_versions().summary)
+            else:
+                result = job.project.restore_version(job.snapshot, **callbacks)
+        except Exception as e:
+            # Never leave the job queue stuck on a crashed worker
+            result = SnapshotResult(success=False, message=f"{job.label} failed: {e}")
+        self.finished.emit(result)
+
+
+class AutoSaveWatcher(QObject):
+    """
+    Watches a project's files and asks for a snapshot once they go quiet.
+    
+    Changed paths are collected in memory, so the snapshot only has to look
+    at those instead of rescanning the whole tree. Bursts of changes (an
+    editor saving ten files, a git checkout) restart the quiet period and
+    end up in one snapshot.
+    
+    Folders are always watched, files only up to MAX_FILE_WATCHES: on macOS
+    every watch holds an open file, and a process gets 256 by default.
+    Files past the cap are polled for size and modification time instead.
+    """
+    changes_ready = pyqtSignal(object)  # Set of changed paths, or None if the whole project needs a scan
+    
+    MAX_FILE_WATCHES = 128
+    
+    def __init__(self, project: Project, parent=None):
+        super().__init__(parent)
+        self.project = project
+        self.matcher = project.snapshot_manager.ignore_matcher
+        self._root = os.path.normpath(str(project.path))
+        self._changed: set[str] = set()
+        self._rescan = False  # Set when a change may have been missed
+        self._polled: dict[str, Optional[tuple[int, int]]] = {}  # Unwatched file -> (size, mtime_ns)
+        
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(project.auto_save_delay, 1) * 1000)
+        self._timer.timeout.connect(self._on_quiet)
+        
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(max(project.auto_save_delay, 2) * 1000)
+        self._poll_timer.timeout.connect(self._poll)
+        
+        self._watch_tree(Path(self._root), "")
+    
+    def _rel_path(self, path: str) -> str:
+        path = os.path.normpath(path)
+        if path == self._root:
+            return ""
+        return os.path.relpath(path, self._root).replace(os.sep, "/")
+    
+    def _watched(self) -> set[str]:
+        """Paths with a watch or in the poll list."""
+        return set(self._watcher.files()) | set(self._watcher.directories()) | self._polled.keys()
+    
+    @staticmethod
+    def _file_state(path: str) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+    
+    def _watch(self, folders: list[str], files: list[str]) -> None:
+        """Watch folders, and files while there are file watches to spare. The rest get polled."""
+        watched = self._watched()
+        folders = [p for p in folders if p not in watched]
+        files = [p for p in files if p not in watched]
+        
+        room = max(self.MAX_FILE_WATCHES - len(self._watcher.files()), 0)
+        for path in files[room:]:
+            self._polled[path] = self._file_state(path)
+        if self._polled and not self._poll_timer.isActive():
+            self._poll_timer.start()
+        
+        paths = folders + files[:room]
+        if paths and self._watcher.addPaths(paths):
+            # Out of OS watch handles - the next auto-save scans everything
+            self._rescan = True
+    
+    def _watch_tree(self, folder: Path, prefix: str) -> list[str]:
+        """Watch a folder and everything in it that isn't ignored. Returns the folders watched."""
+        folder_paths = [str(folder)]
+        file_paths = []
+        folders = [prefix.rstrip("/")]
+        for entry in scan_tree(folder, self.matcher, include_dirs=True, prefix=prefix):
+            if self._is_tpc_path(entry.rel_path):
+                continue
+            if entry.is_dir:
+                folder_paths.append(str(entry.path))
+                folders.append(entry.rel_path)
+            else:
+                file_paths.append(str(entry.path))
+        self._watch(folder_paths, file_paths)
+        return folders
+    
+    @staticmethod
+    def _is_tpc_path(rel_path: str) -> bool:
+        # TPC writes project.json itself - that shouldn't start an auto-save
+        return rel_path == ".tpc" or rel_path.startswith(".tpc/")
+    
+    def _mark(self, rel_path: str) -> None:
+        self._changed.add(rel_path)
+        self._timer.start()  # Restart the quiet period
+    
+    def _on_file_changed(self, path: str):
+        rel_path = self._rel_path(path)
+        self._mark(rel_path)
+        
+        # Editors that save by writing a new file and renaming it over the
+        # old one drop the watch on it - pick the new file up again
+        if os.path.isfile(path) and path not in self._watcher.files():
+            self._watch([], [path])
+    
+    def _on_directory_changed(self, path: str):
+        rel_path = self._rel_path(path)
+        self._mark(rel_path)
+        
+        # Start watching anything new in the folder
+        watched = self._watched()
+        prefix = rel_path + "/" if rel_path else ""
+        try:
+            with os.scandir(path) as it:
+                children = [child for child in it if child.path not in watched]
+        except OSError:
+            return
+        
+        for child in children:
+            child_rel = prefix + child.name
+            try:
+                is_dir = child.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if self.matcher.is_ignored(child_rel, is_dir=is_dir) or self._is_tpc_path(child_rel):
+                continue
+            
+            if is_dir:
+                for folder in self._watch_tree(Path(child.path), child_rel + "/"):
+                    self._changed.add(folder)
+            else:
+                self._watch([], [child.path])
+                self._changed.add(child_rel)
+    
+    def _poll(self):
+        """Look for changes in the files there were no watches left for."""
+        for path, state in list(self._polled.items()):
+            current = self._file_state(path)
+            if current == state:
+                continue
+            self._mark(self._rel_path(path))
+            if current is None:
+                del self._polled[path]  # Gone - its folder's watch picks it up if it comes back
+            else:
+                self._polled[path] = current
+        if not self._polled:
+            self._poll_timer.stop()
+    
+    def _on_quiet(self):
+        # .tpc/ isn't watched, but whatever changed in it still goes in the snapshot
+        changed = None if self._rescan else self._changed | {".tpc"}
+        self._changed = set()
+        self._rescan = False
+        self.changes_ready.emit(changed)
+    
+    def rescan_next(self) -> None:
+        """Make the next auto-save scan the whole project (e.g. after one failed)."""
+        self._rescan = True
+    
+    def reset(self) -> None:
+        """Forget pending changes - the files were just restored or saved."""
+        self._timer.stop()
+        self._changed = set()
+        self._rescan = False
+        
+        # What the polled files look like now is the new baseline
+        for path in list(self._polled):
+            state = self._file_state(path)
+            if state is None:
+                del self._polled[path]
+            else:
+                self._polled[path] = state
+    
+    def stop(self) -> None:
+        """Stop watching."""
+        self._timer.stop()
+        self._poll_timer.stop()
+        self._polled = {}
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+
+
 class WelcomeWidget(QWidget):
     """Welcome screen shown when no project is selected."""
     
@@ -315,6 +567,12 @@ class WorkspaceWidget(QWidget):
         self.project: Project | None = None
         self.running_processes: dict[str, QProcess] = {}
         self.project_outputs: dict[str, str] = {}
+        
+        # Saves and restores run one at a time, in the order they were asked for
+        self._snapshot_jobs: list[SnapshotJob] = []
+        self._snapshot_job: SnapshotJob | None = None
+        self._auto_save: AutoSaveWatcher | None = None
+        
         self.setup_ui()
     
     def _get_project_key(self) -> str | None:
@@ -392,9 +650,33 @@ class WorkspaceWidget(QWidget):
         self.btn_save.clicked.connect(self.on_save_version)
         actions_layout.addWidget(self.btn_save)
         
+        self.chk_auto_save = QCheckBox("Auto-save")
+        self.chk_auto_save.setObjectName("autoSaveCheck")
+        self.chk_auto_save.setToolTip("Save a version on its own after your files change")
+        self.chk_auto_save.toggled.connect(self.on_auto_save_toggled)
+        actions_layout.addWidget(self.chk_auto_save)
+        
         actions_layout.addStretch()
         left_layout.addWidget(actions)
         
+        # Snapshot job status (shown while a save or restore is running)
+        self.snapshot_job_bar = QWidget()
+        job_layout = QHBoxLayout(self.snapshot_job_bar)
+        job_layout.setContentsMargins(0, 0, 0, 0)
+        job_layout.setSpacing(12)
+        
+        self.snapshot_job_status = QLabel("")
+        self.snapshot_job_status.setObjectName("snapshotJobStatus")
+        job_layout.addWidget(self.snapshot_job_status, 1)
+        
+        self.btn_cancel_job = QPushButton("Cancel")
+        self.btn_cancel_job.setObjectName("btnSmall")
+        self.btn_cancel_job.clicked.connect(self.on_cancel_snapshot_job)
+        job_layout.addWidget(self.btn_cancel_job)
+        
+        self.snapshot_job_bar.hide()
+        left_layout.addWidget(self.snapshot_job_bar)
+        
         # GitHub Backup section
         backup_section = QWidget()
         backup_layout = QHBoxLayout(backup_section)
@@ -487,6 +769,19 @@ class WorkspaceWidget(QWidget):
         self.snapshot_count.setObjectName("snapshotCount")
         history_header_layout.addWidget(self.snapshot_count)
         
+        btn_clean_up = QPushButton("Clean Up")
+        btn_clean_up.setObjectName("cleanUpButton")
+        btn_clean_up.setToolTip("Remove unused stored files, old safety backups and unfinished versions")
+        btn_clean_up.setStyleSheet("""
+            QPushButton {
+                background-color: transparent; color: #666666;
+                border: none; padding: 2px 6px; font-size: 11px;
+            }
+            QPushButton:hover { color: #4a9eff; }
+        """)
+        btn_clean_up.clicked.connect(self.on_clean_up_versions)
+        history_header_layout.addWidget(btn_clean_up)
+        
         right_layout.addWidget(history_header)
         
         # Version history scroll area
@@ -527,6 +822,11 @@ class WorkspaceWidget(QWidget):
         else:
             self.output_panel.clear()
         
+        self.chk_auto_save.blockSignals(True)
+        self.chk_auto_save.setChecked(project.auto_save)
+        self.chk_auto_save.blockSignals(False)
+        self._update_auto_save()
+        
         self.refresh_ui()
     
     def refresh_ui(self):
@@ -662,7 +962,10 @@ class WorkspaceWidget(QWidget):
         snapshots = self.project.get_version_history()
         current, limit = self.project.get_snapshot_count()
         
-        self.snapshot_count.setText(f"{current} of {limit}")
+        if self.project.snapshot_retention is None:
+            self.snapshot_count.setText(f"{current} of {limit}")
+        else:
+            self.snapshot_count.setText(f"{current} kept")
         
         if not snapshots:
             empty = QLabel("No versions yet.\nClick 'Save Version' to save your first snapshot.")
@@ -673,10 +976,38 @@ class WorkspaceWidget(QWidget):
             return
         
         for i, snapshot in enumerate(snapshots):
-            item = SnapshotItem(snapshot, is_latest=(i == 0))
-            item.restore_clicked.connect(lambda s=snapshot: self.on_restore(s))
+            item = self._make_history_item(snapshot, is_latest=(i == 0))
             self.history_layout.insertWidget(self.history_layout.count() - 1, item)
     
+    def _make_history_item(self, snapshot: Snapshot, is_latest: bool) -> "SnapshotItem":
+        item = SnapshotItem(snapshot, is_latest=is_latest)
+        item.restore_clicked.connect(lambda s=snapshot: self.on_restore(s))
+        item.restore_files_clicked.connect(lambda s=snapshot: self.on_restore_files(s))
+        item.verify_clicked.connect(lambda s=snapshot: self.on_verify_version(s))
+        return item
+    
+    def add_history_snapshot(self, snapshot: Snapshot, expired: list[str]):
+        """Put a new snapshot at the top of the history list, without rebuilding it."""
+        for i in reversed(range(self.history_layout.count() - 1)):
+            widget = self.history_layout.itemAt(i).widget()
+            if isinstance(widget, SnapshotItem) and widget.snapshot.name not in expired:
+                if widget.is_latest:
+                    # Old latest gets its Restore button back
+                    self.history_layout.insertWidget(i, self._make_history_item(widget.snapshot, is_latest=False))
+                else:
+                    continue
+            # Replaced, expired, or the "No versions yet" label
+            self.history_layout.removeWidget(widget)
+            widget.deleteLater()
+        
+        self.history_layout.insertWidget(0, self._make_history_item(snapshot, is_latest=True))
+        
+        current = self.history_layout.count() - 1
+        if self.project.snapshot_retention is None:
+            self.snapshot_count.setText(f"{current} of {self.project.snapshot_limit}")
+        else:
+            self.snapshot_count.setText(f"{current} kept")
+    
     def on_launch(self):
         """Launch the project (run Python or open folder)."""
         if not self.project:
@@ -804,19 +1135,8 @@ class WorkspaceWidget(QWidget):
         
         note = dialog.get_note()
         
-        # Save the snapshot
-        result = self.project.save_version(note)
-        
-        if result.success:
-            msg = result.message
-            if result.deleted_old:
-                msg += f"\n(Oldest snapshot removed: {result.deleted_old})"
-            
-            QMessageBox.information(self, "Version Saved", msg)
-            self.refresh_history()
-            self.project_changed.emit()
-        else:
-            QMessageBox.warning(self, "Save Failed", result.message)
+        # Save the snapshot in the background
+        self._queue_snapshot_job(SnapshotJob("save", self.project, note=note))
     
     def on_restore(self, snapshot: Snapshot):
         """Restore to a previous version."""
@@ -836,13 +1156,186 @@ class WorkspaceWidget(QWidget):
         if reply != QMessageBox.StandardButton.Yes:
             return
         
-        result = self.project.restore_version(snapshot)
+        self._queue_snapshot_job(SnapshotJob("restore", self.project, snapshot=snapshot))
+    
+    def on_restore_files(self, snapshot: Snapshot):
+        """Restore just some files or folders from a version."""
+        if not self.project:
+            return
+        
+        files = self.project.get_version_files(snapshot)
+        if not files:
+            QMessageBox.information(self, "Restore Files", "This version has no file list to pick from.")
+            return
+        
+        dialog = RestoreFilesDialog(snapshot, files, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        
+        paths = dialog.get_selected_paths()
+        if paths:
+            self._queue_snapshot_job(SnapshotJob("restore_files", self.project, snapshot=snapshot, paths=paths))
+    
+    def on_verify_version(self, snapshot: Snapshot):
+        """Check a version's files against their saved checksums."""
+        if not self.project:
+            return
+        self._queue_snapshot_job(SnapshotJob("verify", self.project, snapshot=snapshot))
+    
+    def on_clean_up_versions(self):
+        """Clear out stored files and folders no version needs anymore."""
+        if not self.project:
+            return
+        self._queue_snapshot_job(SnapshotJob("clean_up", self.project))
+    
+    def on_auto_save_toggled(self, checked: bool):
+        """Turn auto-save on or off for this project."""
+        if not self.project:
+            return
+        self.project.auto_save = checked
+        self.project.save_config()
+        self._update_auto_save()
+    
+    def _update_auto_save(self):
+        """Watch the current project's files if it has auto-save on."""
+        if self._auto_save:
+            self._auto_save.stop()
+            self._auto_save.deleteLater()
+            self._auto_save = None
+        
+        if self.project and self.project.auto_save:
+            self._auto_save = AutoSaveWatcher(self.project, self)
+            self._auto_save.changes_ready.connect(self._on_auto_save_changes)
+    
+    def _on_auto_save_changes(self, changed_paths):
+        """Files have been quiet for a while - queue an auto-save of what changed."""
+        watcher = self.sender()
+        if watcher is not self._auto_save:
+            return
+        
+        # Coalesce with an auto-save that hasn't started yet
+        for job in self._snapshot_jobs:
+            if job.auto and job.project is watcher.project:
+                if job.changed_paths is None or changed_paths is None:
+                    job.changed_paths = None
+                else:
+                    job.changed_paths |= changed_paths
+                return
+        
+        self._queue_snapshot_job(
+            SnapshotJob("save", watcher.project, note="Auto-save", changed_paths=changed_paths, auto=True)
+        )
+    
+    def _queue_snapshot_job(self, job: SnapshotJob):
+        """Queue a snapshot job; it starts once any running job is done."""
+        self._snapshot_jobs.append(job)
+        if self._snapshot_job is None:
+            self._start_next_snapshot_job()
+        else:
+            self._refresh_snapshot_job_status(f"{self._snapshot_job.label}...")
+    
+    def _start_next_snapshot_job(self):
+        """Start the next queued snapshot job, if any."""
+        if not self._snapshot_jobs:
+            self._snapshot_job = None
+            self.snapshot_job_bar.hide()
+            return
+        
+        job = self._snapshot_jobs.pop(0)
+        self._snapshot_job = job
+        
+        self.btn_cancel_job.setEnabled(job.kind not in ("verify", "clean_up"))  # These can't stop partway
+        self.btn_cancel_job.setText("Cancel")
+        self._refresh_snapshot_job_status(f"{job.label}...")
+        self.snapshot_job_bar.show()
+        
+        # Create worker and thread
+        self._snapshot_thread = QThread()
+        self._snapshot_worker = SnapshotWorker(job)
+        self._snapshot_worker.moveToThread(self._snapshot_thread)
+        
+        # Connect signals
+        self._snapshot_thread.started.connect(self._snapshot_worker.run)
+        self._snapshot_worker.progress.connect(self._on_snapshot_progress)
+        self._snapshot_worker.transfer.connect(self._on_snapshot_transfer)
+        self._snapshot_worker.finished.connect(self._on_snapshot_finished)
+        self._snapshot_worker.finished.connect(self._snapshot_thread.quit)
+        self._snapshot_worker.finished.connect(self._snapshot_worker.deleteLater)
+        self._snapshot_thread.finished.connect(self._snapshot_thread.deleteLater)
+        
+        # The next job replaces self._snapshot_thread, so it mustn't start
+        # until this thread has really stopped
+        self._snapshot_thread.finished.connect(self._start_next_snapshot_job)
+        
+        self._snapshot_thread.start()
+    
+    def _refresh_snapshot_job_status(self, text: str):
+        """Show the running job's progress, plus how many are waiting."""
+        if self._snapshot_jobs:
+            text += f"  ({len(self._snapshot_jobs)} queued)"
+        self.snapshot_job_status.setText(text)
+    
+    def _on_snapshot_progress(self, message: str):
+        """Handle progress messages from the snapshot worker."""
+        self._refresh_snapshot_job_status(message)
+    
+    def _on_snapshot_transfer(self, files_done, total_files, bytes_done, total_bytes):
+        """Handle file and byte counts from the snapshot worker."""
+        if not self._snapshot_job or self._snapshot_job.cancel_event.is_set():
+            return
+        self._refresh_snapshot_job_status(
+            f"{self._snapshot_job.label}: {files_done:,} of {total_files:,} files "
+            f"({format_size(bytes_done)} of {format_size(total_bytes)})"
+        )
+    
+    def on_cancel_snapshot_job(self):
+        """Cancel the running save or restore (queued ones still run)."""
+        if not self._snapshot_job:
+            return
+        self._snapshot_job.cancel_event.set()
+        self.btn_cancel_job.setEnabled(False)
+        self.btn_cancel_job.setText("Cancelling...")
+    
+    def _on_snapshot_finished(self, result):
+        """Handle job completion (the next job starts once the thread stops)."""
+        job = self._snapshot_job
+        self.snapshot_job_bar.hide()
+        
+        is_current = self.project is not None and job.project.path == self.project.path
+        watcher = self._auto_save if is_current else None
+        title_ok, title_failed = {
+            "save": ("Version Saved", "Save Failed"),
+            "verify": ("Check Finished", "Problems Found"),
+            "clean_up": ("Cleaned Up", "Clean Up Failed"),
+        }.get(job.kind, ("Restored", "Restore Failed"))
         
         if result.success:
-            QMessageBox.information(self, "Restored", result.message)
+            if is_current:
+                if job.kind == "save":
+                    if result.snapshot is not None:  # None when an auto-save found nothing new
+                        self.add_history_snapshot(result.snapshot, result.expired)
+                elif job.kind in ("restore", "restore_files"):
+                    if job.kind == "restore":
+                        self.refresh_history()
+                    if watcher:
+                        watcher.reset()  # Restored files aren't changes to auto-save
             self.project_changed.emit()
+            
+            if not job.auto:
+                msg = result.message
+                if result.deleted_old:
+                    msg += f"\n(Older snapshots removed: {result.deleted_old})"
+                QMessageBox.information(self, title_ok, msg)
         else:
-            QMessageBox.warning(self, "Restore Failed", result.message)
+            if job.auto and watcher:
+                watcher.rescan_next()  # Don't lose the changes this one was carrying
+            
+            if job.cancel_event.is_set():
+                QMessageBox.information(self, "Cancelled", result.message)
+            elif job.auto:
+                QMessageBox.warning(self, "Auto-save Failed", result.message)
+            else:
+                QMessageBox.warning(self, title_failed, result.message)
     
     def on_backup(self):
         """Handle backup button click."""
@@ -1118,6 +1611,8 @@ class WorkspaceWidget(QWidget):
             }
             
             #snapshotCount { color: #888888; font-size: 11px; }
+            #snapshotJobStatus { color: #666666; font-size: 13px; }
+            #autoSaveCheck { color: #666666; font-size: 13px; }
             
             #btnSmall {
                 background-color: transparent; color: #666666;
@@ -1154,6 +1649,8 @@ class SnapshotItem(QFrame):
     """A single snapshot in the version history."""
     
     restore_clicked = pyqtSignal()
+    restore_files_clicked = pyqtSignal()
+    verify_clicked = pyqtSignal()
     
     def __init__(self, snapshot: Snapshot, is_latest: bool = False):
         super().__init__()
@@ -1161,8 +1658,17 @@ class SnapshotItem(QFrame):
         self.is_latest = is_latest
         
         self.setObjectName("snapshotItem")
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.on_context_menu)
         self.setup_ui()
     
+    def on_context_menu(self, position):
+        """Right-click menu with the less common actions."""
+        menu = QMenu(self)
+        verify_action = menu.addAction("Check Files")
+        verify_action.triggered.connect(self.verify_clicked.emit)
+        menu.exec(self.mapToGlobal(position))
+    
     def setup_ui(self):
         layout = QHBoxLayout(self)
         layout.setContentsMargins(12, 10, 12, 10)
@@ -1192,6 +1698,21 @@ class SnapshotItem(QFrame):
         
         layout.addWidget(info, 1)
         
+        # Pick files to restore (any version, latest included)
+        btn_files = QPushButton("Files...")
+        btn_files.setObjectName("restoreFilesButton")
+        btn_files.setToolTip("Restore only some files or folders from this version")
+        btn_files.setStyleSheet("""
+            QPushButton {
+                background-color: transparent; color: #666666;
+                border: 1px solid #cccccc; padding: 6px 12px;
+                border-radius: 4px; font-size: 12px;
+            }
+            QPushButton:hover { background-color: #f0f0f0; }
+        """)
+        btn_files.clicked.connect(self.restore_files_clicked.emit)
+        layout.addWidget(btn_files)
+        
         # Restore button (not shown for latest)
         if not self.is_latest:
             btn = QPushButton("Restore")
@@ -1289,6 +1810,110 @@ class SaveVersionDialog(QDialog):
         return self.note_input.text().strip()
 
 
+class RestoreFilesDialog(QDialog):
+    """Dialog for picking files and folders to restore from a version."""
+    
+    def __init__(self, snapshot: Snapshot, files: list[str], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Restore Files")
+        self.setModal(True)
+        self.setMinimumSize(460, 480)
+        
+        layout = QVBoxLayout(self)
+        layout.setSpacing(16)
+        layout.setContentsMargins(24, 24, 24, 24)
+        
+        label = QLabel(f"Restore from '{snapshot.display_name}'")
+        label.setStyleSheet("font-size: 14px; color: #333333;")
+        layout.addWidget(label)
+        
+        # Folder tree - checking a folder checks everything in it
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.setStyleSheet("""
+            QTreeWidget {
+                border: 1px solid #cccccc; border-radius: 6px;
+                font-size: 13px; padding: 4px;
+            }
+        """)
+        folders: dict[str, QTreeWidgetItem] = {}
+        
+        def folder_item(rel_dir: str) -> QTreeWidgetItem:
+            if rel_dir not in folders:
+                parent_dir, _, name = rel_dir.rpartition("/")
+                parent = folder_item(parent_dir) if parent_dir else self.tree.invisibleRootItem()
+                item = QTreeWidgetItem(parent, [name + "/"])
+                item.setData(0, Qt.ItemDataRole.UserRole, rel_dir)
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsAutoTristate)
+                item.setCheckState(0, Qt.CheckState.Unchecked)
+                folders[rel_dir] = item
+            return folders[rel_dir]
+        
+        for rel_path in files:
+            parent_dir, _, name = rel_path.rpartition("/")
+            parent = folder_item(parent_dir) if parent_dir else self.tree.invisibleRootItem()
+            item = QTreeWidgetItem(parent, [name])
+            item.setData(0, Qt.ItemDataRole.UserRole, rel_path)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(0, Qt.CheckState.Unchecked)
+        
+        self.tree.sortItems(0, Qt.SortOrder.AscendingOrder)
+        layout.addWidget(self.tree, 1)
+        
+        hint = QLabel("Only the checked files are replaced. Each one is backed up first.")
+        hint.setStyleSheet("font-size: 12px; color: #888888;")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+        
+        # Buttons
+        btn_row = QWidget()
+        btn_layout = QHBoxLayout(btn_row)
+        btn_layout.setContentsMargins(0, 0, 0, 0)
+        btn_layout.addStretch()
+        
+        btn_cancel = QPushButton("Cancel")
+        btn_cancel.setStyleSheet("""
+            QPushButton {
+                background-color: transparent; color: #666666;
+                border: 1px solid #cccccc; padding: 10px 20px;
+                border-radius: 6px; font-size: 13px;
+            }
+            QPushButton:hover { background-color: #f0f0f0; }
+        """)
+        btn_cancel.clicked.connect(self.reject)
+        btn_layout.addWidget(btn_cancel)
+        
+        btn_restore = QPushButton("Restore Selected")
+        btn_restore.setStyleSheet("""
+            QPushButton {
+                background-color: #4a9eff; color: white;
+                border: none; padding: 10px 20px;
+                border-radius: 6px; font-size: 13px; font-weight: 500;
+            }
+            QPushButton:hover { background-color: #5aafff; }
+        """)
+        btn_restore.clicked.connect(self.accept)
+        btn_layout.addWidget(btn_restore)
+        
+        layout.addWidget(btn_row)
+    
+    def get_selected_paths(self) -> list[str]:
+        """Checked files, and fully checked folders as one path each."""
+        paths = []
+        
+        def collect(item: QTreeWidgetItem):
+            for i in range(item.childCount()):
+                child = item.child(i)
+                state = child.checkState(0)
+                if state == Qt.CheckState.Checked:
+                    paths.append(child.data(0, Qt.ItemDataRole.UserRole))
+                elif state == Qt.CheckState.PartiallyChecked:
+                    collect(child)
+        
+        collect(self.tree.invisibleRootItem())
+        return paths
+
+
 class SecretsWarningDialog(QDialog):
     """Dialog warning about potentially sensitive files before backup."""
     